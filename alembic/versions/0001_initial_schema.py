@@ -0,0 +1,98 @@
+"""Initial schema
+
+Creates the tables that earlier releases built with create_all. Databases
+that already have them are adopted as-is.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JOB_STATUSES = ("PENDING", "PROCESSING", "COMPLETED", "FAILED")
+
+
+def upgrade() -> None:
+    # Offline (--sql) runs cannot inspect the database and emit every table
+    existing = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "rows" not in existing:
+        op.create_table(
+            "rows",
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("google_sheet_row_id", sa.String(), nullable=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("status", sa.Enum(*JOB_STATUSES, name="rowstatus"), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_rows_google_sheet_row_id", "rows", ["google_sheet_row_id"])
+
+    if "image_jobs" not in existing:
+        op.create_table(
+            "image_jobs",
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("row_id", sa.Uuid(), nullable=True),
+            sa.Column("prompt", sa.Text(), nullable=False),
+            sa.Column("reference_image_url", sa.String(), nullable=True),
+            sa.Column("yaml_content", sa.Text(), nullable=True),
+            sa.Column("image_url", sa.String(), nullable=True),
+            sa.Column("status", sa.Enum(*JOB_STATUSES, name="imagejobstatus"), nullable=False),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("model", sa.String(), nullable=False),
+            sa.Column("size", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["row_id"], ["rows.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "video_jobs" not in existing:
+        op.create_table(
+            "video_jobs",
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("row_id", sa.Uuid(), nullable=True),
+            sa.Column("image_job_id", sa.Uuid(), nullable=True),
+            sa.Column("source_image_url", sa.String(), nullable=False),
+            sa.Column("motion_prompt", sa.Text(), nullable=False),
+            sa.Column("duration", sa.Integer(), nullable=False),
+            sa.Column("model", sa.Enum("KLING", "VEO", name="videomodel"), nullable=False),
+            sa.Column("external_task_id", sa.String(), nullable=True),
+            sa.Column("video_url", sa.String(), nullable=True),
+            sa.Column("status", sa.Enum(*JOB_STATUSES, name="videojobstatus"), nullable=False),
+            sa.Column("progress", sa.Integer(), nullable=False),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["image_job_id"], ["image_jobs.id"]),
+            sa.ForeignKeyConstraint(["row_id"], ["rows.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_video_jobs_external_task_id", "video_jobs", ["external_task_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_video_jobs_external_task_id", table_name="video_jobs")
+    op.drop_table("video_jobs")
+    op.drop_table("image_jobs")
+    op.drop_index("ix_rows_google_sheet_row_id", table_name="rows")
+    op.drop_table("rows")
+    sa.Enum(name="videojobstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="videomodel").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="imagejobstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="rowstatus").drop(op.get_bind(), checkfirst=True)
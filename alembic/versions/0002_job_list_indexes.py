@@ -0,0 +1,50 @@
+"""Indexes for job list filters, ordering and row cascades
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    "image_jobs": {
+        "ix_image_jobs_created_at": ["created_at"],
+        "ix_image_jobs_row_id_created_at": ["row_id", "created_at"],
+        "ix_image_jobs_status_created_at": ["status", "created_at"],
+    },
+    "video_jobs": {
+        "ix_video_jobs_created_at": ["created_at"],
+        "ix_video_jobs_image_job_id": ["image_job_id"],
+        "ix_video_jobs_row_id_created_at": ["row_id", "created_at"],
+        "ix_video_jobs_status_created_at": ["status", "created_at"],
+    },
+}
+
+
+def upgrade() -> None:
+    # Offline (--sql) runs cannot inspect the database and emit every index
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+    for table, indexes in INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table)} if inspector else set()
+        for name, columns in indexes.items():
+            if name not in existing:
+                op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for table, indexes in INDEXES.items():
+        for name in indexes:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,52 @@
+"""Worker nodes, job leases and video submission time
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "worker_nodes",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("hostname", sa.String(), nullable=False),
+        sa.Column("pid", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_worker_nodes_heartbeat_at", "worker_nodes", ["heartbeat_at"])
+
+    op.create_table(
+        "job_leases",
+        sa.Column("resource", sa.String(), nullable=False),
+        sa.Column("owner", sa.String(), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("resource"),
+    )
+    op.create_index("ix_job_leases_owner", "job_leases", ["owner"])
+
+    op.add_column("video_jobs", sa.Column("submitted_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("video_jobs") as batch_op:
+        batch_op.drop_column("submitted_at")
+    op.drop_index("ix_job_leases_owner", table_name="job_leases")
+    op.drop_table("job_leases")
+    op.drop_index("ix_worker_nodes_heartbeat_at", table_name="worker_nodes")
+    op.drop_table("worker_nodes")
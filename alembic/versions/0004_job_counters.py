@@ -0,0 +1,64 @@
+"""Job status counters per row and overall
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _scope(row_id: sa.ColumnElement) -> sa.ColumnElement:
+    """
+    A row id in the str(UUID) form counter scopes use
+    """
+    if op.get_context().dialect.name == "sqlite":
+        # Stored as 32 hex digits
+        parts = [sa.func.substr(row_id, start, length) for start, length in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))]
+        return sa.func.lower(parts[0] + "-" + parts[1] + "-" + parts[2] + "-" + parts[3] + "-" + parts[4])
+    return sa.cast(row_id, sa.String())
+
+
+def _backfill(counters: sa.Table) -> None:
+    # INSERT ... SELECT rather than reading the jobs, so --sql scripts backfill too
+    columns = ["scope", "kind", "status", "count"]
+    for kind, table_name in (("image", "image_jobs"), ("video", "video_jobs")):
+        jobs = sa.table(table_name, sa.column("row_id", sa.String()), sa.column("status", sa.String()))
+        # Enums are stored by name; counters use the lowercase value
+        status = sa.func.lower(sa.cast(jobs.c.status, sa.String()))
+        op.execute(counters.insert().from_select(
+            columns,
+            sa.select(sa.literal("global"), sa.literal(kind), status, sa.func.count()).group_by(status)
+        ))
+        op.execute(counters.insert().from_select(
+            columns,
+            sa.select(_scope(jobs.c.row_id), sa.literal(kind), status, sa.func.count())
+            .where(jobs.c.row_id.is_not(None))
+            .group_by(jobs.c.row_id, status)
+        ))
+
+
+def upgrade() -> None:
+    counters = op.create_table(
+        "job_counters",
+        sa.Column("scope", sa.String(length=36), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "kind", "status"),
+    )
+    _backfill(counters)
+
+
+def downgrade() -> None:
+    op.drop_table("job_counters")
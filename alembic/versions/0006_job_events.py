@@ -0,0 +1,40 @@
+"""Append-only job event log
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_events",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("job_kind", sa.String(length=16), nullable=False),
+        sa.Column("job_id", sa.Uuid(), nullable=False),
+        sa.Column("event", sa.String(length=32), nullable=False),
+        sa.Column("external_task_id", sa.String(), nullable=True),
+        sa.Column("provider_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_job_events_kind_created_at", "job_events", ["job_kind", "created_at"])
+    op.create_index("ix_job_events_job_id_created_at", "job_events", ["job_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_events_job_id_created_at", table_name="job_events")
+    op.drop_index("ix_job_events_kind_created_at", table_name="job_events")
+    op.drop_table("job_events")
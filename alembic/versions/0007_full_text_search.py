@@ -0,0 +1,74 @@
+"""Full-text search index over prompts, YAML and row titles
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept inline rather than imported so this revision never changes
+TARGETS = {
+    "image_jobs": ("prompt", "yaml_content"),
+    "video_jobs": ("motion_prompt",),
+    "rows": ("title", "description"),
+}
+
+
+def _postgresql_upgrade() -> None:
+    for table, columns in TARGETS.items():
+        document = " || ' ' || ".join(f"COALESCE({column}, '')" for column in columns)
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('english', {document})) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def _sqlite_upgrade() -> None:
+    for table, columns in TARGETS.items():
+        fts = f"{table}_fts"
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(id UNINDEXED, {names}, tokenize='porter unicode61')")
+        op.execute(f"INSERT INTO {fts} (id, {names}) SELECT id, {names} FROM {table}")
+        op.execute(
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts} (id, {names}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+            f"DELETE FROM {fts} WHERE id = old.id; "
+            f"INSERT INTO {fts} (id, {names}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {fts} WHERE id = old.id; END"
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        _sqlite_upgrade()
+    else:
+        _postgresql_upgrade()
+
+
+def downgrade() -> None:
+    for table in TARGETS:
+        if op.get_bind().dialect.name == "sqlite":
+            for action in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{action}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        else:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,49 @@
+"""Near-duplicate prompt index for reusing image results
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:07
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN: a batch copy of image_jobs would drop its search triggers on SQLite
+    op.add_column("image_jobs", sa.Column("reused_from_id", sa.Uuid(), nullable=True))
+
+    op.create_table(
+        "prompt_signatures",
+        sa.Column("job_id", sa.Uuid(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("size", sa.String(), nullable=False),
+        sa.Column("signature", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["image_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_table(
+        "prompt_bands",
+        sa.Column("key", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("job_id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["image_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("key", "job_id"),
+    )
+    # Existing completed jobs are indexed by the app in the background (prompt_index.backfill)
+
+
+def downgrade() -> None:
+    op.drop_table("prompt_bands")
+    op.drop_table("prompt_signatures")
+    # SQLite 3.35+ drops columns in place, leaving the search triggers alone
+    op.drop_column("image_jobs", "reused_from_id")
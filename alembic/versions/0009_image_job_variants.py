@@ -0,0 +1,31 @@
+"""Variant groups of image jobs generated in one call
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:08
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN: a batch copy of image_jobs would drop its search triggers on SQLite
+    op.add_column("image_jobs", sa.Column("variant_group_id", sa.Uuid(), nullable=True))
+    op.add_column("image_jobs", sa.Column("variant_index", sa.Integer(), nullable=True))
+    op.create_index("ix_image_jobs_variant_group_id", "image_jobs", ["variant_group_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_image_jobs_variant_group_id", table_name="image_jobs")
+    op.drop_column("image_jobs", "variant_index")
+    op.drop_column("image_jobs", "variant_group_id")
@@ -0,0 +1,59 @@
+"""Cancelled job status and per-job deadlines
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:09
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_TYPES = ("imagejobstatus", "videojobstatus", "rowstatus")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Enums are stored by name; new values cannot be added inside a transaction
+        with op.get_context().autocommit_block():
+            for type_name in STATUS_TYPES:
+                op.execute(f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS 'CANCELLED'")
+
+    # Plain ADD COLUMN: a batch copy would drop the search triggers on SQLite
+    op.add_column("image_jobs", sa.Column("deadline_at", sa.DateTime(), nullable=True))
+    op.add_column("video_jobs", sa.Column("deadline_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("video_jobs", "deadline_at")
+    op.drop_column("image_jobs", "deadline_at")
+
+    # PostgreSQL cannot drop an enum value; settle cancelled jobs as failed so the old code can read them
+    op.execute("UPDATE image_jobs SET status = 'FAILED' WHERE status = 'CANCELLED'")
+    op.execute("UPDATE video_jobs SET status = 'FAILED' WHERE status = 'CANCELLED'")
+    op.execute("UPDATE rows SET status = 'FAILED' WHERE status = 'CANCELLED'")
+    # Fold the cancelled counters into the failed ones
+    op.execute(
+        "INSERT INTO job_counters (scope, kind, status, count) "
+        "SELECT scope, kind, 'failed', 0 FROM job_counters AS cancelled "
+        "WHERE status = 'cancelled' AND NOT EXISTS ("
+        "SELECT 1 FROM job_counters AS failed WHERE failed.scope = cancelled.scope "
+        "AND failed.kind = cancelled.kind AND failed.status = 'failed')"
+    )
+    op.execute(
+        "UPDATE job_counters SET count = count + ("
+        "SELECT cancelled.count FROM job_counters AS cancelled WHERE cancelled.scope = job_counters.scope "
+        "AND cancelled.kind = job_counters.kind AND cancelled.status = 'cancelled') "
+        "WHERE status = 'failed' AND EXISTS ("
+        "SELECT 1 FROM job_counters AS cancelled WHERE cancelled.scope = job_counters.scope "
+        "AND cancelled.kind = job_counters.kind AND cancelled.status = 'cancelled')"
+    )
+    op.execute("DELETE FROM job_counters WHERE status = 'cancelled'")
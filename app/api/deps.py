@@ -0,0 +1,104 @@
+from typing import Any, AsyncIterator, Callable, Collection, List, Optional, Type
+from uuid import UUID
+
+from fastapi import Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.admission import admission_controller
+from app.services.idempotency import idempotency_service, request_fingerprint
+from app.utils.clients import client_id
+from app.utils.serialization import resolve_fields
+
+
+def field_selection(schema: Type[BaseModel], default_exclude: Collection[str] = ()) -> Callable[..., List[str]]:
+    """
+    Dependency parsing fields= / exclude= into the schema fields to return
+    """
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+        exclude: Optional[str] = Query(None, description="Comma-separated fields to leave out")
+    ) -> List[str]:
+        try:
+            return resolve_fields(schema, fields, exclude, default_exclude)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return dependency
+
+
+class IdempotentRequest:
+    """
+    Idempotency-Key state for one request; replay is set when it was seen before
+    """
+
+    def __init__(self, key: Optional[str] = None, replay: Optional[JSONResponse] = None):
+        self.key = key
+        self.replay = replay
+
+    async def save(self, db: AsyncSession, response: Any, status_code: int = 200) -> None:
+        """
+        Store the response in the same transaction as the work it describes
+        """
+        if self.key:
+            await idempotency_service.save(db, self.key, response, status_code)
+
+
+def idempotent(endpoint: str) -> Callable[..., AsyncIterator[IdempotentRequest]]:
+    """
+    Dependency honouring an Idempotency-Key header on a job-creating endpoint
+    """
+    async def dependency(
+        request: Request,
+        idempotency_key: Optional[str] = Header(None, max_length=255)
+    ) -> AsyncIterator[IdempotentRequest]:
+        if not idempotency_key:
+            yield IdempotentRequest()
+            return
+
+        fingerprint = request_fingerprint(
+            request.method, request.url.path, request.url.query, await request.body()
+        )
+        replay = await idempotency_service.claim(idempotency_key, endpoint, fingerprint)
+        try:
+            yield IdempotentRequest(idempotency_key, replay)
+        except Exception:
+            # Let the client retry a failed request with the same key
+            if replay is None:
+                await idempotency_service.release(idempotency_key)
+            raise
+
+    return dependency
+
+
+def admission_group(request: Request, row_id: Optional[UUID]) -> str:
+    """
+    Who a job counts against for per-row limits: its row, or the calling client
+    """
+    if row_id:
+        return str(row_id)
+    return client_id(request)
+
+
+def within_budget(provider: str) -> Callable[[], None]:
+    """
+    Dependency refusing direct provider calls with 429 once the provider's daily budget is spent
+    """
+    def dependency() -> None:
+        decision = admission_controller.check_budget(provider)
+        if decision:
+            reason, retry_after = decision
+            raise HTTPException(status_code=429, detail=reason, headers={"Retry-After": str(retry_after)})
+
+    return dependency
+
+
+def ensure_admitted(kind: str, group: str) -> None:
+    """
+    Refuse a new job with 429 and Retry-After while this process is saturated
+    """
+    decision = admission_controller.check(kind, group)
+    if decision:
+        reason, retry_after = decision
+        raise HTTPException(status_code=429, detail=reason, headers={"Retry-After": str(retry_after)})
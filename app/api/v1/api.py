@@ -1,9 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import rows, image_jobs, video_jobs
+from app.api.v1.endpoints import rows, image_jobs, video_jobs, stats, search, usage
 
 api_router = APIRouter()
 
 api_router.include_router(rows.router, prefix="/rows", tags=["rows"])
 api_router.include_router(image_jobs.router, prefix="/image-jobs", tags=["image-jobs"])
-api_router.include_router(video_jobs.router, prefix="/video-jobs", tags=["video-jobs"])
\ No newline at end of file
+api_router.include_router(video_jobs.router, prefix="/video-jobs", tags=["video-jobs"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
@@ -1,98 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import asyncio
+import orjson
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
-from datetime import datetime
 
-from app.db.session import get_db
+from app.api.deps import (
+    IdempotentRequest, admission_group, client_id, ensure_admitted, field_selection, idempotent, within_budget
+)
+from app.core.config import settings
+from app.db.job_state import job_state_cache
+from app.db.session import get_db, get_read_db
 from app.models import ImageJob, ImageJobStatus
+from app.models.image_job import IMAGE_MODEL
 from app.schemas import image_job as image_schemas
-from app.services import openai_service
+from app.services import openai_service, image_variant_service, image_preprocess_service
+from app.services.image_variant_service import VARIANT_MEDIA_TYPES
+from app.services.job_cancellation import cancel_jobs, stop_local_work
+from app.services.job_processing import process_image_generation, image_job_key
+from app.services.job_runner import job_runner
+from app.services.prompt_index import prompt_index
+from app.utils import deadline
+from app.utils.serialization import rows_response, schema_columns
+from app.utils.sse import sse_event
 
 router = APIRouter()
 
+list_fields = field_selection(image_schemas.ImageJob, image_schemas.LIST_DEFERRED_FIELDS)
+detail_fields = field_selection(image_schemas.ImageJob)
+# Direct OpenAI calls are refused once the day's OpenAI budget is spent
+openai_budget = within_budget("openai")
 
-async def process_image_generation(job_id: str, db: AsyncSession):
+
+def _variant_jobs(variants: int, **fields) -> List[ImageJob]:
     """
-    Background task to process image generation
+    A single job, or sibling jobs grouped under the first one's id
     """
-    # Get job
-    result = await db.execute(select(ImageJob).where(ImageJob.id == job_id))
-    job = result.scalar_one()
-    
-    try:
-        # Update status to processing
-        job.status = ImageJobStatus.PROCESSING
-        await db.commit()
-        
-        # Generate image
-        image_url = await openai_service.generate_image(job.prompt, job.size)
-        
-        # Update job with result
-        job.image_url = image_url
-        job.status = ImageJobStatus.COMPLETED
-        job.completed_at = datetime.utcnow()
-        
-    except Exception as e:
-        # Update job with error
-        job.status = ImageJobStatus.FAILED
-        job.error_message = str(e)
-    
-    await db.commit()
+    if variants == 1:
+        return [ImageJob(**fields)]
+    group_id = uuid.uuid4()
+    return [
+        ImageJob(
+            id=group_id if index == 0 else uuid.uuid4(),
+            variant_group_id=group_id,
+            variant_index=index,
+            **fields
+        )
+        for index in range(variants)
+    ]
 
 
-@router.get("/", response_model=List[image_schemas.ImageJob])
+@router.get("/", response_model=List[image_schemas.ImageJobPartial])
 async def list_image_jobs(
     skip: int = 0,
     limit: int = 100,
     row_id: Optional[UUID] = None,
     status: Optional[ImageJobStatus] = None,
-    db: AsyncSession = Depends(get_db)
+    variant_group_id: Optional[UUID] = None,
+    fields: List[str] = Depends(list_fields),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    List image jobs with optional filtering
+    List image jobs with optional filtering.
+    Large text fields are left out unless requested with fields=.
     """
-    query = select(ImageJob).offset(skip).limit(limit).order_by(ImageJob.created_at.desc())
+    # Fetch only the selected columns; rows are encoded without schema validation
+    columns = schema_columns(ImageJob, image_schemas.ImageJob, fields)
+    query = select(*columns).offset(skip).limit(limit).order_by(ImageJob.created_at.desc())
     
     if row_id:
         query = query.where(ImageJob.row_id == row_id)
     if status:
         query = query.where(ImageJob.status == status)
+    if variant_group_id:
+        query = query.where(ImageJob.variant_group_id == variant_group_id)
     
     result = await db.execute(query)
-    jobs = result.scalars().all()
     
-    return jobs
+    return rows_response(result)
 
 
 @router.post("/", response_model=image_schemas.ImageJob)
 async def create_image_job(
     job_in: image_schemas.ImageJobCreate,
-    background_tasks: BackgroundTasks,
+    request: Request,
+    idempotency: IdempotentRequest = Depends(idempotent("create_image_job")),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Create a new image generation job
+    Create a new image generation job.
+    With variants > 1, creates that many sibling jobs generated in one
+    upstream call and returns the first; list the rest by variant_group_id.
     """
-    job = ImageJob(**job_in.model_dump())
-    db.add(job)
+    if idempotency.replay:
+        return idempotency.replay
+    
+    match = None
+    if job_in.reuse and job_in.variants == 1:
+        matches = await prompt_index.find_similar(db, job_in.prompt, IMAGE_MODEL, job_in.size, limit=1)
+        match = matches[0] if matches else None
+    
+    # A reused result costs no provider call, so it skips admission
+    group = admission_group(request, job_in.row_id)
+    if match is None:
+        ensure_admitted("image", group)
+    
+    job_data = job_in.model_dump(exclude={"reuse", "variants", "deadline_seconds"})
+    if job_in.reference_image_url:
+        job_data["reference_image_url"] = str(job_in.reference_image_url)
+    job_data["deadline_at"] = deadline.after(job_in.deadline_seconds)
+    jobs = _variant_jobs(job_in.variants, **job_data)
+    job = jobs[0]
+    if match is not None:
+        job.image_url = match.image_url
+        job.reused_from_id = match.job_id
+        job.status = ImageJobStatus.COMPLETED
+        job.completed_at = datetime.utcnow()
+    db.add_all(jobs)
+    await db.flush()
+    await idempotency.save(db, image_schemas.ImageJob.model_validate(job))
     await db.commit()
     await db.refresh(job)
     
-    # Start background processing
-    background_tasks.add_task(process_image_generation, str(job.id), db)
+    # Start background processing; one task generates all of a job's variants
+    if match is None:
+        job_runner.submit(image_job_key(job.id), process_image_generation, job.id, group=group, share=client_id(request))
     
     return job
 
 
-@router.get("/{job_id}", response_model=image_schemas.ImageJob)
+@router.post("/similar", response_model=List[image_schemas.SimilarImageJob])
+async def find_similar_image_jobs(
+    similar_in: image_schemas.SimilarPromptRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Completed image jobs whose prompts are near-identical to the given one,
+    most similar first. Create with reuse=true to take the best match.
+    """
+    matches = await prompt_index.find_similar(
+        db, similar_in.prompt, IMAGE_MODEL, similar_in.size, similar_in.threshold, similar_in.limit
+    )
+    
+    return [asdict(match) for match in matches]
+
+
+@router.get("/{job_id}", response_model=image_schemas.ImageJobPartial)
 async def get_image_job(
+    job_id: UUID,
+    fields: List[str] = Depends(detail_fields),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a specific image job, optionally trimmed with fields= / exclude=.
+    Jobs in flight are answered from the job state cache.
+    """
+    state = job_state_cache.get("image", job_id)
+    if state is None:
+        result = await db.execute(select(*ImageJob.__table__.columns).where(ImageJob.id == job_id))
+        job = result.one_or_none()
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Image job not found")
+        
+        state = job_state_cache.load("image", job._mapping)
+    
+    return ORJSONResponse(state.as_dict(fields))
+
+
+@router.post("/{job_id}/cancel", response_model=image_schemas.ImageJob)
+async def cancel_image_job(
     job_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get a specific image job
+    Cancel a pending or processing image job, stopping its task.
+    Variants are cancelled one at a time; the rest of a group keep going,
+    sharing the one upstream call, and the cancelled job's image is dropped.
     """
     result = await db.execute(select(ImageJob).where(ImageJob.id == job_id))
     job = result.scalar_one_or_none()
@@ -100,19 +189,66 @@ async def get_image_job(
     if not job:
         raise HTTPException(status_code=404, detail="Image job not found")
     
+    if not await cancel_jobs(db, "image", [job_id]):
+        raise HTTPException(status_code=400, detail="Can only cancel pending or processing jobs")
+    await db.commit()
+    await stop_local_work("image", [job_id])
+    
+    await db.refresh(job)
+    
     return job
 
 
+@router.get("/{job_id}/variant")
+async def get_image_job_variant(
+    job_id: UUID,
+    width: int = Query(256, ge=16, le=2048),
+    format: str = Query("webp", pattern="^(webp|jpeg)$"),
+    quality: int = Query(80, ge=1, le=100),
+    source: str = Query("image", pattern="^(image|reference)$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a resized thumbnail of the generated or reference image
+    """
+    column = ImageJob.image_url if source == "image" else ImageJob.reference_image_url
+    result = await db.execute(select(column).where(ImageJob.id == job_id))
+    source_url = result.scalar_one_or_none()
+    
+    if not source_url:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    try:
+        content = await image_variant_service.get_variant(source_url, width, format, quality)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    etag = image_variant_service.cache_key(source_url, width, format, quality)
+    return Response(
+        content=content,
+        media_type=VARIANT_MEDIA_TYPES[format],
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{etag}"'
+        }
+    )
+
+
 @router.post("/{job_id}/rebuild", response_model=image_schemas.ImageJob)
 async def rebuild_image_job(
     job_id: UUID,
     prompt: str,
-    background_tasks: BackgroundTasks,
+    request: Request,
+    variants: int = Query(1, ge=1, le=image_schemas.MAX_VARIANTS),
+    idempotency: IdempotentRequest = Depends(idempotent("rebuild_image_job")),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Create a new image job with updated prompt
+    Create a new image job with updated prompt, or variants sibling jobs
     """
+    if idempotency.replay:
+        return idempotency.replay
+    
     # Get original job
     result = await db.execute(select(ImageJob).where(ImageJob.id == job_id))
     original_job = result.scalar_one_or_none()
@@ -120,25 +256,32 @@ async def rebuild_image_job(
     if not original_job:
         raise HTTPException(status_code=404, detail="Image job not found")
     
+    group = admission_group(request, original_job.row_id)
+    ensure_admitted("image", group)
+    
     # Create new job
-    new_job = ImageJob(
+    new_jobs = _variant_jobs(
+        variants,
         row_id=original_job.row_id,
         prompt=prompt,
         reference_image_url=original_job.reference_image_url,
         size=original_job.size,
         model=original_job.model
     )
-    db.add(new_job)
+    new_job = new_jobs[0]
+    db.add_all(new_jobs)
+    await db.flush()
+    await idempotency.save(db, image_schemas.ImageJob.model_validate(new_job))
     await db.commit()
     await db.refresh(new_job)
     
     # Start background processing
-    background_tasks.add_task(process_image_generation, str(new_job.id), db)
+    job_runner.submit(image_job_key(new_job.id), process_image_generation, new_job.id, group=group, share=client_id(request), priority="interactive")
     
     return new_job
 
 
-@router.post("/analyze", response_model=image_schemas.ImageAnalyzeResponse)
+@router.post("/analyze", response_model=image_schemas.ImageAnalyzeResponse, dependencies=[Depends(openai_budget)])
 async def analyze_image(
     request: image_schemas.ImageAnalyzeRequest
 ):
@@ -146,13 +289,144 @@ async def analyze_image(
     Analyze an image and generate YAML description
     """
     try:
-        result = await openai_service.analyze_image(str(request.image_url))
+        image_url, detail = await image_preprocess_service.prepare_for_vision(str(request.image_url))
+        result = await openai_service.analyze_image(image_url, detail=detail)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/yaml-to-prompt", response_model=image_schemas.YamlToPromptResponse)
+async def _analyze_one(index: int, image_url: str) -> dict:
+    try:
+        url, detail = await image_preprocess_service.prepare_for_vision(image_url)
+        result = await openai_service.analyze_image(url, detail=detail)
+        return {"index": index, "image_url": image_url, **result}
+    except Exception as e:
+        return {"index": index, "image_url": image_url, "error": str(e)}
+
+
+async def _stream_analyses(image_urls: List[str]) -> AsyncIterator[bytes]:
+    """
+    Yield one NDJSON line per image, in completion order
+    """
+    slots = asyncio.Semaphore(settings.OPENAI_VISION_CONCURRENCY)
+    
+    async def bounded(index: int, image_url: str) -> dict:
+        async with slots:
+            return await _analyze_one(index, image_url)
+    
+    tasks = [asyncio.create_task(bounded(i, url)) for i, url in enumerate(image_urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield orjson.dumps(await next_done) + b"\n"
+    finally:
+        # Stop outstanding calls if the client goes away
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/analyze/batch", dependencies=[Depends(openai_budget)])
+async def analyze_images_batch(
+    request: image_schemas.ImageAnalyzeBatchRequest
+):
+    """
+    Analyze many images concurrently, streaming each result as an NDJSON line
+    ({index, image_url, yaml, preview} or {index, image_url, error}) as it finishes
+    """
+    image_urls = [str(url) for url in request.image_urls]
+    return StreamingResponse(_stream_analyses(image_urls), media_type="application/x-ndjson")
+
+
+async def _stream_analysis(image_url: str, result: dict) -> AsyncIterator[bytes]:
+    """
+    Stream YAML tokens, then an analysis event with the full YAML and preview.
+    The YAML is also left in result for a following stage.
+    """
+    url, detail = await image_preprocess_service.prepare_for_vision(image_url)
+    parts = []
+    async for token in openai_service.stream_analyze_image(url, detail=detail):
+        parts.append(token)
+        yield sse_event("token", {"stage": "analysis", "text": token})
+    
+    result["yaml"] = "".join(parts)
+    yield sse_event("analysis", {
+        "yaml": result["yaml"],
+        "preview": openai_service.extract_preview(result["yaml"])
+    })
+
+
+async def _stream_prompt(yaml_content: str) -> AsyncIterator[bytes]:
+    """
+    Stream prompt tokens, then a prompt event with the full prompt
+    """
+    parts = []
+    async for token in openai_service.stream_yaml_to_prompt(yaml_content):
+        parts.append(token)
+        yield sse_event("token", {"stage": "prompt", "text": token})
+    
+    yield sse_event("prompt", {"prompt": "".join(parts)})
+
+
+async def _sse(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Forward a stream of events, ending with a done or error event
+    """
+    try:
+        async for chunk in stream:
+            yield chunk
+        yield sse_event("done", {})
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+
+
+def _event_stream(stream: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/stream", dependencies=[Depends(openai_budget)])
+async def analyze_image_stream(
+    request: image_schemas.ImageAnalyzeRequest
+):
+    """
+    Analyze an image, streaming the YAML as server-sent events:
+    token events as it is generated, then an analysis event with yaml and preview
+    """
+    return _event_stream(_stream_analysis(str(request.image_url), {}))
+
+
+@router.post("/yaml-to-prompt/stream", dependencies=[Depends(openai_budget)])
+async def yaml_to_prompt_stream(
+    request: image_schemas.YamlToPromptRequest
+):
+    """
+    Convert YAML to a prompt, streaming token events and a final prompt event
+    """
+    return _event_stream(_stream_prompt(request.yaml))
+
+
+@router.post("/analyze-to-prompt/stream", dependencies=[Depends(openai_budget)])
+async def analyze_to_prompt_stream(
+    request: image_schemas.ImageAnalyzeRequest
+):
+    """
+    Analyze an image and turn the YAML into a prompt in one stream.
+    The prompt call starts as soon as the YAML is complete.
+    """
+    async def stages() -> AsyncIterator[bytes]:
+        result = {}
+        async for chunk in _stream_analysis(str(request.image_url), result):
+            yield chunk
+        async for chunk in _stream_prompt(result["yaml"]):
+            yield chunk
+    
+    return _event_stream(stages())
+
+
+@router.post("/yaml-to-prompt", response_model=image_schemas.YamlToPromptResponse, dependencies=[Depends(openai_budget)])
 async def yaml_to_prompt(
     request: image_schemas.YamlToPromptRequest
 ):
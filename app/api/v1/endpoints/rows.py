@@ -1,22 +1,92 @@
+from collections import defaultdict
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import func, select
+from typing import Dict, List, Optional, Sequence, Set, Union
 from uuid import UUID
 
-from app.db.session import get_db
-from app.models import Row
-from app.schemas import row as row_schemas
+from app.db.job_counters import read_counts
+from app.db.session import get_db, get_read_db
+from app.models import ImageJob, Row, VideoJob
+from app.schemas import image_job as image_schemas, row as row_schemas, video_job as video_schemas
+from app.schemas.stats import JobCounts
+from app.services import job_cancellation
+from app.utils.serialization import schema_columns
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[row_schemas.Row])
+async def _job_counts(db: AsyncSession, row_ids: Sequence[UUID]) -> Dict[UUID, JobCounts]:
+    """
+    Job counts by status for each row, read from the maintained counters
+    """
+    counts = await read_counts(db, [str(row_id) for row_id in row_ids])
+    return {row_id: JobCounts(**counts[str(row_id)]) for row_id in row_ids}
+
+
+async def _recent_jobs(
+    db: AsyncSession,
+    model,
+    schema,
+    deferred: Set[str],
+    row_ids: Sequence[UUID],
+    per_row: int
+) -> Dict[UUID, List[dict]]:
+    """
+    Each row's per_row newest jobs of one kind, list columns only, in one query
+    """
+    columns = schema_columns(model, schema, [name for name in schema.model_fields if name not in deferred])
+    place = func.row_number().over(
+        partition_by=model.row_id, order_by=(model.created_at.desc(), model.id)
+    ).label("place")
+    ranked = select(*columns, place).where(model.row_id.in_(row_ids)).subquery()
+    result = await db.execute(
+        select(*(ranked.c[column.key] for column in columns))
+        .where(ranked.c.place <= per_row)
+        .order_by(ranked.c.row_id, ranked.c.place)
+    )
+    
+    jobs: Dict[UUID, List[dict]] = defaultdict(list)
+    for job in result:
+        jobs[job.row_id].append(job._asdict())
+    return jobs
+
+
+async def _load_full_rows(db: AsyncSession, query, jobs_limit: int) -> List[row_schemas.RowFull]:
+    """
+    Load rows with their most recent jobs and job counts in a fixed number of queries
+    """
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    row_ids = [row.id for row in rows]
+    counts = await _job_counts(db, row_ids)
+    image_jobs = await _recent_jobs(
+        db, ImageJob, image_schemas.ImageJob, image_schemas.LIST_DEFERRED_FIELDS, row_ids, jobs_limit
+    )
+    video_jobs = await _recent_jobs(
+        db, VideoJob, video_schemas.VideoJob, video_schemas.LIST_DEFERRED_FIELDS, row_ids, jobs_limit
+    )
+    
+    return [
+        row_schemas.RowFull(
+            **row_schemas.Row.model_validate(row).model_dump(),
+            image_jobs=image_jobs.get(row.id, []),
+            video_jobs=video_jobs.get(row.id, []),
+            job_counts=counts[row.id],
+        )
+        for row in rows
+    ]
+
+
+# Unset fields are dropped so jobs leave out their deferred columns, as in job listings
+@router.get("/", response_model=List[Union[row_schemas.Row, row_schemas.RowFull]], response_model_exclude_unset=True)
 async def list_rows(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    expand: Optional[str] = Query(None, pattern="^jobs$", description="Set to jobs to include each row's jobs and job counts"),
+    jobs_limit: int = Query(row_schemas.ROW_JOBS_LIMIT, ge=1, le=row_schemas.MAX_ROW_JOBS_LIMIT),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all rows with optional filtering
@@ -26,6 +96,9 @@ async def list_rows(
     if status:
         query = query.where(Row.status == status)
     
+    if expand:
+        return await _load_full_rows(db, query, jobs_limit)
+    
     result = await db.execute(query)
     rows = result.scalars().all()
     
@@ -51,7 +124,7 @@ async def create_row(
 @router.get("/{row_id}", response_model=row_schemas.Row)
 async def get_row(
     row_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific row by ID
@@ -65,6 +138,24 @@ async def get_row(
     return row
 
 
+@router.get("/{row_id}/full", response_model=row_schemas.RowFull, response_model_exclude_unset=True)
+async def get_row_full(
+    row_id: UUID,
+    jobs_limit: int = Query(row_schemas.ROW_JOBS_LIMIT, ge=1, le=row_schemas.MAX_ROW_JOBS_LIMIT),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a row with its most recent image and video jobs (up to jobs_limit of
+    each, without large text fields) and job counts by status
+    """
+    rows = await _load_full_rows(db, select(Row).where(Row.id == row_id), jobs_limit)
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail="Row not found")
+    
+    return rows[0]
+
+
 @router.patch("/{row_id}", response_model=row_schemas.Row)
 async def update_row(
     row_id: UUID,
@@ -91,6 +182,26 @@ async def update_row(
     return row
 
 
+@router.post("/{row_id}/cancel")
+async def cancel_row_jobs(
+    row_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel every pending or processing image and video job of a row
+    """
+    result = await db.execute(select(Row.id).where(Row.id == row_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Row not found")
+    
+    cancelled = await job_cancellation.cancel_row_jobs(db, row_id)
+    await db.commit()
+    for kind, job_ids in cancelled.items():
+        await job_cancellation.stop_local_work(kind, job_ids)
+    
+    return {"cancelled": {kind: len(job_ids) for kind, job_ids in cancelled.items()}}
+
+
 @router.delete("/{row_id}")
 async def delete_row(
     row_id: UUID,
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.search import SEARCH_TARGETS, search
+from app.db.session import get_read_db
+from app.schemas.search import SearchHit
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SearchHit])
+async def search_jobs_and_rows(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find; all must match (PostgreSQL also takes \"phrases\", or, -word)"),
+    types: Optional[str] = Query(None, description="Comma-separated: image_job, video_job, row (default all)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Search image job prompts and YAML, video motion prompts and row titles and
+    descriptions, best matches first
+    """
+    selected = [name.strip() for name in (types or ",".join(SEARCH_TARGETS)).split(",") if name.strip()]
+    unknown = set(selected) - set(SEARCH_TARGETS)
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(sorted(unknown))}")
+    
+    return await search(db, q, selected, limit, offset)
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+
+from app.db.job_counters import GLOBAL_SCOPE, read_counts
+from app.db.job_events import stage_latencies
+from app.db.session import get_read_db
+from app.schemas.stats import JobCounts, StageLatency
+from app.services.admission import admission_controller
+
+router = APIRouter()
+
+
+@router.get("/", response_model=JobCounts)
+async def get_stats(
+    row_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Job counts by status, overall or for one row, read from the maintained counters
+    """
+    scope = str(row_id) if row_id else GLOBAL_SCOPE
+    counts = await read_counts(db, [scope])
+    
+    return counts[scope]
+
+
+@router.get("/queue")
+async def get_queue():
+    """
+    This process's job queue depth, limits, provider breaker state and scheduler wait times
+    """
+    return admission_controller.snapshot()
+
+
+@router.get("/latency", response_model=List[StageLatency])
+async def get_latency(
+    kind: str = Query("video", pattern="^(image|video)$"),
+    since_minutes: int = Query(60, ge=1, le=60 * 24 * 30),
+    bucket_minutes: int = Query(60, ge=1, le=60 * 24 * 30),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    p50/p95/p99 seconds per job stage (queue, claim, submit or generate, render,
+    poll_delay, end_to_end) in bucket_minutes windows, from the job event log
+    """
+    since = datetime.utcnow() - timedelta(minutes=since_minutes)
+    return await stage_latencies(db, kind, since, bucket_minutes * 60)
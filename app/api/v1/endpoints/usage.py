@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+
+from app.db.session import get_read_db
+from app.db.usage import GLOBAL_SCOPE, read_usage
+from app.schemas.usage import ProviderBudget, UsageEntry
+from app.services.usage_ledger import usage_ledger
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[UsageEntry])
+async def get_usage(
+    days: int = Query(7, ge=1, le=366),
+    provider: Optional[str] = Query(None, pattern="^(openai|kling)$"),
+    row_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Provider calls, tokens, images, video seconds and estimated cost per day
+    and operation over the last days (today included), overall or for one row
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    scope = str(row_id) if row_id else GLOBAL_SCOPE
+    return await read_usage(db, since, scope, provider)
+
+
+@router.get("/budgets", response_model=List[ProviderBudget])
+async def get_budgets():
+    """
+    Today's spend against each provider's daily budget, and the throttling state it puts jobs in
+    """
+    return list(usage_ledger.snapshot().values())
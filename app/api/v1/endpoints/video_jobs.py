@@ -1,91 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
-import asyncio
 
-from app.db.session import get_db
-from app.models import VideoJob, VideoJobStatus, VideoModel
+from app.api.deps import IdempotentRequest, admission_group, client_id, ensure_admitted, field_selection, idempotent
+from app.db.job_state import job_state_cache
+from app.db.session import get_db, get_read_db
+from app.models import VideoJob, VideoJobStatus
 from app.schemas import video_job as video_schemas
-from app.services import kling_service
+from app.services.job_cancellation import cancel_jobs, stop_local_work
+from app.services.job_processing import process_video_generation, video_job_key
+from app.services.job_runner import job_runner
+from app.utils import deadline
+from app.utils.serialization import rows_response, schema_columns
 
 router = APIRouter()
 
+list_fields = field_selection(video_schemas.VideoJob, video_schemas.LIST_DEFERRED_FIELDS)
+detail_fields = field_selection(video_schemas.VideoJob)
 
-async def process_video_generation(job_id: str, db: AsyncSession):
-    """
-    Background task to process video generation
-    """
-    # Get job
-    result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
-    job = result.scalar_one()
-    
-    try:
-        # Update status to processing
-        job.status = VideoJobStatus.PROCESSING
-        await db.commit()
-        
-        if job.model == VideoModel.KLING:
-            # Create KLING task
-            task_result = await kling_service.create_video_task(
-                job.source_image_url,
-                job.motion_prompt,
-                job.duration
-            )
-            
-            # Store external task ID
-            job.external_task_id = task_result["task_id"]
-            await db.commit()
-            
-            # Poll for completion
-            max_attempts = 30  # 5 minutes with 10-second intervals
-            for attempt in range(max_attempts):
-                status = await kling_service.check_task_status(job.external_task_id)
-                
-                # Update progress
-                job.progress = status["progress"]
-                await db.commit()
-                
-                if status["status"] == "completed":
-                    job.video_url = status["video_url"]
-                    job.status = VideoJobStatus.COMPLETED
-                    job.completed_at = datetime.utcnow()
-                    break
-                elif status["status"] == "failed":
-                    raise Exception(status.get("error", "Video generation failed"))
-                
-                # Wait before next check
-                await asyncio.sleep(10)
-            else:
-                raise Exception("Timeout waiting for video generation")
-        
-        else:
-            # TODO: Implement Veo integration
-            raise Exception(f"Model {job.model} not implemented yet")
-        
-    except Exception as e:
-        # Update job with error
-        job.status = VideoJobStatus.FAILED
-        job.error_message = str(e)
-    
-    await db.commit()
 
-
-@router.get("/", response_model=List[video_schemas.VideoJob])
+@router.get("/", response_model=List[video_schemas.VideoJobPartial])
 async def list_video_jobs(
     skip: int = 0,
     limit: int = 100,
     row_id: Optional[UUID] = None,
     image_job_id: Optional[UUID] = None,
     status: Optional[VideoJobStatus] = None,
-    db: AsyncSession = Depends(get_db)
+    fields: List[str] = Depends(list_fields),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    List video jobs with optional filtering
+    List video jobs with optional filtering.
+    Large text fields are left out unless requested with fields=.
     """
-    query = select(VideoJob).offset(skip).limit(limit).order_by(VideoJob.created_at.desc())
+    # Fetch only the selected columns; rows are encoded without schema validation
+    columns = schema_columns(VideoJob, video_schemas.VideoJob, fields)
+    query = select(*columns).offset(skip).limit(limit).order_by(VideoJob.created_at.desc())
     
     if row_id:
         query = query.where(VideoJob.row_id == row_id)
@@ -95,52 +48,69 @@ async def list_video_jobs(
         query = query.where(VideoJob.status == status)
     
     result = await db.execute(query)
-    jobs = result.scalars().all()
     
-    return jobs
+    return rows_response(result)
 
 
 @router.post("/", response_model=video_schemas.VideoJob)
 async def create_video_job(
     job_in: video_schemas.VideoJobCreate,
-    background_tasks: BackgroundTasks,
+    request: Request,
+    idempotency: IdempotentRequest = Depends(idempotent("create_video_job")),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new video generation job
     """
-    job = VideoJob(**job_in.model_dump())
+    if idempotency.replay:
+        return idempotency.replay
+    
+    group = admission_group(request, job_in.row_id)
+    ensure_admitted("video", group)
+    
+    job_data = job_in.model_dump(exclude={"deadline_seconds"})
+    job_data["source_image_url"] = str(job_in.source_image_url)
+    job_data["deadline_at"] = deadline.after(job_in.deadline_seconds)
+    job = VideoJob(**job_data)
     db.add(job)
+    await db.flush()
+    await idempotency.save(db, video_schemas.VideoJob.model_validate(job))
     await db.commit()
     await db.refresh(job)
     
     # Start background processing
-    background_tasks.add_task(process_video_generation, str(job.id), db)
+    job_runner.submit(video_job_key(job.id), process_video_generation, job.id, group=group, share=client_id(request))
     
     return job
 
 
-@router.get("/{job_id}", response_model=video_schemas.VideoJob)
+@router.get("/{job_id}", response_model=video_schemas.VideoJobPartial)
 async def get_video_job(
     job_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    fields: List[str] = Depends(detail_fields),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get a specific video job
+    Get a specific video job, optionally trimmed with fields= / exclude=.
+    Jobs in flight are answered from the job state cache.
     """
-    result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(status_code=404, detail="Video job not found")
+    state = job_state_cache.get("video", job_id)
+    if state is None:
+        result = await db.execute(select(*VideoJob.__table__.columns).where(VideoJob.id == job_id))
+        job = result.one_or_none()
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Video job not found")
+        
+        state = job_state_cache.load("video", job._mapping)
     
-    return job
+    return ORJSONResponse(state.as_dict(fields))
 
 
 @router.get("/external/{external_task_id}", response_model=video_schemas.VideoJob)
 async def get_video_job_by_external_id(
     external_task_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a video job by external task ID (e.g., KLING task ID)
@@ -159,28 +129,70 @@ async def get_video_job_by_external_id(
 @router.post("/{job_id}/retry", response_model=video_schemas.VideoJob)
 async def retry_video_job(
     job_id: UUID,
-    background_tasks: BackgroundTasks,
+    request: Request,
+    idempotency: IdempotentRequest = Depends(idempotent("retry_video_job")),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retry a failed video job
+    Retry a failed or cancelled video job
     """
+    if idempotency.replay:
+        return idempotency.replay
+    
     result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
     job = result.scalar_one_or_none()
     
     if not job:
         raise HTTPException(status_code=404, detail="Video job not found")
     
-    if job.status != VideoJobStatus.FAILED:
-        raise HTTPException(status_code=400, detail="Can only retry failed jobs")
+    if job.status not in (VideoJobStatus.FAILED, VideoJobStatus.CANCELLED):
+        raise HTTPException(status_code=400, detail="Can only retry failed or cancelled jobs")
+    
+    group = admission_group(request, job.row_id)
+    ensure_admitted("video", group)
     
     # Reset job status
     job.status = VideoJobStatus.PENDING
     job.error_message = None
     job.progress = 0
+    # The old deadline has likely passed; a retry runs without one
+    job.deadline_at = None
+    # Forget the previous attempt's KLING task, so it is neither polled nor
+    # mistaken for a submitted job by the reconciler
+    job.external_task_id = None
+    job.submitted_at = None
+    job.video_url = None
+    await db.flush()
+    await idempotency.save(db, video_schemas.VideoJob.model_validate(job))
     await db.commit()
     
     # Start background processing
-    background_tasks.add_task(process_video_generation, str(job.id), db)
+    job_runner.submit(video_job_key(job.id), process_video_generation, job.id, group=group, share=client_id(request), priority="interactive")
+    
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=video_schemas.VideoJob)
+async def cancel_video_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel a pending or processing video job.
+    Its task is stopped and it is no longer polled; a task already
+    submitted to KLING is left to finish there.
+    """
+    result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Video job not found")
     
-    return job
\ No newline at end of file
+    if not await cancel_jobs(db, "video", [job_id]):
+        raise HTTPException(status_code=400, detail="Can only cancel pending or processing jobs")
+    await db.commit()
+    await stop_local_work("video", [job_id])
+    
+    await db.refresh(job)
+    
+    return job
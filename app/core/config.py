@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
 from typing import List, Optional, Dict, Any, Union
+from functools import lru_cache
 import secrets
 import json
 
@@ -15,13 +16,21 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(default="sqlite+aiosqlite:///./app.db", env="DATABASE_URL")
     
-    @validator("DATABASE_URL", pre=True)
-    def validate_database_url(cls, v: str) -> str:
-        if v.startswith("sqlite"):
+    # Optional read replica for read-only endpoints
+    DATABASE_READ_URL: Optional[str] = Field(default=None, env="DATABASE_READ_URL")
+    # Clients read from the primary for this long after their own writes
+    READ_YOUR_WRITES_SECONDS: float = Field(default=5.0, env="READ_YOUR_WRITES_SECONDS")
+    
+    @validator("DATABASE_URL", "DATABASE_READ_URL", pre=True)
+    def validate_database_url(cls, v: Optional[str]) -> Optional[str]:
+        if v and v.startswith("sqlite://"):
             # For SQLite, convert to async URL
-            return v.replace("sqlite://", "sqlite+aiosqlite://")
+            return v.replace("sqlite://", "sqlite+aiosqlite://", 1)
         return v
     
+    # Apply pending migrations at startup instead of refusing to start
+    DB_AUTO_MIGRATE: bool = Field(default=False, env="DB_AUTO_MIGRATE")
+    
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     
@@ -52,6 +61,71 @@ class Settings(BaseSettings):
     KLING_ACCESS_KEY: str = Field(..., env="KLING_ACCESS_KEY")
     KLING_SECRET_KEY: str = Field(..., env="KLING_SECRET_KEY")
     
+    # Provider endpoints (overridable to point at local fakes for benchmarks)
+    OPENAI_BASE_URL: str = Field(default="https://api.openai.com/v1", env="OPENAI_BASE_URL")
+    OPENAI_VISION_CONCURRENCY: int = Field(default=8, env="OPENAI_VISION_CONCURRENCY")
+    KLING_BASE_URL: str = Field(default="https://api-singapore.klingai.com/v1", env="KLING_BASE_URL")
+    KLING_POLL_INTERVAL_SECONDS: float = Field(default=10.0, env="KLING_POLL_INTERVAL_SECONDS")
+    VIDEO_JOB_TIMEOUT_SECONDS: int = Field(default=300, env="VIDEO_JOB_TIMEOUT_SECONDS")
+    VIDEO_POLL_CONCURRENCY: int = Field(default=20, env="VIDEO_POLL_CONCURRENCY")
+    # Duplicate KLING calls slower than their rolling p95, within a budget of extra calls
+    KLING_HEDGING_ENABLED: bool = Field(default=False, env="KLING_HEDGING_ENABLED")
+    KLING_HEDGE_BUDGET: float = Field(default=0.05, env="KLING_HEDGE_BUDGET")
+    KLING_HEDGE_MIN_DELAY_SECONDS: float = Field(default=1.0, env="KLING_HEDGE_MIN_DELAY_SECONDS")
+    
+    # Multi-worker coordination
+    WORKER_HEARTBEAT_INTERVAL_SECONDS: float = Field(default=5.0, env="WORKER_HEARTBEAT_INTERVAL_SECONDS")
+    WORKER_NODE_TTL_SECONDS: float = Field(default=20.0, env="WORKER_NODE_TTL_SECONDS")
+    JOB_LEASE_TTL_SECONDS: float = Field(default=60.0, env="JOB_LEASE_TTL_SECONDS")
+    JOB_RECOVERY_INTERVAL_SECONDS: float = Field(default=60.0, env="JOB_RECOVERY_INTERVAL_SECONDS")
+    JOB_RECOVERY_GRACE_SECONDS: float = Field(default=60.0, env="JOB_RECOVERY_GRACE_SECONDS")
+    SHUTDOWN_DRAIN_SECONDS: float = Field(default=20.0, env="SHUTDOWN_DRAIN_SECONDS")
+    # How often each node looks for jobs it is working on that were cancelled elsewhere
+    JOB_CANCEL_CHECK_SECONDS: float = Field(default=2.0, env="JOB_CANCEL_CHECK_SECONDS")
+    
+    # Admission control (per process)
+    IMAGE_JOB_CONCURRENCY: int = Field(default=8, env="IMAGE_JOB_CONCURRENCY")
+    VIDEO_JOB_CONCURRENCY: int = Field(default=8, env="VIDEO_JOB_CONCURRENCY")
+    IMAGE_JOB_QUEUE_LIMIT: int = Field(default=200, env="IMAGE_JOB_QUEUE_LIMIT")
+    VIDEO_JOB_QUEUE_LIMIT: int = Field(default=500, env="VIDEO_JOB_QUEUE_LIMIT")
+    ROW_JOB_QUEUE_LIMIT: int = Field(default=50, env="ROW_JOB_QUEUE_LIMIT")
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(default=5, env="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    CIRCUIT_BREAKER_RESET_SECONDS: float = Field(default=30.0, env="CIRCUIT_BREAKER_RESET_SECONDS")
+    
+    # Job scheduling: interactive (rebuild/retry) vs bulk (create) share of slots
+    SCHEDULER_INTERACTIVE_WEIGHT: float = Field(default=10.0, env="SCHEDULER_INTERACTIVE_WEIGHT")
+    SCHEDULER_BULK_WEIGHT: float = Field(default=1.0, env="SCHEDULER_BULK_WEIGHT")
+    SCHEDULER_MAX_WAIT_SECONDS: float = Field(default=300.0, env="SCHEDULER_MAX_WAIT_SECONDS")
+    
+    # In-process cache of in-flight job state, for status polls
+    JOB_STATE_MAX_AGE_SECONDS: float = Field(default=5.0, env="JOB_STATE_MAX_AGE_SECONDS")
+    JOB_STATE_TERMINAL_TTL_SECONDS: float = Field(default=30.0, env="JOB_STATE_TERMINAL_TTL_SECONDS")
+    JOB_STATE_MAX_ENTRIES: int = Field(default=10000, env="JOB_STATE_MAX_ENTRIES")
+    
+    # Reuse of completed image results for near-identical prompts (MinHash similarity)
+    PROMPT_REUSE_THRESHOLD: float = Field(default=0.9, env="PROMPT_REUSE_THRESHOLD")
+    PROMPT_REUSE_MAX_CANDIDATES: int = Field(default=50, env="PROMPT_REUSE_MAX_CANDIDATES")
+    PROMPT_INDEX_BACKFILL_BATCH_SIZE: int = Field(default=500, env="PROMPT_INDEX_BACKFILL_BATCH_SIZE")
+    
+    # Job event log
+    JOB_EVENT_FLUSH_SECONDS: float = Field(default=1.0, env="JOB_EVENT_FLUSH_SECONDS")
+    JOB_EVENT_BATCH_SIZE: int = Field(default=500, env="JOB_EVENT_BATCH_SIZE")
+    JOB_EVENT_RETENTION_DAYS: int = Field(default=30, env="JOB_EVENT_RETENTION_DAYS")
+    
+    # Provider usage ledger and daily budgets (USD, estimated from list prices; unset = unlimited)
+    OPENAI_DAILY_BUDGET_USD: Optional[float] = Field(default=None, env="OPENAI_DAILY_BUDGET_USD")
+    KLING_DAILY_BUDGET_USD: Optional[float] = Field(default=None, env="KLING_DAILY_BUDGET_USD")
+    # Past this share of a budget, bulk jobs are slowed down
+    USAGE_SOFT_BUDGET_RATIO: float = Field(default=0.8, env="USAGE_SOFT_BUDGET_RATIO")
+    USAGE_SOFT_MAX_DELAY_SECONDS: float = Field(default=30.0, env="USAGE_SOFT_MAX_DELAY_SECONDS")
+    USAGE_FLUSH_SECONDS: float = Field(default=2.0, env="USAGE_FLUSH_SECONDS")
+    USAGE_BATCH_SIZE: int = Field(default=500, env="USAGE_BATCH_SIZE")
+    
+    # Idempotency keys
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = Field(default=86400, env="IDEMPOTENCY_KEY_TTL_SECONDS")
+    IDEMPOTENCY_LOCK_SECONDS: int = Field(default=60, env="IDEMPOTENCY_LOCK_SECONDS")
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = Field(default=3600.0, env="IDEMPOTENCY_PURGE_INTERVAL_SECONDS")
+    
     # Google Sheets
     GOOGLE_SHEETS_CREDENTIALS_JSON: Optional[str] = Field(None, env="GOOGLE_SHEETS_CREDENTIALS_JSON")
     GOOGLE_SHEETS_SPREADSHEET_ID: Optional[str] = Field(None, env="GOOGLE_SHEETS_SPREADSHEET_ID")
@@ -59,6 +133,21 @@ class Settings(BaseSettings):
     # Storage
     UPLOAD_DIR: str = Field(default="./uploads", env="UPLOAD_DIR")
     MAX_FILE_SIZE: int = Field(default=20 * 1024 * 1024, env="MAX_FILE_SIZE")  # 20MB
+    # Client-supplied image URLs may only point at public addresses unless this is set
+    IMAGE_FETCH_ALLOW_PRIVATE: bool = Field(default=False, env="IMAGE_FETCH_ALLOW_PRIVATE")
+    IMAGE_FETCH_MAX_REDIRECTS: int = Field(default=5, env="IMAGE_FETCH_MAX_REDIRECTS")
+    
+    # Image processing
+    IMAGE_CACHE_DIR: str = Field(default="./cache/images", env="IMAGE_CACHE_DIR")
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024, env="IMAGE_VARIANT_CACHE_MAX_BYTES")  # 512MB
+    IMAGE_WORKER_PROCESSES: int = Field(default=2, env="IMAGE_WORKER_PROCESSES")
+    IMAGE_PREPROCESS_CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024, env="IMAGE_PREPROCESS_CACHE_MAX_BYTES")  # 256MB
+    IMAGE_PREPROCESS_QUALITY: int = Field(default=90, env="IMAGE_PREPROCESS_QUALITY")
+    KLING_IMAGE_MAX_DIMENSION: int = Field(default=1920, env="KLING_IMAGE_MAX_DIMENSION")
+    KLING_IMAGE_MAX_BYTES: int = Field(default=10 * 1024 * 1024, env="KLING_IMAGE_MAX_BYTES")  # 10MB
+    VISION_IMAGE_MAX_DIMENSION: int = Field(default=2048, env="VISION_IMAGE_MAX_DIMENSION")
+    VISION_IMAGE_MAX_SHORT_SIDE: int = Field(default=768, env="VISION_IMAGE_MAX_SHORT_SIDE")
+    VISION_LOW_DETAIL_MAX_DIMENSION: int = Field(default=512, env="VISION_LOW_DETAIL_MAX_DIMENSION")
     
     # Celery
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
@@ -69,4 +158,17 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    Build settings once, on first use
+    """
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    # Defer reading the environment until settings are actually needed, so
+    # tools that only import models or schemas skip it
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,38 @@
+import logging
+import time
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Record how long each startup phase takes, from module import to serving
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._last = self.started
+        self.ready = False
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "total_ms": round((self._last - self.started) * 1000, 1),
+            "phases": {name: round(seconds * 1000, 1) for name, seconds in self.phases},
+        }
+
+    def finish(self) -> None:
+        self.ready = True
+        report = self.report()
+        phases = ", ".join(f"{name}={ms}ms" for name, ms in report["phases"].items())
+        logger.info(f"Startup completed in {report['total_ms']}ms ({phases})")
+
+
+startup_timer = StartupTimer()
@@ -1,18 +1,77 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import logging
+import os
+from typing import Optional
 
-from app.db.base_class import Base
+from sqlalchemy import text
+
+from app.core.config import settings
 from app.db.session import engine
-from app.models import *  # Import all models
 
 logger = logging.getLogger(__name__)
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "alembic"))
+    # Keep the app's logging setup when migrating from inside the app
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def get_head_revision() -> str:
+    """
+    Read the latest migration revision from the migration scripts
+    """
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+async def get_current_revision() -> Optional[str]:
+    """
+    Read the database's migration revision, or None if it has never been migrated
+    """
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except Exception:
+            return None
+        return result.scalar_one_or_none()
+
+
+def run_migrations(revision: str = "head") -> None:
+    """
+    Upgrade the database to the given revision
+    """
+    from alembic import command
+
+    command.upgrade(_alembic_config(), revision)
+
 
 async def init_db() -> None:
     """
-    Create database tables
+    Check that the database schema is at the latest migration
     """
-    async with engine.begin() as conn:
-        # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
\ No newline at end of file
+    head, current = await asyncio.gather(
+        asyncio.to_thread(get_head_revision),
+        get_current_revision()
+    )
+
+    if current == head:
+        logger.info(f"Database schema at head ({head})")
+        return
+
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at {current or 'no revision'}, expected {head}. "
+            "Run 'alembic upgrade head' (or set DB_AUTO_MIGRATE=true)."
+        )
+
+    logger.info(f"Migrating database schema from {current or 'empty'} to {head}")
+    # Alembic runs its own event loop, so keep it off this one
+    await asyncio.to_thread(run_migrations)
@@ -0,0 +1,251 @@
+"""
+Job counts by status, per row and overall.
+
+Counters are adjusted in the same transaction as the job change: ORM
+inserts, status changes and deletes through a session flush hook, and
+Core UPDATEs (status claims) through record_transition. Each touched row's
+status is rolled up from its counters at the same time.
+
+The overall counts are spread over GLOBAL_SHARDS rows per kind and status,
+each transaction adding to one picked at random, so concurrent job changes
+do not all queue on the same row lock; reads add the shards up.
+"""
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, event, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+
+from app.db.job_events import note_status
+from app.db.job_state import note_state
+from app.models import ImageJob, ImageJobStatus, JobCounter, Row, RowStatus, VideoJob, VideoJobStatus
+
+GLOBAL_SCOPE = "global"
+
+GLOBAL_SHARDS = 16
+
+JOB_KINDS = {ImageJob: "image", VideoJob: "video"}
+
+KIND_STATUSES = {"image": ImageJobStatus, "video": VideoJobStatus}
+
+CounterKey = Tuple[str, str, str]
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def _add(deltas: Counter, kind: str, row_id: Optional[UUID], status, amount: int) -> None:
+    status = _status_value(status)
+    if status is None:
+        return
+    deltas[(GLOBAL_SCOPE, kind, status)] += amount
+    if row_id is not None:
+        deltas[(str(row_id), kind, status)] += amount
+
+
+def _upsert(connection, deltas: Dict[CounterKey, int], batch_size: int = 500) -> None:
+    dialect = sqlite if connection.dialect.name == "sqlite" else postgresql
+    # Sorted so concurrent transactions lock counter rows in the same order
+    values = [
+        {"scope": scope, "kind": kind, "status": status, "count": amount}
+        for (scope, kind, status), amount in sorted(deltas.items())
+        if amount
+    ]
+
+    for start in range(0, len(values), batch_size):
+        stmt = dialect.insert(JobCounter).values(values[start:start + batch_size])
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["scope", "kind", "status"],
+                set_={"count": JobCounter.count + stmt.excluded.count}
+            )
+        )
+
+
+def rollup_status(counts: Dict[str, int]) -> Optional[RowStatus]:
+    """
+    Row status implied by its job counts, or None when it has no jobs
+    """
+    finished = counts.get("completed") or counts.get("failed") or counts.get("cancelled")
+    if counts.get("processing") or (counts.get("pending") and finished):
+        return RowStatus.PROCESSING
+    if counts.get("pending"):
+        return RowStatus.PENDING
+    if counts.get("failed"):
+        return RowStatus.FAILED
+    if counts.get("completed"):
+        return RowStatus.COMPLETED
+    if counts.get("cancelled"):
+        return RowStatus.CANCELLED
+    return None
+
+
+def _rollup_rows(connection, row_ids: Iterable[str]) -> None:
+    for row_id in sorted(set(row_ids)):
+        result = connection.execute(
+            select(JobCounter.status, func.sum(JobCounter.count))
+            .where(JobCounter.scope == row_id)
+            .group_by(JobCounter.status)
+        )
+        status = rollup_status(dict(result.all()))
+        if status is not None:
+            connection.execute(
+                update(Row)
+                .where(Row.id == UUID(row_id), Row.status != status)
+                .values(status=status)
+            )
+
+
+def _global_shard(deltas: Counter) -> Counter:
+    """
+    The deltas with their overall counts moved to one random shard
+    """
+    shard = f"{GLOBAL_SCOPE}:{random.randrange(GLOBAL_SHARDS)}"
+    sharded: Counter = Counter()
+    for (scope, kind, status), amount in deltas.items():
+        sharded[(shard if scope == GLOBAL_SCOPE else scope, kind, status)] += amount
+    return sharded
+
+
+def apply_deltas(connection, deltas: Counter) -> None:
+    """
+    Write counter changes and roll up the status of every touched row
+    """
+    _upsert(connection, _global_shard(deltas))
+    _rollup_rows(connection, {scope for scope, _, _ in deltas if scope != GLOBAL_SCOPE})
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_jobs(session: Session, flush_context) -> None:
+    deltas: Counter = Counter()
+    deleted_rows = []
+
+    for obj in session.new:
+        kind = JOB_KINDS.get(type(obj))
+        if kind:
+            _add(deltas, kind, obj.row_id, obj.status, 1)
+
+    for obj in session.dirty:
+        kind = JOB_KINDS.get(type(obj))
+        if not kind or not session.is_modified(obj):
+            continue
+        status = attributes.get_history(obj, "status")
+        row_id = attributes.get_history(obj, "row_id")
+        if not status.has_changes() and not row_id.has_changes():
+            continue
+        old_status = (status.deleted or status.unchanged or [None])[0]
+        old_row_id = (row_id.deleted or row_id.unchanged or [None])[0]
+        _add(deltas, kind, old_row_id, old_status, -1)
+        _add(deltas, kind, obj.row_id, obj.status, 1)
+
+    for obj in session.deleted:
+        kind = JOB_KINDS.get(type(obj))
+        if kind:
+            status = attributes.get_history(obj, "status")
+            _add(deltas, kind, obj.row_id, (status.deleted or status.unchanged or [obj.status])[0], -1)
+        elif isinstance(obj, Row):
+            deleted_rows.append(str(obj.id))
+
+    if not deltas and not deleted_rows:
+        return
+
+    connection = session.connection()
+    for row_id in deleted_rows:
+        # Drop the row's own counters; its jobs still come off the global ones
+        deltas = Counter({key: amount for key, amount in deltas.items() if key[0] != row_id})
+        connection.execute(delete(JobCounter).where(JobCounter.scope == row_id))
+    apply_deltas(connection, deltas)
+
+
+async def record_transition(
+    db: AsyncSession,
+    model,
+    row_id: Optional[UUID],
+    old_status,
+    new_status
+) -> None:
+    """
+    Count a status change made with a Core UPDATE, in the caller's transaction
+    """
+    if old_status == new_status:
+        return
+    deltas: Counter = Counter()
+    _add(deltas, JOB_KINDS[model], row_id, old_status, -1)
+    _add(deltas, JOB_KINDS[model], row_id, new_status, 1)
+    await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+
+
+async def transition(
+    db: AsyncSession,
+    model,
+    job_id: UUID,
+    old_status,
+    new_status,
+    provider_at: Optional[datetime] = None,
+    **values
+) -> bool:
+    """
+    Compare-and-set a job from old_status to new_status, count the change, log
+    it as a job event (with provider_at, when the provider says it happened)
+    and write it through to the job state cache.
+    Returns False, changing nothing, if the job was not in old_status.
+    """
+    result = await db.execute(
+        update(model)
+        .where(model.id == job_id, model.status == old_status)
+        .values(status=new_status, **values)
+        .returning(model.row_id, model.updated_at)
+    )
+    claimed = result.first()
+    if claimed is None:
+        return False
+
+    await record_transition(db, model, claimed.row_id, old_status, new_status)
+    if old_status != new_status:
+        note_status(db, model, job_id, new_status, provider_at=provider_at)
+    note_state(db.sync_session, model, job_id, dict(values, status=new_status, updated_at=claimed.updated_at))
+    return True
+
+
+async def read_counts(db: AsyncSession, scopes: Sequence[str]) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Counters for each scope as {scope: {kind: {status: count}}}, zero-filled
+    """
+    counts = {
+        scope: {kind: {status.value: 0 for status in statuses} for kind, statuses in KIND_STATUSES.items()}
+        for scope in scopes
+    }
+    if not scopes:
+        return counts
+
+    condition = JobCounter.scope.in_(list(scopes))
+    if GLOBAL_SCOPE in scopes:
+        # Unsharded counters written before sharding still count
+        condition = or_(condition, JobCounter.scope.like(f"{GLOBAL_SCOPE}:%"))
+    result = await db.execute(select(JobCounter).where(condition))
+    for counter in result.scalars():
+        scope = GLOBAL_SCOPE if counter.scope.startswith(f"{GLOBAL_SCOPE}:") else counter.scope
+        counts[scope][counter.kind][counter.status] += counter.count
+
+    return counts
+
+
+def recount(connection) -> None:
+    """
+    Rebuild every counter from the job tables, e.g. after bulk loads that bypass the ORM
+    """
+    connection.execute(delete(JobCounter))
+    deltas: Counter = Counter()
+    for model, kind in JOB_KINDS.items():
+        result = connection.execute(
+            select(model.row_id, model.status, func.count()).group_by(model.row_id, model.status)
+        )
+        for row_id, status, count in result:
+            _add(deltas, kind, row_id, status, count)
+    _upsert(connection, deltas)
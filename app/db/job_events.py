@@ -0,0 +1,224 @@
+"""
+Append-only log of job lifecycle events, for per-stage latency analytics.
+
+Events are buffered in memory and written in batches by the job event
+writer, so recording one never adds a round trip to the job itself.
+Status changes are captured from the same places as the job counters
+(the flush hook and transition) and only buffered once their transaction
+commits.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, bindparam, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+
+from app.models import ImageJob, VideoJob
+
+JOB_KINDS = {ImageJob: "image", VideoJob: "video"}
+
+# Oldest events are dropped if the writer falls this far behind
+MAX_BUFFERED_EVENTS = 100_000
+
+_buffer: Deque[dict] = deque(maxlen=MAX_BUFFERED_EVENTS)
+
+_PENDING_KEY = "job_events"
+
+
+def _event(kind: str, job_id: UUID, name: str, **fields) -> dict:
+    return {
+        "job_kind": kind,
+        "job_id": job_id,
+        "event": name,
+        "external_task_id": fields.get("external_task_id"),
+        "provider_at": fields.get("provider_at"),
+        "created_at": fields.get("created_at") or datetime.utcnow(),
+    }
+
+
+def record_event(kind: str, job_id: UUID, name: str, **fields) -> None:
+    """
+    Buffer an event that is not tied to a transaction, e.g. queued or started
+    """
+    _buffer.append(_event(kind, job_id, name, **fields))
+
+
+def note_event(session: Session, kind: str, job_id: UUID, name: str, **fields) -> None:
+    """
+    Buffer an event once the session's current transaction commits
+    """
+    session.info.setdefault(_PENDING_KEY, []).append(_event(kind, job_id, name, **fields))
+
+
+def note_status(db: AsyncSession, model, job_id: UUID, status, **fields) -> None:
+    note_event(db.sync_session, JOB_KINDS[model], job_id, getattr(status, "value", status), **fields)
+
+
+def take_events(limit: int) -> List[dict]:
+    events = []
+    while _buffer and len(events) < limit:
+        events.append(_buffer.popleft())
+    return events
+
+
+def requeue_events(events: List[dict]) -> None:
+    """
+    Put back events that failed to write, ahead of newer ones
+    """
+    _buffer.extendleft(reversed(events))
+
+
+def buffered_events() -> int:
+    return len(_buffer)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_statuses(session: Session, flush_context) -> None:
+    for obj in session.new:
+        kind = JOB_KINDS.get(type(obj))
+        if kind and obj.status is not None:
+            note_event(session, kind, obj.id, obj.status.value)
+
+    for obj in session.dirty:
+        kind = JOB_KINDS.get(type(obj))
+        if kind and attributes.get_history(obj, "status").has_changes():
+            note_event(session, kind, obj.id, obj.status.value)
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed(session: Session) -> None:
+    _buffer.extend(session.info.pop(_PENDING_KEY, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Consecutive events of a job that bound each stage. A finished video's
+# time after submission is split at the provider's own completion time.
+_FINISHED = "('completed', 'failed')"
+
+_STAGES_SQL = f"""
+    SELECT 'queue' AS stage, created_at AS ended_at, {{since_prev}} AS seconds
+    FROM ordered WHERE prev_event = 'queued' AND event = 'started'
+    UNION ALL
+    SELECT 'claim', created_at, {{since_prev}}
+    FROM ordered WHERE prev_event = 'started' AND event = 'processing'
+    UNION ALL
+    SELECT 'submit', created_at, {{since_prev}}
+    FROM ordered WHERE prev_event = 'processing'
+        AND (event = 'submitted' OR (:kind = 'video' AND event IN {_FINISHED}))
+    UNION ALL
+    SELECT 'generate', created_at, {{since_prev}}
+    FROM ordered WHERE prev_event = 'processing' AND :kind = 'image' AND event IN {_FINISHED}
+    UNION ALL
+    SELECT 'render', created_at, {{render}}
+    FROM ordered WHERE prev_event = 'submitted' AND event IN {_FINISHED}
+    UNION ALL
+    SELECT 'poll_delay', created_at, {{poll_delay}}
+    FROM ordered WHERE prev_event = 'submitted' AND event IN {_FINISHED} AND provider_at IS NOT NULL
+    UNION ALL
+    SELECT 'end_to_end', created_at, {{since_first}}
+    FROM ordered WHERE event IN {_FINISHED}
+"""
+
+_LATENCY_SQL = """
+WITH ordered AS (
+    SELECT
+        event,
+        created_at,
+        provider_at,
+        LAG(event) OVER job_events_in_order AS prev_event,
+        LAG(created_at) OVER job_events_in_order AS prev_at,
+        FIRST_VALUE(created_at) OVER job_events_in_order AS first_at
+    FROM job_events
+    -- Whole history of every job with a recent event, so a stage that
+    -- began before the window still has its start event to be timed from
+    WHERE job_kind = :kind AND job_id IN (
+        SELECT job_id FROM job_events WHERE job_kind = :kind AND created_at >= :since
+    )
+    WINDOW job_events_in_order AS (PARTITION BY job_id ORDER BY created_at, id)
+),
+stages AS ({stages}),
+ranked AS (
+    SELECT
+        stage,
+        {bucket} AS bucket,
+        seconds,
+        ROW_NUMBER() OVER (PARTITION BY stage, {bucket} ORDER BY seconds) AS place,
+        COUNT(*) OVER (PARTITION BY stage, {bucket}) AS total
+    FROM stages
+    WHERE ended_at >= :since
+)
+SELECT
+    stage,
+    bucket,
+    MAX(total) AS count,
+    MIN(CASE WHEN place >= 0.50 * total THEN seconds END) AS p50,
+    MIN(CASE WHEN place >= 0.95 * total THEN seconds END) AS p95,
+    MIN(CASE WHEN place >= 0.99 * total THEN seconds END) AS p99,
+    MAX(seconds) AS max
+FROM ranked
+GROUP BY stage, bucket
+ORDER BY bucket, stage
+"""
+
+_EPOCH = {
+    "sqlite": "((julianday({}) - 2440587.5) * 86400.0)",
+    "postgresql": "EXTRACT(EPOCH FROM {})",
+}
+
+_FLOOR = {
+    "sqlite": "CAST({} AS INTEGER)",
+    "postgresql": "FLOOR({})",
+}
+
+
+def _latency_sql(dialect: str) -> str:
+    epoch = _EPOCH.get(dialect, _EPOCH["postgresql"]).format
+    floor = _FLOOR.get(dialect, _FLOOR["postgresql"]).format
+    stages = _STAGES_SQL.format(
+        since_prev=f"{epoch('created_at')} - {epoch('prev_at')}",
+        since_first=f"{epoch('created_at')} - {epoch('first_at')}",
+        render=f"{epoch('COALESCE(provider_at, created_at)')} - {epoch('prev_at')}",
+        poll_delay=f"{epoch('created_at')} - {epoch('provider_at')}",
+    )
+    return _LATENCY_SQL.format(stages=stages, bucket=floor(f"{epoch('ended_at')} / :bucket_seconds"))
+
+
+def _seconds(value) -> Optional[float]:
+    # PostgreSQL returns Decimal from EXTRACT
+    return None if value is None else round(float(value), 3)
+
+
+async def stage_latencies(
+    db: AsyncSession,
+    kind: str,
+    since: datetime,
+    bucket_seconds: int
+) -> List[Dict[str, Optional[float]]]:
+    """
+    Count and p50/p95/p99/max seconds of each job stage, per time bucket.
+    Stages are timed between consecutive events of a job and bucketed by when
+    they ended; a stage that ended since `since` counts in full even if it
+    began earlier. Percentiles are nearest-rank, computed with window functions.
+    """
+    connection = await db.connection()
+    query = text(_latency_sql(connection.dialect.name)).bindparams(bindparam("since", type_=DateTime))
+    result = await db.execute(query, {"kind": kind, "since": since, "bucket_seconds": bucket_seconds})
+    return [
+        {
+            "stage": row.stage,
+            "window_start": datetime.utcfromtimestamp(int(row.bucket) * bucket_seconds),
+            "count": row.count,
+            "p50": _seconds(row.p50),
+            "p95": _seconds(row.p95),
+            "p99": _seconds(row.p99),
+            "max": _seconds(row.max),
+        }
+        for row in result
+    ]
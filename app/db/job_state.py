@@ -0,0 +1,214 @@
+"""
+In-process cache of job state, for answering job status polls without a query.
+
+Jobs created or changed in this process are written through on commit:
+ORM changes from the flush hook and Core claims from transition(). Other
+jobs are loaded on first read. Because other processes may change a job
+too, an entry is trusted for at most JOB_STATE_MAX_AGE_SECONDS after it
+was last written or read from the database. Finished jobs are kept for
+JOB_STATE_TERMINAL_TTL_SECONDS so the final polls are still answered, and
+are never loaded from the database.
+"""
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes
+
+from app.core.config import settings
+from app.models import ImageJob, ImageJobStatus, VideoJob, VideoJobStatus
+
+JOB_MODELS = {"image": ImageJob, "video": VideoJob}
+
+JOB_KINDS = {model: kind for kind, model in JOB_MODELS.items()}
+
+TERMINAL_STATUSES = {
+    ImageJobStatus.COMPLETED, ImageJobStatus.FAILED, ImageJobStatus.CANCELLED,
+    VideoJobStatus.COMPLETED, VideoJobStatus.FAILED, VideoJobStatus.CANCELLED,
+}
+
+# Columns that change while a job runs; everything else is fixed at creation
+STATE_COLUMNS = (
+    "status", "progress", "error_message", "external_task_id",
+    "updated_at", "submitted_at", "completed_at",
+)
+
+RESULT_COLUMNS = {"image": "image_url", "video": "video_url"}
+
+# Fixed columns of each kind, in the order JobState.inputs holds them
+INPUT_COLUMNS = {
+    kind: tuple(
+        name for name in model.__table__.columns.keys()
+        if name not in STATE_COLUMNS and name != RESULT_COLUMNS[kind]
+    )
+    for kind, model in JOB_MODELS.items()
+}
+
+_PENDING_KEY = "job_state"
+
+
+class JobState:
+    """
+    One job's columns: its changing state as attributes, the rest as a tuple
+    """
+
+    __slots__ = STATE_COLUMNS + ("kind", "result_url", "inputs", "refreshed_at", "expires_at")
+
+    def __init__(self, kind: str, values: Mapping[str, Any]):
+        self.kind = kind
+        self.inputs = tuple(values.get(name) for name in INPUT_COLUMNS[kind])
+        self.result_url = None
+        self.expires_at: Optional[float] = None
+        for name in STATE_COLUMNS:
+            setattr(self, name, None)
+        self.apply(values)
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def apply(self, values: Mapping[str, Any]) -> None:
+        for name, value in values.items():
+            if name in STATE_COLUMNS:
+                setattr(self, name, value)
+            elif name == RESULT_COLUMNS[self.kind]:
+                self.result_url = value
+        self.refreshed_at = time.monotonic()
+        if self.terminal and self.expires_at is None:
+            self.expires_at = self.refreshed_at + settings.JOB_STATE_TERMINAL_TTL_SECONDS
+
+    def as_dict(self, fields: Iterable[str]) -> Dict[str, Any]:
+        result = {}
+        for name in fields:
+            if name in STATE_COLUMNS:
+                result[name] = getattr(self, name)
+            elif name == RESULT_COLUMNS[self.kind]:
+                result[name] = self.result_url
+            else:
+                result[name] = self.inputs[INPUT_COLUMNS[self.kind].index(name)]
+        return result
+
+
+class JobStateCache:
+    def __init__(self):
+        self._entries: Dict[Tuple[str, UUID], JobState] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _fresh(self, state: JobState, now: float) -> bool:
+        if state.expires_at is not None and now >= state.expires_at:
+            return False
+        return now - state.refreshed_at <= settings.JOB_STATE_MAX_AGE_SECONDS
+
+    def get(self, kind: str, job_id: UUID) -> Optional[JobState]:
+        """
+        The cached state of a job, or None if it is not cached or too old to trust
+        """
+        state = self._entries.get((kind, job_id))
+        if state is None:
+            return None
+        if not self._fresh(state, time.monotonic()):
+            del self._entries[(kind, job_id)]
+            return None
+        return state
+
+    def load(self, kind: str, values: Mapping[str, Any]) -> JobState:
+        """
+        Build the state of a job read from the database, caching it while it is in flight
+        """
+        state = JobState(kind, values)
+        if not state.terminal:
+            self._store((kind, values["id"]), state)
+        return state
+
+    def _store(self, key: Tuple[str, UUID], state: JobState) -> None:
+        if key not in self._entries and len(self._entries) >= settings.JOB_STATE_MAX_ENTRIES:
+            self.sweep()
+            if len(self._entries) >= settings.JOB_STATE_MAX_ENTRIES:
+                return
+        self._entries[key] = state
+
+    def update(self, kind: str, job_id: UUID, values: Mapping[str, Any]) -> None:
+        """
+        Write a committed change through to a cached job
+        """
+        state = self._entries.get((kind, job_id))
+        if state is not None:
+            state.apply(values)
+
+    def evict(self, kind: str, job_id: UUID) -> None:
+        self._entries.pop((kind, job_id), None)
+
+    def sweep(self) -> int:
+        """
+        Drop expired and stale entries; returns how many were dropped
+        """
+        now = time.monotonic()
+        stale = [key for key, state in self._entries.items() if not self._fresh(state, now)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+job_state_cache = JobStateCache()
+
+
+def _stage(session: Session, action: str, kind: str, job_id: UUID, values: Optional[dict] = None) -> None:
+    session.info.setdefault(_PENDING_KEY, []).append((action, kind, job_id, values))
+
+
+def note_state(session: Session, model, job_id: UUID, values: Mapping[str, Any]) -> None:
+    """
+    Write changed columns through to the cache once the transaction commits
+    """
+    _stage(session, "update", JOB_KINDS[model], job_id, dict(values))
+
+
+def _column_values(obj, names: List[str]) -> dict:
+    return {name: getattr(obj, name) for name in names}
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_jobs(session: Session, flush_context) -> None:
+    for obj in session.new:
+        kind = JOB_KINDS.get(type(obj))
+        if kind:
+            _stage(session, "load", kind, obj.id, _column_values(obj, type(obj).__table__.columns.keys()))
+
+    for obj in session.dirty:
+        kind = JOB_KINDS.get(type(obj))
+        if not kind:
+            continue
+        changed = [
+            name for name in type(obj).__table__.columns.keys()
+            if attributes.get_history(obj, name).has_changes()
+        ]
+        if changed:
+            # updated_at is set by the flush itself
+            _stage(session, "update", kind, obj.id, _column_values(obj, changed + ["updated_at"]))
+
+    for obj in session.deleted:
+        kind = JOB_KINDS.get(type(obj))
+        if kind:
+            _stage(session, "evict", kind, obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    for action, kind, job_id, values in session.info.pop(_PENDING_KEY, []):
+        if action == "load":
+            job_state_cache.load(kind, values)
+        elif action == "update":
+            job_state_cache.update(kind, job_id, values)
+        else:
+            job_state_cache.evict(kind, job_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,143 @@
+"""
+Full-text search over job prompts, YAML analyses and row titles.
+
+The index is created by migration 0007 and kept current by the database on
+every write: on PostgreSQL a generated tsvector column per table with a GIN
+index, on SQLite an FTS5 table per table maintained by triggers. Neither is
+part of the models, so autogenerate ignores them (see is_search_object).
+
+Matching differs by database: on SQLite every word of the query must match
+and operators are ignored, while PostgreSQL parses the query with
+websearch_to_tsquery, so "quoted phrases", "or" and -exclusions work there.
+"""
+import html
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Result type -> (table, searchable columns)
+SEARCH_TARGETS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "image_job": ("image_jobs", ("prompt", "yaml_content")),
+    "video_job": ("video_jobs", ("motion_prompt",)),
+    "row": ("rows", ("title", "description")),
+}
+
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+# Text search configuration; matches the porter stemmer used on SQLite
+TS_CONFIG = "english"
+
+# Highlight markers the database puts around matches; the text is escaped
+# before they are turned into <b></b>, so stored markup cannot reach clients
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+HEADLINE_OPTIONS = f'MaxFragments=1, MaxWords=20, MinWords=5, StartSel="{MATCH_START}", StopSel="{MATCH_END}"'
+
+
+def fts_table(table: str) -> str:
+    return f"{table}_fts"
+
+
+def is_search_object(name: str, type_: str) -> bool:
+    """
+    Whether a reflected table or column belongs to the search index
+    """
+    if type_ == "column":
+        return name == SEARCH_VECTOR_COLUMN
+    if type_ == "table":
+        # FTS5 also creates shadow tables such as image_jobs_fts_data
+        return any(name.startswith(fts_table(table)) for table, _ in SEARCH_TARGETS.values())
+    return False
+
+
+def _row_id_column(result_type: str) -> str:
+    return "id" if result_type == "row" else "row_id"
+
+
+def _text(columns: Sequence[str]) -> str:
+    return " || ' ' || ".join(f"COALESCE({column}, '')" for column in columns)
+
+
+def _postgresql_query(types: Sequence[str]) -> str:
+    branches = []
+    for result_type in types:
+        table, columns = SEARCH_TARGETS[result_type]
+        branches.append(
+            f"SELECT '{result_type}' AS type, id, {_row_id_column(result_type)} AS row_id, "
+            f"ts_rank_cd({SEARCH_VECTOR_COLUMN}, query) AS rank, {_text(columns)} AS body "
+            f"FROM {table}, websearch_to_tsquery('{TS_CONFIG}', :q) AS query "
+            f"WHERE {SEARCH_VECTOR_COLUMN} @@ query"
+        )
+    # Headlines are costly, so only build them for the page being returned
+    return (
+        "SELECT type, id, row_id, rank, "
+        f"ts_headline('{TS_CONFIG}', body, websearch_to_tsquery('{TS_CONFIG}', :q), :headline) AS snippet "
+        f"FROM ({' UNION ALL '.join(branches)}) AS hits "
+        "ORDER BY rank DESC, id LIMIT :limit OFFSET :offset"
+    )
+
+
+def _sqlite_query(types: Sequence[str]) -> str:
+    branches = []
+    for result_type in types:
+        table, _ = SEARCH_TARGETS[result_type]
+        fts = fts_table(table)
+        # bm25 is lower for better matches
+        branches.append(
+            f"SELECT '{result_type}' AS type, {table}.id AS id, {table}.{_row_id_column(result_type)} AS row_id, "
+            f"-bm25({fts}) AS rank, snippet({fts}, -1, :match_start, :match_end, '...', 20) AS snippet "
+            f"FROM {fts} JOIN {table} ON {table}.id = {fts}.id "
+            f"WHERE {fts} MATCH :q"
+        )
+    return (
+        f"SELECT * FROM ({' UNION ALL '.join(branches)}) AS hits "
+        "ORDER BY rank DESC, id LIMIT :limit OFFSET :offset"
+    )
+
+
+def fts5_query(query: str) -> Optional[str]:
+    """
+    A user query as FTS5 syntax: every word must match. None if it has no words.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """
+    A snippet as HTML-escaped text with matches wrapped in <b></b>
+    """
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, "<b>").replace(MATCH_END, "</b>")
+
+
+async def search(
+    db: AsyncSession,
+    query: str,
+    types: Sequence[str],
+    limit: int,
+    offset: int
+) -> List[dict]:
+    """
+    Ranked hits for a query across the given result types, best first
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "sqlite":
+        query = fts5_query(query)
+        if query is None:
+            return []
+        sql = _sqlite_query(types)
+    else:
+        sql = _postgresql_query(types)
+
+    result = await db.execute(text(sql), {
+        "q": query, "limit": limit, "offset": offset,
+        "headline": HEADLINE_OPTIONS, "match_start": MATCH_START, "match_end": MATCH_END,
+    })
+    return [dict(row._mapping, snippet=highlight(row.snippet)) for row in result]
@@ -1,12 +1,24 @@
+import time
+from typing import Dict
+
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.utils.clients import client_id
+
+
+def _connect_args(url: str) -> dict:
+    # SQLite serializes writers; wait for the lock instead of failing under load
+    return {"timeout": 30} if url.startswith("sqlite") else {}
+
 
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    connect_args=_connect_args(settings.DATABASE_URL)
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -15,8 +27,49 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read-only endpoints use the replica, with its own pool, when one is configured
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args=_connect_args(settings.DATABASE_READ_URL)
+    )
+else:
+    read_engine = engine
 
-async def get_db() -> AsyncSession:
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+class RecentWrites:
+    """
+    When each client last wrote, so its reads can skip a lagging replica
+    """
+
+    def __init__(self, max_clients: int = 10000):
+        self.max_clients = max_clients
+        self._written_at: Dict[str, float] = {}
+
+    def mark(self, client: str) -> None:
+        now = time.monotonic()
+        if len(self._written_at) >= self.max_clients:
+            cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+            self._written_at = {c: at for c, at in self._written_at.items() if at > cutoff}
+        self._written_at[client] = now
+
+    def wrote_recently(self, client: str) -> bool:
+        written_at = self._written_at.get(client)
+        return written_at is not None and time.monotonic() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+recent_writes = RecentWrites()
+
+
+async def get_db(request: Request) -> AsyncSession:
     """
     Dependency to get database session
     """
@@ -28,4 +81,24 @@ async def get_db() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+    if request.method not in ("GET", "HEAD"):
+        recent_writes.mark(client_id(request))
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency to get a session for read-only endpoints. Uses the read replica
+    unless the client wrote within READ_YOUR_WRITES_SECONDS, and never commits.
+    """
+    if read_engine is not engine and recent_writes.wrote_recently(client_id(request)):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = ReadSessionLocal
+
+    async with session_factory() as session:
+        yield session
+
+# Keep job status counters, the job event log and the job state cache in step with every flush
+from app.db import job_counters, job_events, job_state  # noqa: E402,F401
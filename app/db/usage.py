@@ -0,0 +1,160 @@
+"""
+Ledger of provider usage: calls, tokens, images and video seconds, with
+their estimated cost, per UTC day, provider and operation.
+
+Services record each call into an in-memory buffer; the usage ledger
+writes it out in batches, adding into one row per day, scope, provider
+and operation. Every call counts towards the "global" scope, and towards
+its row's scope when made on behalf of a row (see usage_row).
+"""
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Deque, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ProviderUsage
+
+GLOBAL_SCOPE = "global"
+
+AMOUNTS = ("calls", "input_tokens", "output_tokens", "images", "video_seconds", "cost_usd")
+
+# Oldest entries are dropped if the ledger falls this far behind
+MAX_BUFFERED_USAGE = 100_000
+
+_buffer: Deque[dict] = deque(maxlen=MAX_BUFFERED_USAGE)
+
+# Cost recorded but not written yet, per provider, for budget checks
+_unwritten_cost: Counter = Counter()
+
+_row: ContextVar[Optional[UUID]] = ContextVar("usage_row", default=None)
+
+
+@contextmanager
+def usage_row(row_id: Optional[UUID]) -> Iterator[None]:
+    """
+    Attribute the usage recorded inside the block to a row
+    """
+    token = _row.set(row_id)
+    try:
+        yield
+    finally:
+        _row.reset(token)
+
+
+def record_usage(
+    provider: str,
+    operation: str,
+    cost_usd: float,
+    calls: int = 1,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    images: int = 0,
+    video_seconds: float = 0.0
+) -> None:
+    row_id = _row.get()
+    _buffer.append({
+        "day": datetime.utcnow().date(),
+        "row_id": row_id,
+        "provider": provider,
+        "operation": operation,
+        "calls": calls,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "images": images,
+        "video_seconds": video_seconds,
+        "cost_usd": cost_usd,
+    })
+    _unwritten_cost[provider] += cost_usd
+
+
+def take_usage(limit: int) -> List[dict]:
+    entries = []
+    while _buffer and len(entries) < limit:
+        entry = _buffer.popleft()
+        _unwritten_cost[entry["provider"]] -= entry["cost_usd"]
+        entries.append(entry)
+    return entries
+
+
+def requeue_usage(entries: List[dict]) -> None:
+    """
+    Put back entries that failed to write, ahead of newer ones
+    """
+    _buffer.extendleft(reversed(entries))
+    for entry in entries:
+        _unwritten_cost[entry["provider"]] += entry["cost_usd"]
+
+
+def buffered_usage() -> int:
+    return len(_buffer)
+
+
+def unwritten_cost(provider: str) -> float:
+    return max(0.0, _unwritten_cost[provider])
+
+
+async def write_usage(db: AsyncSession, entries: List[dict]) -> None:
+    """
+    Add entries into the ledger rows; does not commit
+    """
+    totals: Dict[tuple, Counter] = {}
+    for entry in entries:
+        scopes = [GLOBAL_SCOPE]
+        if entry["row_id"]:
+            scopes.append(str(entry["row_id"]))
+        for scope in scopes:
+            key = (entry["day"], scope, entry["provider"], entry["operation"])
+            totals.setdefault(key, Counter()).update({name: entry[name] for name in AMOUNTS})
+    if not totals:
+        return
+
+    connection = await db.connection()
+    dialect = sqlite if connection.dialect.name == "sqlite" else postgresql
+    # Sorted so concurrent writers lock ledger rows in the same order
+    values = [
+        {"day": day, "scope": scope, "provider": provider, "operation": operation,
+         **{name: amounts[name] for name in AMOUNTS}}
+        for (day, scope, provider, operation), amounts in sorted(totals.items())
+    ]
+    stmt = dialect.insert(ProviderUsage).values(values)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["day", "scope", "provider", "operation"],
+            set_={name: getattr(ProviderUsage, name) + getattr(stmt.excluded, name) for name in AMOUNTS}
+        )
+    )
+
+
+async def spent_by_provider(db: AsyncSession, day: date) -> Dict[str, float]:
+    """
+    Cost written to the ledger for a day, per provider
+    """
+    result = await db.execute(
+        select(ProviderUsage.provider, func.sum(ProviderUsage.cost_usd))
+        .where(ProviderUsage.day == day, ProviderUsage.scope == GLOBAL_SCOPE)
+        .group_by(ProviderUsage.provider)
+    )
+    return {provider: float(cost or 0) for provider, cost in result.all()}
+
+
+async def read_usage(
+    db: AsyncSession,
+    since: date,
+    scope: str = GLOBAL_SCOPE,
+    provider: Optional[str] = None
+) -> List[ProviderUsage]:
+    query = (
+        select(ProviderUsage)
+        .where(ProviderUsage.scope == scope, ProviderUsage.day >= since)
+        .order_by(ProviderUsage.day, ProviderUsage.provider, ProviderUsage.operation)
+    )
+    if provider:
+        query = query.where(ProviderUsage.provider == provider)
+    result = await db.execute(query)
+    return result.scalars().all()
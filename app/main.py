@@ -1,3 +1,5 @@
+from app.core.startup import startup_timer
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -6,12 +8,24 @@ import logging
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.init_db import init_db
-from app.db.session import engine, AsyncSessionLocal
+from app.db.session import engine, read_engine, AsyncSessionLocal
+from app.services.coordinator import coordinator
+from app.services.idempotency import idempotency_service
+from app.services.job_cancellation import cancellation_watcher
+from app.services.job_event_writer import job_event_writer
+from app.services.job_reconciler import job_reconciler
+from app.services.job_runner import job_runner
+from app.services.prompt_index import prompt_index
+from app.services.usage_ledger import usage_ledger
+from app.services.video_poller import video_poller
+from app.utils.process_pool import shutdown_process_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+startup_timer.mark("imports")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -20,14 +34,44 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting up...")
-    # Initialize database
+    startup_timer.mark("app_setup")
+    # Verify the database schema is current
     await init_db()
+    startup_timer.mark("schema_check")
+    # Join the worker pool and start polling the jobs this node owns
+    await coordinator.start()
+    await job_event_writer.start()
+    # Load today's provider spend before any job can start
+    await usage_ledger.start()
+    await video_poller.start()
+    # Resume jobs left behind by a crashed or restarted process
+    await job_reconciler.start()
+    # Stop local work on jobs cancelled through other nodes
+    await cancellation_watcher.start()
+    await idempotency_service.start()
+    # Index prompts of jobs that completed before the prompt index existed
+    await prompt_index.start()
+    startup_timer.mark("workers")
+    startup_timer.finish()
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    # Let in-flight jobs finish; interrupted ones go back to PENDING
+    await job_runner.drain(settings.SHUTDOWN_DRAIN_SECONDS)
+    await job_reconciler.stop()
+    await cancellation_watcher.stop()
+    await idempotency_service.stop()
+    await prompt_index.stop()
+    await video_poller.stop()
+    await usage_ledger.stop()
+    await job_event_writer.stop()
+    await coordinator.stop()
+    shutdown_process_pool()
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 app = FastAPI(
@@ -67,4 +111,12 @@ async def health_check():
     """
     Health check endpoint
     """
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/startup")
+async def startup_report():
+    """
+    Time spent in each startup phase
+    """
+    return startup_timer.report()
\ No newline at end of file
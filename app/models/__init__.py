@@ -1,9 +1,18 @@
 from app.models.row import Row, RowStatus
 from app.models.image_job import ImageJob, ImageJobStatus
 from app.models.video_job import VideoJob, VideoJobStatus, VideoModel
+from app.models.worker_node import WorkerNode
+from app.models.job_lease import JobLease
+from app.models.job_counter import JobCounter
+from app.models.idempotency_key import IdempotencyKey
+from app.models.job_event import JobEvent
+from app.models.prompt_signature import PromptSignature, PromptBand
+from app.models.provider_usage import ProviderUsage
 
 __all__ = [
     "Row", "RowStatus",
     "ImageJob", "ImageJobStatus",
-    "VideoJob", "VideoJobStatus", "VideoModel"
+    "VideoJob", "VideoJobStatus", "VideoModel",
+    "WorkerNode", "JobLease", "JobCounter", "IdempotencyKey", "JobEvent",
+    "PromptSignature", "PromptBand", "ProviderUsage"
 ]
\ No newline at end of file
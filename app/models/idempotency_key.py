@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(255), primary_key=True)
+    endpoint = Column(String(64), nullable=False)
+    # SHA-256 of the method, path, query and body the key was first used with
+    fingerprint = Column(String(64), nullable=False)
+    
+    # Stored response; NULL while the first request is still in progress
+    status_code = Column(Integer, nullable=True)
+    response = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
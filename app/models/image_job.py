@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Index, Integer, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -8,18 +7,29 @@ import enum
 from app.db.base_class import Base
 
 
+# The only image model jobs are generated with
+IMAGE_MODEL = "gpt-image-1"
+
+
 class ImageJobStatus(str, enum.Enum):
     PENDING = "pending"
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class ImageJob(Base):
     __tablename__ = "image_jobs"
+    __table_args__ = (
+        # List endpoints filter by row or status and sort newest first
+        Index("ix_image_jobs_row_id_created_at", "row_id", "created_at"),
+        Index("ix_image_jobs_status_created_at", "status", "created_at"),
+        Index("ix_image_jobs_variant_group_id", "variant_group_id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    row_id = Column(UUID(as_uuid=True), ForeignKey("rows.id"), nullable=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    row_id = Column(Uuid(as_uuid=True), ForeignKey("rows.id"), nullable=True)
     
     # Input
     prompt = Column(Text, nullable=False)
@@ -28,19 +38,26 @@ class ImageJob(Base):
     
     # Output
     image_url = Column(String, nullable=True)
+    # Set when image_url was copied from an earlier job with a near-identical prompt
+    reused_from_id = Column(Uuid(as_uuid=True), nullable=True)
     
     # Status
     status = Column(Enum(ImageJobStatus), default=ImageJobStatus.PENDING, nullable=False)
     error_message = Column(Text, nullable=True)
     
     # Metadata
-    model = Column(String, default="gpt-image-1", nullable=False)
+    model = Column(String, default=IMAGE_MODEL, nullable=False)
     size = Column(String, default="1024x1024", nullable=False)
+    # Sibling jobs generated together in one upstream call share the first one's id
+    variant_group_id = Column(Uuid(as_uuid=True), nullable=True)
+    variant_index = Column(Integer, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     completed_at = Column(DateTime, nullable=True)
+    # Work still unfinished by then is abandoned and the job failed
+    deadline_at = Column(DateTime, nullable=True)
     
     # Relationships
     row = relationship("Row", back_populates="image_jobs")
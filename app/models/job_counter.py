@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer
+
+from app.db.base_class import Base
+
+
+class JobCounter(Base):
+    __tablename__ = "job_counters"
+    
+    # A row id, or "global:<shard>" for the overall counts
+    scope = Column(String(36), primary_key=True)
+    # "image" or "video"
+    kind = Column(String(16), primary_key=True)
+    status = Column(String(32), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Uuid
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class JobEvent(Base):
+    __tablename__ = "job_events"
+    __table_args__ = (
+        # Analytics read a time range, then order each job's events
+        Index("ix_job_events_kind_created_at", "job_kind", "created_at"),
+        Index("ix_job_events_job_id_created_at", "job_id", "created_at"),
+    )
+    
+    # Append-only; SQLite only autoincrements INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # "image" or "video"
+    job_kind = Column(String(16), nullable=False)
+    job_id = Column(Uuid(as_uuid=True), nullable=False)
+    # queued, started, submitted, or the status the job moved to
+    event = Column(String(32), nullable=False)
+    external_task_id = Column(String, nullable=True)
+    # When the provider reports it finished, for telling render time from polling delay
+    provider_at = Column(DateTime, nullable=True)
+    
+    # When the event happened, not when it was written
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
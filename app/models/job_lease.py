@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class JobLease(Base):
+    __tablename__ = "job_leases"
+    
+    # Leased resource, e.g. "video:<job id>"
+    resource = Column(String, primary_key=True)
+    owner = Column(String, nullable=False, index=True)
+    
+    # Timestamps
+    acquired_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
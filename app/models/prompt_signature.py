@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, LargeBinary, String, Uuid
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class PromptSignature(Base):
+    __tablename__ = "prompt_signatures"
+    
+    # A completed image job whose result may be reused
+    job_id = Column(Uuid(as_uuid=True), ForeignKey("image_jobs.id", ondelete="CASCADE"), primary_key=True)
+    # Reuse needs the same model and size as well as a similar prompt
+    model = Column(String, nullable=False)
+    size = Column(String, nullable=False)
+    # MinHash signature of the prompt, packed as unsigned 32-bit integers
+    signature = Column(LargeBinary, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PromptBand(Base):
+    __tablename__ = "prompt_bands"
+    
+    # LSH band key; jobs sharing a key are candidate near-duplicates
+    key = Column(BigInteger, primary_key=True, autoincrement=False)
+    job_id = Column(Uuid(as_uuid=True), ForeignKey("image_jobs.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, Date, Float, String
+
+from app.db.base_class import Base
+
+
+class ProviderUsage(Base):
+    __tablename__ = "provider_usage"
+    
+    # UTC day the calls were made
+    day = Column(Date, primary_key=True)
+    # "global" or a row id
+    scope = Column(String(36), primary_key=True)
+    # "openai" or "kling"
+    provider = Column(String(16), primary_key=True)
+    # e.g. images:1024x1024, vision, chat, video, status
+    operation = Column(String(32), primary_key=True)
+    
+    calls = Column(BigInteger, default=0, nullable=False)
+    input_tokens = Column(BigInteger, default=0, nullable=False)
+    output_tokens = Column(BigInteger, default=0, nullable=False)
+    images = Column(BigInteger, default=0, nullable=False)
+    video_seconds = Column(Float, default=0.0, nullable=False)
+    # Estimated from list prices at the time of the call
+    cost_usd = Column(Float, default=0.0, nullable=False)
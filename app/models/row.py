@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Enum, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -13,12 +12,13 @@ class RowStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class Row(Base):
     __tablename__ = "rows"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     google_sheet_row_id = Column(String, nullable=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
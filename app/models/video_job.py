@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Integer, Index, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -13,6 +12,7 @@ class VideoJobStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class VideoModel(str, enum.Enum):
@@ -22,10 +22,15 @@ class VideoModel(str, enum.Enum):
 
 class VideoJob(Base):
     __tablename__ = "video_jobs"
+    __table_args__ = (
+        # List endpoints filter by row or status and sort newest first
+        Index("ix_video_jobs_row_id_created_at", "row_id", "created_at"),
+        Index("ix_video_jobs_status_created_at", "status", "created_at"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    row_id = Column(UUID(as_uuid=True), ForeignKey("rows.id"), nullable=True)
-    image_job_id = Column(UUID(as_uuid=True), ForeignKey("image_jobs.id"), nullable=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    row_id = Column(Uuid(as_uuid=True), ForeignKey("rows.id"), nullable=True)
+    image_job_id = Column(Uuid(as_uuid=True), ForeignKey("image_jobs.id"), nullable=True, index=True)
     
     # Input
     source_image_url = Column(String, nullable=False)
@@ -45,9 +50,12 @@ class VideoJob(Base):
     error_message = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    submitted_at = Column(DateTime, nullable=True)  # When the external task was created
     completed_at = Column(DateTime, nullable=True)
+    # Work still unfinished by then is abandoned and the job failed
+    deadline_at = Column(DateTime, nullable=True)
     
     # Relationships
     row = relationship("Row", back_populates="video_jobs")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class WorkerNode(Base):
+    __tablename__ = "worker_nodes"
+    
+    # Unique per process: hostname, pid and a random suffix
+    id = Column(String, primary_key=True)
+    hostname = Column(String, nullable=False)
+    pid = Column(Integer, nullable=False)
+    
+    # Timestamps
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,18 +1,29 @@
-from app.schemas.row import Row, RowCreate, RowUpdate, RowInDB
+from app.schemas.row import Row, RowCreate, RowUpdate, RowInDB, RowFull
 from app.schemas.image_job import (
-    ImageJob, ImageJobCreate, ImageJobUpdate, ImageJobInDB,
-    ImageAnalyzeRequest, ImageAnalyzeResponse,
+    ImageJob, ImageJobCreate, ImageJobUpdate, ImageJobInDB, ImageJobPartial,
+    ImageAnalyzeRequest, ImageAnalyzeResponse, ImageAnalyzeBatchRequest,
+    SimilarPromptRequest, SimilarImageJob,
     YamlToPromptRequest, YamlToPromptResponse
 )
-from app.schemas.video_job import VideoJob, VideoJobCreate, VideoJobUpdate, VideoJobInDB
+from app.schemas.search import SearchHit
+from app.schemas.stats import JobCounts, StageLatency
+from app.schemas.usage import UsageEntry, ProviderBudget
+from app.schemas.video_job import VideoJob, VideoJobCreate, VideoJobUpdate, VideoJobInDB, VideoJobPartial
 
 __all__ = [
     # Row
-    "Row", "RowCreate", "RowUpdate", "RowInDB",
+    "Row", "RowCreate", "RowUpdate", "RowInDB", "RowFull",
     # ImageJob
-    "ImageJob", "ImageJobCreate", "ImageJobUpdate", "ImageJobInDB",
-    "ImageAnalyzeRequest", "ImageAnalyzeResponse",
+    "ImageJob", "ImageJobCreate", "ImageJobUpdate", "ImageJobInDB", "ImageJobPartial",
+    "ImageAnalyzeRequest", "ImageAnalyzeResponse", "ImageAnalyzeBatchRequest",
+    "SimilarPromptRequest", "SimilarImageJob",
     "YamlToPromptRequest", "YamlToPromptResponse",
     # VideoJob
-    "VideoJob", "VideoJobCreate", "VideoJobUpdate", "VideoJobInDB",
+    "VideoJob", "VideoJobCreate", "VideoJobUpdate", "VideoJobInDB", "VideoJobPartial",
+    # Search
+    "SearchHit",
+    # Stats
+    "JobCounts", "StageLatency",
+    # Usage
+    "UsageEntry", "ProviderBudget",
 ]
\ No newline at end of file
@@ -1,9 +1,14 @@
 from pydantic import BaseModel, Field, HttpUrl
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from app.models.image_job import ImageJobStatus
+from app.utils.serialization import partial_schema
+
+
+# Most images the OpenAI API returns for one request
+MAX_VARIANTS = 10
 
 
 class ImageJobBase(BaseModel):
@@ -14,6 +19,12 @@ class ImageJobBase(BaseModel):
 
 class ImageJobCreate(ImageJobBase):
     row_id: Optional[UUID] = None
+    # Complete at once with the result of an earlier job whose prompt is near-identical
+    reuse: bool = False
+    # Generate this many images in one upstream call, as sibling jobs
+    variants: int = Field(default=1, ge=1, le=MAX_VARIANTS)
+    # Fail the job instead of finishing it later than this many seconds from now
+    deadline_seconds: Optional[int] = Field(default=None, ge=1)
 
 
 class ImageJobUpdate(BaseModel):
@@ -27,13 +38,18 @@ class ImageJobInDBBase(ImageJobBase):
     id: UUID
     row_id: Optional[UUID]
     status: ImageJobStatus
-    image_url: Optional[HttpUrl]
+    # gpt-image-1 results are stored as data: URLs, so any string goes here
+    image_url: Optional[str]
+    reused_from_id: Optional[UUID] = None
     error_message: Optional[str]
     model: str
+    variant_group_id: Optional[UUID] = None
+    variant_index: Optional[int] = None
     yaml_content: Optional[str]
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime]
+    deadline_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -47,6 +63,12 @@ class ImageJobInDB(ImageJobInDBBase):
     pass
 
 
+# Large text columns left out of listings unless asked for with fields=
+LIST_DEFERRED_FIELDS = {"prompt", "yaml_content", "error_message"}
+
+ImageJobPartial = partial_schema(ImageJob, "ImageJobPartial")
+
+
 # Request/Response models
 class ImageAnalyzeRequest(BaseModel):
     image_url: HttpUrl
@@ -57,6 +79,25 @@ class ImageAnalyzeResponse(BaseModel):
     preview: dict
 
 
+class ImageAnalyzeBatchRequest(BaseModel):
+    image_urls: List[HttpUrl] = Field(..., min_length=1, max_length=500)
+
+
+class SimilarPromptRequest(BaseModel):
+    prompt: str = Field(..., min_length=1)
+    size: str = Field(default="1024x1024", pattern="^(1024x1024|1792x1024|1024x1792)$")
+    # Defaults to PROMPT_REUSE_THRESHOLD
+    threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    limit: int = Field(default=5, ge=1, le=50)
+
+
+class SimilarImageJob(BaseModel):
+    job_id: UUID
+    prompt: str
+    image_url: str
+    similarity: float
+
+
 class YamlToPromptRequest(BaseModel):
     yaml: str
 
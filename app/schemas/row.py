@@ -1,9 +1,12 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from app.models.row import RowStatus
+from app.schemas.image_job import ImageJobPartial
+from app.schemas.stats import JobCounts
+from app.schemas.video_job import VideoJobPartial
 
 
 class RowBase(BaseModel):
@@ -37,4 +40,16 @@ class Row(RowInDBBase):
 
 
 class RowInDB(RowInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Jobs returned per row and kind with a row's jobs, newest first
+ROW_JOBS_LIMIT = 20
+MAX_ROW_JOBS_LIMIT = 500
+
+
+class RowFull(RowInDBBase):
+    # The most recent jobs, without their deferred fields; job_counts covers them all
+    image_jobs: List[ImageJobPartial] = []
+    video_jobs: List[VideoJobPartial] = []
+    job_counts: JobCounts = Field(default_factory=JobCounts)
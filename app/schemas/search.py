@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+
+class SearchHit(BaseModel):
+    # image_job, video_job or row
+    type: str
+    id: UUID
+    row_id: Optional[UUID] = None
+    rank: float
+    # Best matching passage as escaped HTML, with matches wrapped in <b></b>
+    snippet: Optional[str] = None
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class JobCounts(BaseModel):
+    image: Dict[str, int] = Field(default_factory=dict)
+    video: Dict[str, int] = Field(default_factory=dict)
+
+
+class StageLatency(BaseModel):
+    stage: str
+    window_start: datetime
+    count: int
+    # Seconds
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
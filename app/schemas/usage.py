@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+
+class UsageEntry(BaseModel):
+    day: date
+    provider: str
+    operation: str
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    images: int
+    video_seconds: float
+    # Estimated from list prices
+    cost_usd: float
+    
+    class Config:
+        from_attributes = True
+
+
+class ProviderBudget(BaseModel):
+    provider: str
+    daily_budget_usd: Optional[float] = None
+    soft_limit_usd: Optional[float] = None
+    spent_usd: float
+    remaining_usd: Optional[float] = None
+    # ok, soft (bulk jobs slowed down) or hard (new work refused)
+    state: str
+    bulk_delay_seconds: float
+    resets_in_seconds: int
@@ -4,6 +4,7 @@ from typing import Optional
 from uuid import UUID
 
 from app.models.video_job import VideoJobStatus, VideoModel
+from app.utils.serialization import partial_schema
 
 
 class VideoJobBase(BaseModel):
@@ -16,6 +17,8 @@ class VideoJobBase(BaseModel):
 class VideoJobCreate(VideoJobBase):
     row_id: Optional[UUID] = None
     image_job_id: Optional[UUID] = None
+    # Fail the job instead of finishing it later than this many seconds from now
+    deadline_seconds: Optional[int] = Field(default=None, ge=1)
 
 
 class VideoJobUpdate(BaseModel):
@@ -38,7 +41,9 @@ class VideoJobInDBBase(VideoJobBase):
     external_task_id: Optional[str]
     created_at: datetime
     updated_at: datetime
+    submitted_at: Optional[datetime] = None
     completed_at: Optional[datetime]
+    deadline_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -49,4 +54,10 @@ class VideoJob(VideoJobInDBBase):
 
 
 class VideoJobInDB(VideoJobInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Large text columns left out of listings unless asked for with fields=
+LIST_DEFERRED_FIELDS = {"motion_prompt", "error_message"}
+
+VideoJobPartial = partial_schema(VideoJob, "VideoJobPartial")
\ No newline at end of file
@@ -1,4 +1,6 @@
 from app.services.openai_service import openai_service
 from app.services.kling_service import kling_service
+from app.services.image_variant_service import image_variant_service
+from app.services.image_preprocess_service import image_preprocess_service
 
-__all__ = ["openai_service", "kling_service"]
\ No newline at end of file
+__all__ = ["openai_service", "kling_service", "image_variant_service", "image_preprocess_service"]
\ No newline at end of file
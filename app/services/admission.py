@@ -0,0 +1,97 @@
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.services.job_runner import job_runner, provider_breaker
+from app.services.kling_service import kling_service
+from app.services.usage_ledger import KIND_PROVIDERS, seconds_until_reset, usage_ledger
+
+
+class AdmissionController:
+    """
+    Decide whether this process can take on another job.
+
+    A job is refused when its kind's queue is full, when its row (or client,
+    for jobs without a row) already has too many jobs waiting, while the
+    provider's circuit breaker is open, or once the provider's daily budget
+    is spent. Refusals come with a Retry-After estimate from queue depth and
+    recent job durations, or the time until the budgets reset.
+    """
+
+    def breaker(self, kind: str):
+        return provider_breaker(kind)
+
+    def queue_limit(self, kind: str) -> int:
+        return {
+            "image": settings.IMAGE_JOB_QUEUE_LIMIT,
+            "video": settings.VIDEO_JOB_QUEUE_LIMIT,
+        }[kind]
+
+    def check(self, kind: str, group: str) -> Optional[Tuple[str, int]]:
+        """
+        None if the job may be accepted, else (reason, retry_after_seconds)
+        """
+        refusal = self.check_budget(KIND_PROVIDERS[kind])
+        if refusal:
+            return refusal
+
+        breaker = self.breaker(kind)
+        if breaker.state == "open":
+            return f"{breaker.name} is unavailable", max(1, int(breaker.retry_after()) + 1)
+
+        depth = job_runner.depth(kind)
+        in_system = depth["running"] + depth["queued"]
+        limit = self.queue_limit(kind)
+        if in_system >= limit:
+            return (
+                f"Too many {kind} jobs in progress",
+                job_runner.estimate_wait(kind, in_system - limit + 1)
+            )
+
+        if job_runner.group_depth(group) >= settings.ROW_JOB_QUEUE_LIMIT:
+            return (
+                "Too many jobs in progress for this row",
+                job_runner.estimate_wait(kind, job_runner.group_depth(group) - settings.ROW_JOB_QUEUE_LIMIT + 1)
+            )
+
+        return None
+
+    def check_budget(self, provider: str) -> Optional[Tuple[str, int]]:
+        """
+        None while the provider's daily budget allows new work, else (reason, retry_after_seconds)
+        """
+        if usage_ledger.state(provider) == "hard":
+            return f"Daily {provider} budget is spent", seconds_until_reset()
+        return None
+
+    def snapshot(self) -> dict:
+        """
+        Queue depth, limits, breaker state and per-class wait times per job kind,
+        for clients to pace themselves and for tuning scheduler weights
+        """
+        kinds = {}
+        for kind in ("image", "video"):
+            depth = job_runner.depth(kind)
+            in_system = depth["running"] + depth["queued"]
+            limit = self.queue_limit(kind)
+            kinds[kind] = {
+                **depth,
+                "concurrency": job_runner.concurrency(kind),
+                "queue_limit": limit,
+                "available": max(0, limit - in_system),
+                "avg_job_seconds": round(job_runner.average_duration(kind), 2),
+                "estimated_wait_seconds": job_runner.estimate_wait(kind, depth["queued"]) if depth["queued"] else 0,
+                "breaker": self.breaker(kind).snapshot(),
+                "classes": job_runner.scheduler(kind).metrics(),
+            }
+        kinds["video"]["hedging"] = kling_service.hedging_snapshot()
+        budgets = usage_ledger.snapshot()
+        for kind, provider in KIND_PROVIDERS.items():
+            kinds[kind]["budget"] = budgets[provider]
+        return {
+            "kinds": kinds,
+            "row_queue_limit": settings.ROW_JOB_QUEUE_LIMIT,
+            "busiest_rows": dict(job_runner.group_depths().most_common(10)),
+        }
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import JobLease, WorkerNode
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    When a node joins or leaves, only the keys on its arcs move, so the
+    other nodes keep polling the same jobs.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self.replicas = replicas
+        self.nodes = sorted(set(nodes))
+        self._points: List[int] = []
+        self._owners: List[str] = []
+
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class Coordinator:
+    """
+    Coordinate job execution across worker processes through the database.
+
+    Each process registers a worker node and heartbeats it. Live nodes form a
+    hash ring that partitions in-flight work, and lease rows guarantee that
+    only one process acts on a job at a time even while nodes disagree about
+    ring membership.
+    """
+
+    def __init__(self):
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.ring = HashRing([self.node_id])
+        self._leases: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Register this node and start heartbeating
+        """
+        async with AsyncSessionLocal() as db:
+            db.add(WorkerNode(id=self.node_id, hostname=socket.gethostname(), pid=os.getpid()))
+            await db.commit()
+
+        await self.refresh_membership()
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Worker node {self.node_id} registered")
+
+    async def stop(self) -> None:
+        """
+        Stop heartbeating and hand this node's work back to the others
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(JobLease).where(JobLease.owner == self.node_id))
+            await db.execute(delete(WorkerNode).where(WorkerNode.id == self.node_id))
+            await db.commit()
+        self._leases.clear()
+        logger.info(f"Worker node {self.node_id} deregistered")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.WORKER_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                await self.refresh_membership()
+            except Exception as e:
+                logger.error(f"Worker heartbeat error: {str(e)}")
+
+    async def refresh_membership(self) -> None:
+        """
+        Heartbeat this node and its leases, drop dead nodes and rebuild the hash ring
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=settings.WORKER_NODE_TTL_SECONDS)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(WorkerNode).where(WorkerNode.id == self.node_id).values(heartbeat_at=now)
+            )
+            if result.rowcount == 0:
+                # Another node pruned us after a long pause; re-register
+                db.add(WorkerNode(id=self.node_id, hostname=socket.gethostname(), pid=os.getpid()))
+
+            dead = await db.execute(select(WorkerNode.id).where(WorkerNode.heartbeat_at < cutoff))
+            dead_nodes = list(dead.scalars())
+            if dead_nodes:
+                await db.execute(delete(WorkerNode).where(WorkerNode.id.in_(dead_nodes)))
+                await db.execute(delete(JobLease).where(JobLease.owner.in_(dead_nodes)))
+                logger.warning(f"Removed dead worker nodes: {', '.join(dead_nodes)}")
+
+            # Keep leases on long-running jobs alive while this node is
+            if self._leases:
+                expires_at = now + timedelta(seconds=settings.JOB_LEASE_TTL_SECONDS)
+                await db.execute(
+                    update(JobLease)
+                    .where(JobLease.owner == self.node_id, JobLease.resource.in_(list(self._leases)))
+                    .values(expires_at=expires_at)
+                )
+                self._leases = dict.fromkeys(self._leases, expires_at)
+
+            live = await db.execute(select(WorkerNode.id).where(WorkerNode.heartbeat_at >= cutoff))
+            nodes = set(live.scalars()) | {self.node_id}
+            await db.commit()
+
+        if nodes != set(self.ring.nodes):
+            logger.info(f"Rebalancing work across {len(nodes)} worker nodes")
+            self.ring = HashRing(nodes)
+
+    def owns(self, key: str) -> bool:
+        """
+        Whether this node is responsible for the given key
+        """
+        return self.ring.node_for(key) in (None, self.node_id)
+
+    async def acquire_lease(self, resource: str) -> bool:
+        """
+        Take or renew the lease on a resource; False if another node holds it
+        """
+        now = datetime.utcnow()
+        held_until = self._leases.get(resource)
+        ttl = timedelta(seconds=settings.JOB_LEASE_TTL_SECONDS)
+
+        # Skip the round trip while more than half of our lease remains
+        if held_until and held_until - now > ttl / 2:
+            return True
+
+        expires_at = now + ttl
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(JobLease)
+                .where(
+                    JobLease.resource == resource,
+                    (JobLease.owner == self.node_id) | (JobLease.expires_at < now)
+                )
+                .values(owner=self.node_id, acquired_at=now, expires_at=expires_at)
+            )
+            acquired = result.rowcount == 1
+            if not acquired:
+                try:
+                    await db.execute(
+                        insert(JobLease).values(
+                            resource=resource, owner=self.node_id, acquired_at=now, expires_at=expires_at
+                        )
+                    )
+                    acquired = True
+                except IntegrityError:
+                    await db.rollback()
+                    self._leases.pop(resource, None)
+                    return False
+            await db.commit()
+
+        self._leases[resource] = expires_at
+        return True
+
+    def held_leases(self) -> List[str]:
+        """
+        Resources this node holds leases on
+        """
+        return list(self._leases)
+
+    async def release_lease(self, resource: str) -> None:
+        """
+        Give up a lease this node holds
+        """
+        self._leases.pop(resource, None)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(JobLease).where(JobLease.resource == resource, JobLease.owner == self.node_id)
+            )
+            await db.commit()
+
+
+coordinator = Coordinator()
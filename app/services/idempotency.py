@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyService:
+    """
+    Store responses of job-creating requests by Idempotency-Key.
+
+    The first request with a key claims it; the response is saved in the
+    same transaction that creates the job, and later requests with the key
+    get the saved response back without creating another job.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def claim(self, key: str, endpoint: str, fingerprint: str) -> Optional[JSONResponse]:
+        """
+        Claim a key for a new request, or return the stored response for a replay.
+        Raises 422 if the key was used for a different request and 409 if the
+        first request with it is still in progress.
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            existing = await db.get(IdempotencyKey, key)
+            if existing and existing.expires_at < now:
+                await db.delete(existing)
+                await db.flush()
+                existing = None
+
+            if existing is None:
+                db.add(IdempotencyKey(
+                    key=key,
+                    endpoint=endpoint,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+                ))
+                try:
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    # A concurrent request claimed it first
+                    await db.rollback()
+                    existing = await db.get(IdempotencyKey, key)
+                    if existing is None:
+                        raise HTTPException(status_code=409, detail="Request with this Idempotency-Key is in progress")
+
+        if existing.endpoint != endpoint or existing.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if existing.response is None:
+            raise HTTPException(status_code=409, detail="Request with this Idempotency-Key is in progress")
+
+        return JSONResponse(
+            content=json.loads(existing.response),
+            status_code=existing.status_code,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    async def save(self, db: AsyncSession, key: str, response, status_code: int = 200) -> None:
+        """
+        Store the response in the caller's transaction, so it commits with the job
+        """
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response=json.dumps(jsonable_encoder(response)),
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+            )
+        )
+
+    async def release(self, key: str) -> None:
+        """
+        Drop a claim whose request failed, so the client can retry with the same key
+        """
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.response.is_(None))
+            )
+            await db.commit()
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow()))
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} expired idempotency keys")
+        return result.rowcount
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.error(f"Idempotency key purge error: {str(e)}")
+            await asyncio.sleep(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS)
+
+
+idempotency_service = IdempotencyService()
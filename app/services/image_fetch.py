@@ -0,0 +1,90 @@
+import asyncio
+import base64
+import ipaddress
+import logging
+import socket
+from typing import List
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class UnsafeURLError(Exception):
+    pass
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # Loopback, private, link-local (cloud metadata), reserved and the like are not global
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def check_url(url: httpx.URL) -> None:
+    """
+    Refuse URLs the server must not fetch on a client's behalf: anything
+    but http(s), and hosts resolving to internal addresses.
+    Raises UnsafeURLError.
+    """
+    if url.scheme not in ("http", "https") or not url.host:
+        raise UnsafeURLError(f"Unsupported image URL: {url}")
+    if settings.IMAGE_FETCH_ALLOW_PRIVATE:
+        return
+
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        addresses = await _resolve(url.host, port)
+    except socket.gaierror:
+        raise UnsafeURLError(f"Cannot resolve image host: {url.host}")
+    if not addresses or not all(_is_public(address) for address in addresses):
+        raise UnsafeURLError(f"Image host is not a public address: {url.host}")
+
+
+async def fetch_image(source_url: str) -> bytes:
+    """
+    Load image bytes from a data URL or over HTTP
+    """
+    if source_url.startswith("data:"):
+        base64_part = source_url.split(",", 1)[1] if "," in source_url else ""
+        return base64.b64decode(base64_part)
+
+    url = httpx.URL(source_url)
+    async with httpx.AsyncClient() as client:
+        # Redirects are followed by hand so every hop is checked
+        for _ in range(settings.IMAGE_FETCH_MAX_REDIRECTS + 1):
+            await check_url(url)
+            async with client.stream("GET", url, timeout=30.0) as response:
+                location = response.headers.get("Location")
+                if response.status_code in REDIRECT_STATUSES and location:
+                    url = response.url.join(location)
+                    continue
+
+                if response.is_error:
+                    logger.error(f"Source image fetch error: {response.status_code} {source_url}")
+                    raise Exception(f"Failed to fetch source image: HTTP {response.status_code}")
+
+                # Refuse oversized images before downloading them, or as soon as they get too big
+                content_length = response.headers.get("Content-Length")
+                if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FILE_SIZE:
+                    raise Exception("Source image exceeds maximum file size")
+
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    if len(content) > settings.MAX_FILE_SIZE:
+                        raise Exception("Source image exceeds maximum file size")
+
+                return bytes(content)
+
+    raise Exception("Too many redirects fetching source image")
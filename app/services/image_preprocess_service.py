@@ -0,0 +1,111 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from typing import Tuple
+
+from app.core.config import settings
+from app.services.image_fetch import fetch_image
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.images import fit_image, probe_image
+from app.utils.process_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Cached entries starting with this prefix mean the source is already within
+# limits; the rest of the entry records its dimensions as "WxH"
+_USE_ORIGINAL = b"="
+
+
+class ImagePreprocessService:
+    """
+    Shrink oversized source images to what each provider can actually use
+    before they are submitted upstream
+    """
+
+    def __init__(self):
+        self.cache = DiskLRUCache(
+            os.path.join(settings.IMAGE_CACHE_DIR, "preprocessed"),
+            settings.IMAGE_PREPROCESS_CACHE_MAX_BYTES
+        )
+
+    async def _prepare(self, source_url: str, profile: str, max_long_side: int,
+                       max_short_side: int, max_bytes: int) -> Tuple[str, int, int]:
+        """
+        Return the URL to submit plus the source dimensions (0 if unknown)
+        """
+        key = hashlib.sha256(
+            f"{profile}:{max_long_side}:{max_short_side}:{max_bytes}:{source_url}".encode()
+        ).hexdigest()
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            if cached.startswith(_USE_ORIGINAL):
+                width, height = cached[len(_USE_ORIGINAL):].decode().split("x")
+                return source_url, int(width), int(height)
+            return _to_data_url(cached), 0, 0
+
+        try:
+            data = await fetch_image(source_url)
+            _, width, height = probe_image(data)
+        except Exception as e:
+            # Let the provider try the original rather than failing the job here
+            logger.warning(f"Image preprocessing skipped for {profile}: {str(e)}")
+            return source_url, 0, 0
+
+        oversized = (
+            max(width, height) > max_long_side
+            or min(width, height) > max_short_side
+            or len(data) > max_bytes
+        )
+        if not oversized:
+            await asyncio.to_thread(self.cache.put, key, _USE_ORIGINAL + f"{width}x{height}".encode())
+            return source_url, width, height
+
+        processed = await run_in_process(
+            fit_image, data, max_long_side, max_short_side, settings.IMAGE_PREPROCESS_QUALITY
+        )
+        logger.info(
+            f"Preprocessed {profile} image {width}x{height} "
+            f"({len(data)} bytes -> {len(processed)} bytes)"
+        )
+        await asyncio.to_thread(self.cache.put, key, processed)
+        return _to_data_url(processed), width, height
+
+    async def prepare_for_kling(self, source_url: str) -> str:
+        """
+        Return an image reference within KLING's useful resolution and size
+        """
+        image_url, _, _ = await self._prepare(
+            source_url,
+            "kling",
+            settings.KLING_IMAGE_MAX_DIMENSION,
+            settings.KLING_IMAGE_MAX_DIMENSION,
+            settings.KLING_IMAGE_MAX_BYTES
+        )
+        return image_url
+
+    async def prepare_for_vision(self, source_url: str) -> Tuple[str, str]:
+        """
+        Return an image reference for the vision model and the detail tier to use
+        """
+        image_url, width, height = await self._prepare(
+            source_url,
+            "vision",
+            settings.VISION_IMAGE_MAX_DIMENSION,
+            settings.VISION_IMAGE_MAX_SHORT_SIDE,
+            settings.MAX_FILE_SIZE
+        )
+
+        # Small images gain nothing from high detail tiles
+        if width and height and max(width, height) <= settings.VISION_LOW_DETAIL_MAX_DIMENSION:
+            return image_url, "low"
+        return image_url, "high"
+
+
+def _to_data_url(data: bytes) -> str:
+    return f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+
+
+image_preprocess_service = ImagePreprocessService()
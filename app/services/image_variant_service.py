@@ -0,0 +1,73 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Dict
+
+from app.core.config import settings
+from app.services.image_fetch import fetch_image
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.images import make_variant
+from app.utils.process_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+VARIANT_MEDIA_TYPES = {
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+
+class ImageVariantService:
+    def __init__(self):
+        self.cache = DiskLRUCache(
+            os.path.join(settings.IMAGE_CACHE_DIR, "variants"),
+            settings.IMAGE_VARIANT_CACHE_MAX_BYTES
+        )
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def cache_key(self, source_url: str, width: int, fmt: str, quality: int) -> str:
+        """
+        Build the cache key from the source hash plus variant parameters
+        """
+        source_hash = hashlib.sha256(source_url.encode()).hexdigest()
+        return hashlib.sha256(f"{source_hash}:{width}:{fmt}:{quality}".encode()).hexdigest()
+
+    async def get_variant(self, source_url: str, width: int, fmt: str = "webp", quality: int = 80) -> bytes:
+        """
+        Return a resized variant of the source image, rendering it on a cache miss
+        """
+        key = self.cache_key(source_url, width, fmt, quality)
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return cached
+
+        # Coalesce concurrent requests for the same variant into one render.
+        # The render runs as its own task, so a requester that goes away
+        # (e.g. a client disconnect) does not cancel it for the others.
+        render = self._in_flight.get(key)
+        if render is None:
+            render = asyncio.create_task(self._render(key, source_url, width, fmt, quality))
+            self._in_flight[key] = render
+            render.add_done_callback(lambda task: self._finished(key, task))
+        return await asyncio.shield(render)
+
+    async def _render(self, key: str, source_url: str, width: int, fmt: str, quality: int) -> bytes:
+        try:
+            source = await fetch_image(source_url)
+            data = await run_in_process(make_variant, source, width, fmt, quality)
+            await asyncio.to_thread(self.cache.put, key, data)
+            return data
+        except Exception as e:
+            logger.error(f"Image variant error: {str(e)}")
+            raise
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every requester has gone away
+        if not task.cancelled():
+            task.exception()
+
+image_variant_service = ImageVariantService()
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.job_counters import transition
+from app.db.session import AsyncSessionLocal
+from app.models import ImageJob, ImageJobStatus, VideoJob, VideoJobStatus
+from app.services.coordinator import coordinator
+from app.services.job_runner import job_runner
+
+logger = logging.getLogger(__name__)
+
+JOB_MODELS = {"image": ImageJob, "video": VideoJob}
+
+JOB_STATUSES = {"image": ImageJobStatus, "video": VideoJobStatus}
+
+
+def _in_flight(kind: str) -> List:
+    statuses = JOB_STATUSES[kind]
+    return [statuses.PENDING, statuses.PROCESSING]
+
+
+async def cancel_jobs(db: AsyncSession, kind: str, job_ids: Sequence[UUID]) -> List[UUID]:
+    """
+    Mark the pending or processing jobs among job_ids CANCELLED; does not
+    commit. Returns the ids that were cancelled.
+    """
+    model = JOB_MODELS[kind]
+    result = await db.execute(
+        select(model.id, model.status).where(model.id.in_(job_ids), model.status.in_(_in_flight(kind)))
+    )
+    cancelled = []
+    for job_id, status in result.all():
+        # Compare-and-set from the status just read, in case the job moved on meanwhile
+        if await transition(db, model, job_id, status, JOB_STATUSES[kind].CANCELLED):
+            cancelled.append(job_id)
+    return cancelled
+
+
+async def cancel_row_jobs(db: AsyncSession, row_id: UUID) -> Dict[str, List[UUID]]:
+    """
+    Cancel every pending or processing job of a row; does not commit
+    """
+    cancelled = {}
+    for kind, model in JOB_MODELS.items():
+        result = await db.execute(
+            select(model.id).where(model.row_id == row_id, model.status.in_(_in_flight(kind)))
+        )
+        cancelled[kind] = await cancel_jobs(db, kind, result.scalars().all())
+    return cancelled
+
+
+async def _variant_work(job_ids: Sequence[UUID]) -> List[UUID]:
+    """
+    The cancelled image jobs whose work should stop. A variant whose group
+    still has jobs in flight is skipped, as its task may be generating them;
+    once none are left, every job of the group is included, since any one
+    of their tasks may be the one generating the group.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ImageJob.id, ImageJob.variant_group_id)
+            .where(ImageJob.id.in_(job_ids), ImageJob.variant_group_id.is_not(None))
+        )
+        groups = dict(result.all())
+        if not groups:
+            return list(job_ids)
+        result = await db.execute(
+            select(ImageJob.id, ImageJob.variant_group_id, ImageJob.status)
+            .where(ImageJob.variant_group_id.in_(set(groups.values())))
+        )
+        members = result.all()
+
+    busy = {group_id for _, group_id, status in members if status in _in_flight("image")}
+    stop = [job_id for job_id in job_ids if groups.get(job_id) not in busy]
+    stop += [
+        job_id for job_id, group_id, _ in members
+        if group_id not in busy and job_id not in stop
+    ]
+    return stop
+
+
+async def stop_local_work(kind: str, job_ids: Sequence[UUID]) -> None:
+    """
+    Once cancellations are committed, stop what this process is doing for
+    those jobs: cancel their tasks, freeing the worker slots, and drop the
+    leases the video poller holds on them. A cancelled variant's task is
+    left to generate the rest of its group; the cancelled job's image is
+    dropped when the results are saved.
+    """
+    if kind == "image" and job_ids:
+        job_ids = await _variant_work(job_ids)
+
+    held = set(coordinator.held_leases())
+    for job_id in job_ids:
+        key = f"{kind}:{job_id}"
+        job_runner.cancel(key)
+        if key in held:
+            await coordinator.release_lease(key)
+
+
+class CancellationWatcher:
+    """
+    Stop local work on jobs cancelled through another process.
+
+    A cancel request stops the work of the process that handled it at once;
+    every JOB_CANCEL_CHECK_SECONDS each process also looks up the jobs it is
+    running or holds leases on, and stops the ones cancelled elsewhere.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_CANCEL_CHECK_SECONDS)
+            try:
+                await self.check_once()
+            except Exception as e:
+                logger.error(f"Cancellation check error: {str(e)}")
+
+    async def check_once(self) -> int:
+        """
+        Stop local work on cancelled jobs; returns how many jobs were stopped
+        """
+        local: Dict[str, List[UUID]] = defaultdict(list)
+        for key in set(job_runner.keys()) | set(coordinator.held_leases()):
+            kind, job_id = key.split(":", 1)
+            if kind in JOB_MODELS:
+                local[kind].append(UUID(job_id))
+        if not local:
+            return 0
+
+        cancelled = {}
+        async with AsyncSessionLocal() as db:
+            for kind, job_ids in local.items():
+                model = JOB_MODELS[kind]
+                result = await db.execute(
+                    select(model.id).where(model.id.in_(job_ids), model.status == JOB_STATUSES[kind].CANCELLED)
+                )
+                cancelled[kind] = result.scalars().all()
+
+        for kind, job_ids in cancelled.items():
+            await stop_local_work(kind, job_ids)
+        return sum(len(job_ids) for job_ids in cancelled.values())
+
+
+cancellation_watcher = CancellationWatcher()
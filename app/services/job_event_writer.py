@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert
+
+from app.core.config import settings
+from app.db.job_events import buffered_events, requeue_events, take_events
+from app.db.session import AsyncSessionLocal
+from app.models import JobEvent
+
+logger = logging.getLogger(__name__)
+
+
+class JobEventWriter:
+    """
+    Write buffered job events to job_events in batches.
+
+    Jobs only append to an in-memory buffer; this loop drains it every
+    JOB_EVENT_FLUSH_SECONDS with multi-row inserts, and drops events older
+    than JOB_EVENT_RETENTION_DAYS once an hour.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._purged_at = 0.0
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far; returns how many events were written
+        """
+        written = 0
+        while True:
+            events = take_events(settings.JOB_EVENT_BATCH_SIZE)
+            if not events:
+                return written
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(JobEvent), events)
+                    await db.commit()
+            except Exception:
+                requeue_events(events)
+                raise
+            written += len(events)
+
+    async def purge_expired(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=settings.JOB_EVENT_RETENTION_DAYS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(JobEvent).where(JobEvent.created_at < cutoff))
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} job events older than {settings.JOB_EVENT_RETENTION_DAYS} days")
+        return result.rowcount
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Write what the drained jobs logged on the way out
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Dropped {buffered_events()} job events at shutdown: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush()
+                if time.monotonic() - self._purged_at > 3600:
+                    self._purged_at = time.monotonic()
+                    await self.purge_expired()
+            except Exception as e:
+                logger.error(f"Job event writer error: {str(e)}")
+            await asyncio.sleep(settings.JOB_EVENT_FLUSH_SECONDS)
+
+
+job_event_writer = JobEventWriter()
@@ -0,0 +1,226 @@
+import asyncio
+import itertools
+import logging
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.db.job_counters import transition
+from app.db.job_events import note_event
+from app.db.usage import usage_row
+from app.db.session import AsyncSessionLocal
+from app.models import ImageJob, ImageJobStatus, VideoJob, VideoJobStatus, VideoModel
+from app.services.coordinator import coordinator
+from app.services.image_preprocess_service import image_preprocess_service
+from app.services.kling_service import kling_service
+from app.services.openai_service import openai_service
+from app.services.prompt_index import prompt_index
+from app.services.video_poller import video_poller
+from app.utils.deadline import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+
+def image_job_key(job_id: UUID) -> str:
+    return f"image:{job_id}"
+
+
+def video_job_key(job_id: UUID) -> str:
+    return f"video:{job_id}"
+
+
+def video_submit_lease(job_id: UUID) -> str:
+    """
+    Lease held while submitting a video job. Distinct from the poller's lease,
+    which is re-entrant on the same node, so a retry being submitted is never
+    polled against its previous KLING task.
+    """
+    return f"video-submit:{job_id}"
+
+
+async def _checkpoint(model, status_enum, job_id: UUID) -> None:
+    """
+    Hand an interrupted job back as PENDING so another node resumes it
+    """
+    async with AsyncSessionLocal() as db:
+        await transition(db, model, job_id, status_enum.PROCESSING, status_enum.PENDING)
+        await db.commit()
+
+
+async def _claim_variants(db, job: ImageJob) -> List[ImageJob]:
+    """
+    Claim the job's pending siblings, leased, so one call generates them all
+    """
+    result = await db.execute(
+        select(ImageJob.id).where(
+            ImageJob.variant_group_id == job.variant_group_id,
+            ImageJob.id != job.id,
+            ImageJob.status == ImageJobStatus.PENDING,
+        ).order_by(ImageJob.variant_index)
+    )
+    sibling_ids = result.scalars().all()
+    # End the read before taking leases, which use their own transactions
+    await db.commit()
+
+    leased_ids = [
+        sibling_id for sibling_id in sibling_ids
+        if await coordinator.acquire_lease(image_job_key(sibling_id))
+    ]
+    claimed_ids = []
+    for sibling_id in leased_ids:
+        if await transition(db, ImageJob, sibling_id, ImageJobStatus.PENDING, ImageJobStatus.PROCESSING):
+            claimed_ids.append(sibling_id)
+    await db.commit()
+
+    for sibling_id in set(leased_ids) - set(claimed_ids):
+        await coordinator.release_lease(image_job_key(sibling_id))
+    if not claimed_ids:
+        return []
+
+    result = await db.execute(
+        select(ImageJob).where(ImageJob.id.in_(claimed_ids)).order_by(ImageJob.variant_index)
+    )
+    return list(result.scalars().all())
+
+
+async def process_image_generation(job_id: UUID):
+    """
+    Background task to process image generation, together with any pending
+    variants of the same job
+    """
+    key = image_job_key(job_id)
+    # The lease marks the job as owned by a live process for the reconciler
+    if not await coordinator.acquire_lease(key):
+        return
+
+    jobs: List[ImageJob] = []
+    try:
+        async with AsyncSessionLocal() as db:
+            # Claim the job so no other process generates it too
+            claimed = await transition(
+                db, ImageJob, job_id, ImageJobStatus.PENDING, ImageJobStatus.PROCESSING
+            )
+            await db.commit()
+
+            # Get job
+            result = await db.execute(select(ImageJob).where(ImageJob.id == job_id))
+            job = result.scalar_one_or_none()
+            if job is None:
+                return
+            jobs = [job] if claimed else []
+            # Variants are generated by whichever of their tasks runs first, so a
+            # group whose job was cancelled (or taken) still gets its other images
+            if job.variant_group_id is not None:
+                jobs += await _claim_variants(db, job)
+            if not jobs:
+                return
+            job = jobs[0]
+
+            image_urls: List[str] = []
+            error = "No image data in response"
+            try:
+                # Generate all claimed variants in one request
+                async with deadline_scope(job.deadline_at):
+                    with usage_row(job.row_id):
+                        image_urls = await openai_service.generate_images(job.prompt, job.size, len(jobs))
+
+            except asyncio.CancelledError:
+                for variant in jobs:
+                    await _checkpoint(ImageJob, ImageJobStatus, variant.id)
+                raise
+            except Exception as e:
+                error = str(e)
+
+            # Update jobs with results; compare-and-set, so a job cancelled meanwhile stays cancelled
+            completed_at = datetime.utcnow()
+            for variant, image_url in itertools.zip_longest(jobs, image_urls[:len(jobs)]):
+                if image_url is None:
+                    await transition(
+                        db, ImageJob, variant.id, ImageJobStatus.PROCESSING, ImageJobStatus.FAILED,
+                        error_message=error
+                    )
+                elif await transition(
+                    db, ImageJob, variant.id, ImageJobStatus.PROCESSING, ImageJobStatus.COMPLETED,
+                    image_url=image_url, completed_at=completed_at
+                ):
+                    # Later near-identical prompts can reuse this result
+                    await prompt_index.add(db, variant)
+            # Every variant is written in one transaction
+            await db.commit()
+    finally:
+        await coordinator.release_lease(key)
+        for variant in jobs:
+            if variant.id != job_id:
+                await coordinator.release_lease(image_job_key(variant.id))
+
+
+async def process_video_generation(job_id: UUID):
+    """
+    Background task to submit a video generation job.
+    Polling for the result is done by the video poller on whichever node owns the task.
+    """
+    lease = video_submit_lease(job_id)
+    # The lease marks the job as owned by a live process for the reconciler
+    if not await coordinator.acquire_lease(lease):
+        return
+
+    try:
+        async with AsyncSessionLocal() as db:
+            # Claim the job so no other process submits it too; a retried job
+            # must not be polled against the task of its previous attempt
+            claimed = await transition(
+                db, VideoJob, job_id, VideoJobStatus.PENDING, VideoJobStatus.PROCESSING,
+                external_task_id=None, submitted_at=None, video_url=None
+            )
+            await db.commit()
+            if not claimed:
+                return
+
+            # Get job
+            result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
+            job = result.scalar_one()
+
+            try:
+                if job.model == VideoModel.KLING:
+                    async with deadline_scope(job.deadline_at):
+                        # Shrink oversized sources before uploading them to KLING
+                        source_image = await image_preprocess_service.prepare_for_kling(job.source_image_url)
+
+                        # Create KLING task
+                        with usage_row(job.row_id):
+                            task_result = await kling_service.create_video_task(
+                                source_image,
+                                job.motion_prompt,
+                                job.duration
+                            )
+
+                    # Store external task ID; the poller takes it from here
+                    job.external_task_id = task_result["task_id"]
+                    job.submitted_at = datetime.utcnow()
+                    note_event(
+                        db.sync_session, "video", job_id, "submitted",
+                        external_task_id=job.external_task_id, created_at=job.submitted_at
+                    )
+                    await db.commit()
+                    video_poller.wake()
+                    return
+
+                else:
+                    # TODO: Implement Veo integration
+                    raise Exception(f"Model {job.model} not implemented yet")
+
+            except asyncio.CancelledError:
+                await _checkpoint(VideoJob, VideoJobStatus, job_id)
+                raise
+            except Exception as e:
+                # Update job with error, unless it was cancelled meanwhile
+                await transition(
+                    db, VideoJob, job_id, VideoJobStatus.PROCESSING, VideoJobStatus.FAILED,
+                    error_message=str(e)
+                )
+
+            await db.commit()
+    finally:
+        await coordinator.release_lease(lease)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select
+
+from app.core.config import settings
+from app.db.job_counters import transition
+from app.db.session import AsyncSessionLocal
+from app.models import ImageJob, ImageJobStatus, JobLease, VideoJob, VideoJobStatus
+from app.services.coordinator import coordinator
+from app.services.job_processing import (
+    image_job_key,
+    process_image_generation,
+    process_video_generation,
+    video_job_key,
+    video_submit_lease,
+)
+from app.services.job_runner import job_runner, queue_lease
+from app.services.video_poller import video_poller
+
+logger = logging.getLogger(__name__)
+
+
+class JobReconciler:
+    """
+    Resume jobs orphaned by a crash or restart.
+
+    A job is orphaned when it is PROCESSING (or has sat PENDING past the
+    grace period) and no live process holds its lease, nor has it queued. Such jobs are reset
+    to PENDING and resubmitted on the node that owns them in the hash ring.
+    Submitted KLING tasks need nothing beyond the poller, which resumes them
+    in bulk from the database.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self.reconcile()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_RECOVERY_INTERVAL_SECONDS)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Job reconciliation error: {str(e)}")
+
+    async def reconcile(self) -> int:
+        """
+        Resubmit orphaned jobs owned by this node; returns how many were resumed
+        """
+        now = datetime.utcnow()
+        grace_cutoff = now - timedelta(seconds=settings.JOB_RECOVERY_GRACE_SECONDS)
+
+        async with AsyncSessionLocal() as db:
+            leased = await db.execute(select(JobLease.resource).where(JobLease.expires_at >= now))
+            live_leases = set(leased.scalars())
+
+            image_result = await db.execute(
+                select(ImageJob.id).where(
+                    or_(
+                        ImageJob.status == ImageJobStatus.PROCESSING,
+                        and_(ImageJob.status == ImageJobStatus.PENDING, ImageJob.created_at < grace_cutoff)
+                    )
+                )
+            )
+            video_result = await db.execute(
+                select(VideoJob.id).where(
+                    VideoJob.external_task_id.is_(None),
+                    or_(
+                        VideoJob.status == VideoJobStatus.PROCESSING,
+                        and_(VideoJob.status == VideoJobStatus.PENDING, VideoJob.created_at < grace_cutoff)
+                    )
+                )
+            )
+            polling = await db.execute(
+                select(VideoJob.id).where(
+                    VideoJob.status == VideoJobStatus.PROCESSING,
+                    VideoJob.external_task_id.isnot(None)
+                )
+            )
+
+            # (model, statuses, runner key, lease, processor, job id)
+            orphans = [
+                (
+                    ImageJob, ImageJobStatus, image_job_key(job_id), image_job_key(job_id),
+                    process_image_generation, job_id
+                )
+                for job_id in image_result.scalars()
+            ] + [
+                (
+                    VideoJob, VideoJobStatus, video_job_key(job_id), video_submit_lease(job_id),
+                    process_video_generation, job_id
+                )
+                for job_id in video_result.scalars()
+            ]
+            orphans = [
+                orphan for orphan in orphans
+                if orphan[3] not in live_leases
+                and queue_lease(orphan[2]) not in live_leases
+                and coordinator.owns(str(orphan[5]))
+            ]
+
+            # Hand PROCESSING orphans back to PENDING so the processors can claim them
+            for model, status, _, _, _, job_id in orphans:
+                await transition(db, model, job_id, status.PROCESSING, status.PENDING)
+            await db.commit()
+            polling_count = len(polling.all())
+
+        resumed = sum(
+            job_runner.submit(key, processor, job_id)
+            for _, _, key, _, processor, job_id in orphans
+        )
+
+        if polling_count:
+            video_poller.wake()
+        if resumed or polling_count:
+            logger.info(f"Recovered {resumed} orphaned jobs; {polling_count} KLING tasks awaiting poll")
+        return resumed
+
+
+job_reconciler = JobReconciler()
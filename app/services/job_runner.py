@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.job_events import record_event
+from app.services.coordinator import coordinator
+from app.services.kling_service import kling_service
+from app.services.openai_service import openai_service
+from app.services.scheduler import FairScheduler
+from app.services.usage_ledger import KIND_PROVIDERS, usage_ledger
+
+logger = logging.getLogger(__name__)
+
+# Assumed job duration until some jobs of a kind have finished
+DEFAULT_JOB_SECONDS = 5.0
+
+
+def job_kind(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def queue_lease(key: str) -> str:
+    """
+    Lease held while a job waits or runs in a process's runner
+    """
+    return f"queued:{key}"
+
+
+def provider_breaker(kind: str):
+    """
+    Circuit breaker of the provider a job kind calls
+    """
+    return {"image": openai_service.breaker, "video": kling_service.breaker}[kind]
+
+
+def _record(key: str, name: str) -> None:
+    kind, job_id = key.split(":", 1)
+    record_event(kind, UUID(job_id), name)
+
+
+class JobRunner:
+    """
+    Run job coroutines as tracked tasks.
+
+    Unlike request background tasks, these outlive the request that created
+    them, can be started by the crash reconciler, and can be drained with a
+    deadline on shutdown. Each job kind runs at most its configured number of
+    jobs at once; the rest wait in this process and are started in priority
+    and fair-share order (see FairScheduler), after any hold-back for the
+    provider's daily budget (see UsageLedger) or open circuit breaker.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._groups: Dict[str, Optional[str]] = {}
+        self._started: Set[str] = set()
+        self._schedulers: Dict[str, FairScheduler] = {}
+        self._durations: Dict[str, float] = {}
+        self.accepting = True
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def concurrency(self, kind: str) -> int:
+        return {
+            "image": settings.IMAGE_JOB_CONCURRENCY,
+            "video": settings.VIDEO_JOB_CONCURRENCY,
+        }.get(kind, 1)
+
+    def depth(self, kind: str) -> Dict[str, int]:
+        """
+        Running and waiting jobs of a kind
+        """
+        keys = [key for key in self._tasks if job_kind(key) == kind]
+        running = sum(1 for key in keys if key in self._started)
+        return {"running": running, "queued": len(keys) - running}
+
+    def group_depth(self, group: str) -> int:
+        return sum(1 for g in self._groups.values() if g == group)
+
+    def group_depths(self) -> Counter:
+        return Counter(g for g in self._groups.values() if g is not None)
+
+    def scheduler(self, kind: str) -> FairScheduler:
+        if kind not in self._schedulers:
+            self._schedulers[kind] = FairScheduler(self.concurrency(kind))
+        return self._schedulers[kind]
+
+    def average_duration(self, kind: str) -> float:
+        return self._durations.get(kind, DEFAULT_JOB_SECONDS)
+
+    def estimate_wait(self, kind: str, jobs_ahead: int) -> int:
+        """
+        Seconds until jobs_ahead more jobs of a kind have finished
+        """
+        return max(1, math.ceil(self.average_duration(kind) * jobs_ahead / self.concurrency(kind)))
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        group: Optional[str] = None,
+        share: Optional[str] = None,
+        priority: str = "bulk"
+    ) -> bool:
+        """
+        Start fn(*args) unless a task with this key is running or we are draining.
+        group is what the job counts against for admission limits, share who it
+        is fairly queued as (defaults to group), priority "interactive" or "bulk".
+        Jobs that are not started stay PENDING for the reconciler to pick up.
+        """
+        if not self.accepting or key in self._tasks:
+            return False
+
+        share = share or group or "system"
+        task = asyncio.create_task(self._run(key, fn, *args, share=share, priority=priority), name=key)
+        self._tasks[key] = task
+        self._groups[key] = group
+        _record(key, "queued")
+        task.add_done_callback(lambda t: self._finished(key, t))
+        return True
+
+    async def _run(self, key: str, fn: Callable[..., Awaitable[Any]], *args: Any, share: str, priority: str) -> None:
+        # Jobs can wait here longer than the reconciler's grace period; the
+        # lease, renewed by the node heartbeat, tells it they are not orphaned
+        lease = queue_lease(key)
+        if not await coordinator.acquire_lease(lease):
+            # Already queued on another node
+            return
+        try:
+            await self._schedule(key, fn, *args, share=share, priority=priority)
+        finally:
+            await coordinator.release_lease(lease)
+
+    async def _schedule(
+        self,
+        key: str,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        share: str,
+        priority: str
+    ) -> None:
+        kind = job_kind(key)
+        scheduler = self.scheduler(kind)
+        # Wait out a spent provider budget or an open breaker without holding
+        # a worker slot, so work for other providers and classes keeps moving
+        await usage_ledger.throttle(KIND_PROVIDERS[kind], priority)
+        await provider_breaker(kind).wait()
+        await scheduler.acquire(share, priority)
+        try:
+            self._started.add(key)
+            _record(key, "started")
+            started = time.monotonic()
+            try:
+                await fn(*args)
+            finally:
+                # Exponentially weighted, so the estimate follows provider slowdowns
+                elapsed = time.monotonic() - started
+                previous = self._durations.get(kind)
+                self._durations[kind] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+        finally:
+            scheduler.release()
+
+    def keys(self) -> List[str]:
+        """
+        Keys of the jobs running or waiting in this process
+        """
+        return list(self._tasks)
+
+    def cancel(self, key: str) -> bool:
+        """
+        Cancel a job's task, running or waiting, freeing its slot.
+        The job's status is the caller's to settle first; a processor that
+        sees CancelledError only puts jobs that are still PROCESSING back.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._tasks.pop(key, None)
+        self._groups.pop(key, None)
+        self._started.discard(key)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Job task {key} crashed: {task.exception()}")
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Stop accepting work and wait for running tasks up to the deadline.
+        Jobs still waiting for a slot are cancelled at once and stay PENDING;
+        tasks still running at the deadline are cancelled so they can checkpoint.
+        Returns how many had to be cancelled.
+        """
+        self.accepting = False
+        waiting = [task for key, task in self._tasks.items() if key not in self._started]
+        for task in waiting:
+            task.cancel()
+
+        tasks = [task for key, task in self._tasks.items() if key in self._started]
+        if not tasks:
+            return len(waiting)
+
+        logger.info(f"Draining {len(tasks)} in-flight jobs (deadline {timeout}s)")
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=5)
+            logger.warning(f"Cancelled {len(pending)} jobs at drain deadline")
+        return len(waiting) + len(pending)
+
+
+job_runner = JobRunner()
@@ -2,19 +2,44 @@ import jwt
 import httpx
 import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
 from app.core.config import settings
+from app.db.usage import record_usage
+from app.utils import deadline
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.hedging import HedgeBudget, Hedger
+from app.utils.pricing import video_cost
 
 logger = logging.getLogger(__name__)
 
 
+# KLING answers a second task with a known external_task_id with 409 Conflict
+DUPLICATE_TASK_STATUS = 409
+
+
+class DuplicateTaskError(Exception):
+    """
+    KLING already has a task with this external_task_id
+    """
+
+
 class KlingService:
     def __init__(self):
         self.access_key = settings.KLING_ACCESS_KEY
         self.secret_key = settings.KLING_SECRET_KEY
-        self.base_url = "https://api-singapore.klingai.com/v1"
+        self.base_url = settings.KLING_BASE_URL.rstrip("/")
+        self.breaker = CircuitBreaker(
+            "KLING",
+            settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            settings.CIRCUIT_BREAKER_RESET_SECONDS
+        )
+        # Opt-in hedging of slow calls, sharing one budget
+        self.hedge_budget = HedgeBudget(settings.KLING_HEDGE_BUDGET)
+        self.status_hedger = Hedger("KLING status", self.hedge_budget, settings.KLING_HEDGE_MIN_DELAY_SECONDS)
+        self.submit_hedger = Hedger("KLING submit", self.hedge_budget, settings.KLING_HEDGE_MIN_DELAY_SECONDS)
         
     def _generate_jwt(self) -> str:
         """
@@ -54,6 +79,41 @@ class KlingService:
         Create a video generation task
         Returns task info including task_id
         """
+        # Work already past its job's deadline is not worth the rate limit
+        deadline.check()
+        if not settings.KLING_HEDGING_ENABLED:
+            task = await self._create_video_task(image_url, prompt, duration)
+        else:
+            # Both attempts carry the same reference, so KLING creates at most one task;
+            # a duplicate rejection of one attempt leaves the other to answer
+            reference = uuid.uuid4().hex
+            task = await self.submit_hedger.run(
+                lambda: self._submit_once(image_url, prompt, duration, reference)
+            )
+        
+        # Billed per second of video, once per task however many attempts it took
+        record_usage("kling", "video", video_cost(duration), video_seconds=duration)
+        return task
+    
+    async def _submit_once(self, image_url: str, prompt: str, duration: int, reference: str) -> Dict[str, Any]:
+        """
+        One attempt of a hedged submission. If KLING already has a task for
+        the reference, the other attempt got there first, so answer with that
+        task instead of failing: the other attempt may yet time out.
+        """
+        try:
+            return await self._create_video_task(image_url, prompt, duration, reference)
+        except DuplicateTaskError:
+            status = await self._check_task_status(reference)
+            return {"task_id": status["task_id"], "status": "submitted"}
+    
+    async def _create_video_task(
+        self,
+        image_url: str,
+        prompt: str,
+        duration: int,
+        reference: Optional[str] = None
+    ) -> Dict[str, Any]:
         token = self._generate_jwt()
         processed_image = self._process_image_url(image_url)
         
@@ -71,6 +131,9 @@ class KlingService:
             "cfg_scale": 0.5,
             "mode": "std"
         }
+        if reference:
+            # Client-side task ID; KLING rejects a second task with the same one
+            data["external_task_id"] = reference
         
         async with httpx.AsyncClient() as client:
             try:
@@ -80,7 +143,12 @@ class KlingService:
                     json=data,
                     timeout=30.0
                 )
+                if reference and response.status_code == DUPLICATE_TASK_STATUS:
+                    # KLING answered, so this is no strike against the breaker
+                    self.breaker.record_success()
+                    raise DuplicateTaskError(response.text)
                 response.raise_for_status()
+                self.breaker.record_success()
                 
                 result = response.json()
                 if result.get("code") != 0:
@@ -91,10 +159,14 @@ class KlingService:
                     "status": "submitted"
                 }
                 
+            except DuplicateTaskError:
+                raise
             except httpx.HTTPStatusError as e:
+                self.breaker.record_error(e)
                 logger.error(f"KLING API HTTP error: {e.response.text}")
                 raise Exception(f"Video generation failed: {e.response.text}")
             except Exception as e:
+                self.breaker.record_error(e)
                 logger.error(f"KLING video generation error: {str(e)}")
                 raise
     
@@ -102,6 +174,14 @@ class KlingService:
         """
         Check the status of a video generation task
         """
+        if not settings.KLING_HEDGING_ENABLED:
+            return await self._check_task_status(task_id)
+        return await self.status_hedger.run(lambda: self._check_task_status(task_id))
+    
+    async def _check_task_status(self, task_id: str) -> Dict[str, Any]:
+        """
+        Status of a task, looked up by KLING's task_id or our external_task_id
+        """
         token = self._generate_jwt()
         
         headers = {
@@ -117,10 +197,13 @@ class KlingService:
                     timeout=30.0
                 )
                 response.raise_for_status()
+                self.breaker.record_success()
                 
                 result = response.json()
                 if result.get("code") != 0:
                     raise Exception(f"KLING API error: {result.get('message', 'Unknown error')}")
+                # Free, but counted against the request quota
+                record_usage("kling", "status", 0.0)
                 
                 data = result["data"]
                 
@@ -138,7 +221,7 @@ class KlingService:
                 )
                 
                 response_data = {
-                    "task_id": task_id,
+                    "task_id": data.get("task_id", task_id),
                     "status": mapped_status["status"],
                     "progress": mapped_status["progress"]
                 }
@@ -151,9 +234,14 @@ class KlingService:
                 if data.get("task_status") == "failed":
                     response_data["error"] = data.get("task_status_msg", "Video generation failed")
                 
+                # When KLING last changed the task (milliseconds since the epoch)
+                if data.get("updated_at"):
+                    response_data["updated_at"] = datetime.utcfromtimestamp(data["updated_at"] / 1000)
+                
                 return response_data
                 
             except Exception as e:
+                self.breaker.record_error(e)
                 logger.error(f"KLING status check error: {str(e)}")
                 raise
     
@@ -174,13 +262,21 @@ class KlingService:
                     raise Exception(status.get("error", "Video generation failed"))
                 
                 # Wait before next check
-                await asyncio.sleep(10)
+                await asyncio.sleep(settings.KLING_POLL_INTERVAL_SECONDS)
                 
             except Exception as e:
                 logger.error(f"Error while waiting for completion: {str(e)}")
                 raise
         
         raise Exception("Timeout waiting for video generation")
+    
+    def hedging_snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.KLING_HEDGING_ENABLED,
+            "budget_tokens": round(self.hedge_budget.tokens, 2),
+            "status": self.status_hedger.snapshot(),
+            "submit": self.submit_hedger.snapshot(),
+        }
 
 
 kling_service = KlingService()
\ No newline at end of file
@@ -1,8 +1,14 @@
+import asyncio
 import httpx
+import json
 import logging
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 from app.core.config import settings
+from app.db.usage import record_usage
+from app.utils import deadline
+from app.utils.pricing import image_cost, token_cost
+from app.utils.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -10,13 +16,29 @@ logger = logging.getLogger(__name__)
 class OpenAIService:
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = settings.OPENAI_BASE_URL.rstrip("/")
+        # Bounds concurrent vision calls from this process, batch or not
+        self.vision_slots = asyncio.Semaphore(settings.OPENAI_VISION_CONCURRENCY)
+        self.breaker = CircuitBreaker(
+            "OpenAI",
+            settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            settings.CIRCUIT_BREAKER_RESET_SECONDS
+        )
         
     async def generate_image(self, prompt: str, size: str = "1024x1024") -> str:
         """
         Generate image using OpenAI API
         Returns the image URL
         """
+        return (await self.generate_images(prompt, size, 1))[0]
+    
+    async def generate_images(self, prompt: str, size: str = "1024x1024", n: int = 1) -> List[str]:
+        """
+        Generate n images for one prompt in a single request
+        Returns the image URLs; the API may return fewer than n
+        """
+        # Work already past its job's deadline is not worth the rate limit
+        deadline.check()
         async with httpx.AsyncClient() as client:
             try:
                 response = await client.post(
@@ -28,35 +50,62 @@ class OpenAIService:
                     json={
                         "model": "gpt-image-1",
                         "prompt": prompt,
-                        "n": 1,
+                        "n": n,
                         "size": size
                     },
                     timeout=60.0
                 )
                 response.raise_for_status()
+                self.breaker.record_success()
                 
-                data = response.json()
-                if data.get("data") and len(data["data"]) > 0:
-                    # Return URL or convert base64 to URL
-                    image_data = data["data"][0]
-                    if "url" in image_data:
-                        return image_data["url"]
-                    elif "b64_json" in image_data:
-                        # TODO: Save base64 to file and return URL
-                        return f"data:image/png;base64,{image_data['b64_json']}"
+                # base64 images run to megabytes each, so decode off the event loop
+                data = await asyncio.to_thread(response.json)
+                image_urls = [self._image_url(image_data) for image_data in data.get("data") or []]
+                image_urls = [url for url in image_urls if url]
+                # Billed per image returned
+                record_usage(
+                    "openai", f"images:{size}", image_cost(size, len(image_urls)), images=len(image_urls)
+                )
+                if image_urls:
+                    return image_urls
                         
                 raise Exception("No image data in response")
                 
             except httpx.HTTPStatusError as e:
+                self.breaker.record_error(e)
                 logger.error(f"OpenAI API error: {e.response.text}")
                 raise Exception(f"Image generation failed: {e.response.text}")
             except Exception as e:
+                self.breaker.record_error(e)
                 logger.error(f"Image generation error: {str(e)}")
                 raise
     
-    async def analyze_image(self, image_url: str) -> dict:
+    def _image_url(self, image_data: dict) -> Optional[str]:
         """
-        Analyze image and generate YAML description
+        URL of one generated image, or a data URL for base64 results
+        """
+        if "url" in image_data:
+            return image_data["url"]
+        elif "b64_json" in image_data:
+            # TODO: Save base64 to file and return URL
+            return f"data:image/png;base64,{image_data['b64_json']}"
+        return None
+    
+    def _record_tokens(self, operation: str, model: str, usage: Optional[dict]) -> None:
+        """
+        Record a chat completion's token usage in the usage ledger
+        """
+        usage = usage or {}
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+        record_usage(
+            "openai", operation, token_cost(model, input_tokens, output_tokens),
+            input_tokens=input_tokens, output_tokens=output_tokens
+        )
+    
+    def _analyze_request(self, image_url: str, detail: str) -> dict:
+        """
+        Chat completion request body for image analysis
         """
         system_prompt = """You are an expert image analyst. Analyze the provided image and generate a structured YAML description following this exact format:
 
@@ -97,7 +146,39 @@ Important guidelines:
 5. Ensure the YAML is valid and properly formatted
 6. Do not add any extra fields or explanations outside the YAML"""
 
-        async with httpx.AsyncClient() as client:
+        return {
+            "model": "gpt-4-vision-preview",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "Analyze this image and generate the YAML description:"
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url,
+                                "detail": detail
+                            }
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.3
+        }
+    
+    async def analyze_image(self, image_url: str, detail: str = "high") -> dict:
+        """
+        Analyze image and generate YAML description
+        """
+        async with self.vision_slots, httpx.AsyncClient() as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
@@ -105,38 +186,13 @@ Important guidelines:
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
                     },
-                    json={
-                        "model": "gpt-4-vision-preview",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": system_prompt
-                            },
-                            {
-                                "role": "user",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": "Analyze this image and generate the YAML description:"
-                                    },
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": image_url,
-                                            "detail": "high"
-                                        }
-                                    }
-                                ]
-                            }
-                        ],
-                        "max_tokens": 1000,
-                        "temperature": 0.3
-                    },
+                    json=self._analyze_request(image_url, detail),
                     timeout=60.0
                 )
                 response.raise_for_status()
                 
                 data = response.json()
+                self._record_tokens("vision", "gpt-4-vision-preview", data.get("usage"))
                 yaml_content = data["choices"][0]["message"]["content"]
                 
                 # Extract preview info
@@ -151,14 +207,34 @@ Important guidelines:
                 logger.error(f"Image analysis error: {str(e)}")
                 raise
     
-    async def yaml_to_prompt(self, yaml_content: str) -> str:
+    def _yaml_to_prompt_request(self, yaml_content: str) -> dict:
         """
-        Convert YAML to natural language prompt
+        Chat completion request body for YAML to prompt conversion
         """
         system_prompt = """Convert the following YAML description into a natural, flowing image generation prompt. 
 The prompt should be detailed but concise, incorporating all the important elements from the YAML.
 Focus on visual elements, style, and composition. Output only the prompt text, nothing else."""
 
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": yaml_content
+                }
+            ],
+            "max_tokens": 300,
+            "temperature": 0.7
+        }
+    
+    async def yaml_to_prompt(self, yaml_content: str) -> str:
+        """
+        Convert YAML to natural language prompt
+        """
         async with httpx.AsyncClient() as client:
             try:
                 response = await client.post(
@@ -167,32 +243,76 @@ Focus on visual elements, style, and composition. Output only the prompt text, n
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
                     },
-                    json={
-                        "model": "gpt-3.5-turbo",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": system_prompt
-                            },
-                            {
-                                "role": "user",
-                                "content": yaml_content
-                            }
-                        ],
-                        "max_tokens": 300,
-                        "temperature": 0.7
-                    },
+                    json=self._yaml_to_prompt_request(yaml_content),
                     timeout=30.0
                 )
                 response.raise_for_status()
                 
                 data = response.json()
+                self._record_tokens("chat", "gpt-3.5-turbo", data.get("usage"))
                 return data["choices"][0]["message"]["content"]
                 
             except Exception as e:
                 logger.error(f"YAML to prompt conversion error: {str(e)}")
                 raise
     
+    async def _stream_chat(self, request: dict, operation: str, timeout: float) -> AsyncIterator[str]:
+        """
+        Run a chat completion with stream=True and yield content deltas as they arrive
+        """
+        usage = None
+        async with httpx.AsyncClient() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                # The last chunk then carries the token usage
+                json={**request, "stream": True, "stream_options": {"include_usage": True}},
+                timeout=timeout
+            ) as response:
+                if response.is_error:
+                    body = await response.aread()
+                    raise Exception(f"Chat completion failed: {body.decode(errors='replace')}")
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    choices = chunk.get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+        
+        self._record_tokens(operation, request["model"], usage)
+    
+    async def stream_analyze_image(self, image_url: str, detail: str = "high") -> AsyncIterator[str]:
+        """
+        Analyze image, yielding the YAML description as it is generated
+        """
+        async with self.vision_slots:
+            async for token in self._stream_chat(self._analyze_request(image_url, detail), "vision", timeout=60.0):
+                yield token
+    
+    async def stream_yaml_to_prompt(self, yaml_content: str) -> AsyncIterator[str]:
+        """
+        Convert YAML to a prompt, yielding the prompt as it is generated
+        """
+        async for token in self._stream_chat(self._yaml_to_prompt_request(yaml_content), "chat", timeout=30.0):
+            yield token
+    
+    def extract_preview(self, yaml_content: str) -> dict:
+        """
+        Preview information for a complete YAML description
+        """
+        return self._extract_preview_from_yaml(yaml_content)
+    
     def _extract_preview_from_yaml(self, yaml_content: str) -> dict:
         """
         Extract preview information from YAML
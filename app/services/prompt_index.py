@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models import ImageJob, ImageJobStatus, PromptBand, PromptSignature
+from app.utils import minhash
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PromptMatch:
+    job_id: UUID
+    prompt: str
+    image_url: str
+    similarity: float
+
+
+class PromptIndex:
+    """
+    Near-duplicate index over the prompts of completed image jobs.
+
+    Each indexed job has a MinHash signature and one LSH band key per band,
+    stored in prompt_signatures / prompt_bands so every process shares the
+    index. Jobs are added in the transaction that completes them; jobs that
+    completed before the index existed are added by a background backfill.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def add(self, db: AsyncSession, job: ImageJob) -> None:
+        """
+        Index a completed job's prompt; does not commit
+        """
+        values = minhash.signature(job.prompt)
+        if values is None:
+            return
+        connection = await db.connection()
+        dialect = sqlite if connection.dialect.name == "sqlite" else postgresql
+        # Another process may be backfilling the same job
+        await db.execute(
+            dialect.insert(PromptSignature).values(
+                job_id=job.id, model=job.model, size=job.size, signature=minhash.pack(values)
+            ).on_conflict_do_nothing()
+        )
+        await db.execute(
+            dialect.insert(PromptBand).values(
+                [{"key": key, "job_id": job.id} for key in minhash.band_keys(values)]
+            ).on_conflict_do_nothing()
+        )
+
+    async def find_similar(
+        self,
+        db: AsyncSession,
+        prompt: str,
+        model: str,
+        size: str,
+        threshold: Optional[float] = None,
+        limit: int = 5
+    ) -> List[PromptMatch]:
+        """
+        Completed jobs with the same model and size whose prompts are at least
+        threshold similar, most similar first
+        """
+        threshold = settings.PROMPT_REUSE_THRESHOLD if threshold is None else threshold
+        values = minhash.signature(prompt)
+        if values is None:
+            return []
+
+        # Jobs sharing the most bands are the likeliest matches
+        shared = func.count().label("shared")
+        candidates = (
+            select(PromptBand.job_id, shared)
+            .where(PromptBand.key.in_(minhash.band_keys(values)))
+            .group_by(PromptBand.job_id)
+            .order_by(shared.desc())
+            .limit(settings.PROMPT_REUSE_MAX_CANDIDATES)
+            .subquery()
+        )
+        result = await db.execute(
+            select(ImageJob.id, ImageJob.prompt, ImageJob.image_url, PromptSignature.signature)
+            .select_from(candidates)
+            .join(PromptSignature, PromptSignature.job_id == candidates.c.job_id)
+            .join(ImageJob, ImageJob.id == candidates.c.job_id)
+            .where(
+                PromptSignature.model == model,
+                PromptSignature.size == size,
+                ImageJob.status == ImageJobStatus.COMPLETED,
+                ImageJob.image_url.is_not(None),
+            )
+        )
+
+        matches = []
+        for job_id, job_prompt, image_url, packed in result:
+            score = minhash.similarity(values, minhash.unpack(packed))
+            if score >= threshold:
+                matches.append(PromptMatch(job_id, job_prompt, image_url, score))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches[:limit]
+
+    async def backfill(self) -> int:
+        """
+        Index completed jobs that are not indexed yet; returns how many were added
+        """
+        added = 0
+        after: Optional[UUID] = None
+        while True:
+            query = (
+                select(ImageJob)
+                .outerjoin(PromptSignature, PromptSignature.job_id == ImageJob.id)
+                .where(
+                    ImageJob.status == ImageJobStatus.COMPLETED,
+                    ImageJob.image_url.is_not(None),
+                    ImageJob.reused_from_id.is_(None),
+                    PromptSignature.job_id.is_(None),
+                )
+                .order_by(ImageJob.id)
+                .limit(settings.PROMPT_INDEX_BACKFILL_BATCH_SIZE)
+            )
+            # Keyset pagination: prompts without words stay unindexed and must not be re-read
+            if after is not None:
+                query = query.where(ImageJob.id > after)
+
+            async with AsyncSessionLocal() as db:
+                jobs = (await db.execute(query)).scalars().all()
+                for job in jobs:
+                    await self.add(db, job)
+                await db.commit()
+
+            added += len(jobs)
+            if len(jobs) < settings.PROMPT_INDEX_BACKFILL_BATCH_SIZE:
+                return added
+            after = jobs[-1].id
+            await asyncio.sleep(0)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            added = await self.backfill()
+            if added:
+                logger.info(f"Indexed {added} completed image job prompts")
+        except Exception as e:
+            logger.error(f"Prompt index backfill failed: {str(e)}")
+
+
+prompt_index = PromptIndex()
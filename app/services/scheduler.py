@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+PRIORITY_CLASSES = ("interactive", "bulk")
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# Finish tags kept before forgetting shares the virtual clock has passed
+PRUNE_MIN_SHARES = 1024
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "key", "enqueued_at", "done")
+
+    def __init__(self, future: asyncio.Future, priority: str, key: Tuple[str, str]):
+        self.future = future
+        self.priority = priority
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        # Set once dispatched or cancelled; its other queue entry is then skipped
+        self.done = False
+
+
+class FairScheduler:
+    """
+    Hand out a fixed number of run slots by priority class and fair share.
+
+    Waiting jobs are served in order of virtual finish time (weighted fair
+    queuing): each (class, share) pair advances its own virtual clock by
+    1/weight per job, so a share with a long backlog does not delay a share
+    with one job, and interactive jobs (higher weight) overtake bulk ones. A job that has waited longer than
+    SCHEDULER_MAX_WAIT_SECONDS is served next regardless, so bulk work is
+    never starved.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.busy = 0
+        self.waiting = 0
+        self._heap: List[Tuple[float, int, float, _Waiter]] = []
+        self._fifo: Deque[_Waiter] = deque()
+        # Last finish tag and number of queued jobs per (class, share); shares
+        # are client addresses, so idle ones are forgotten (see _forget)
+        self._finish: Dict[Tuple[str, str], float] = {}
+        self._queued: Dict[Tuple[str, str], int] = {}
+        self._prune_at = PRUNE_MIN_SHARES
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._waits: Dict[str, Deque[float]] = {name: deque(maxlen=1000) for name in PRIORITY_CLASSES}
+        self._dispatched: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+
+    def weight(self, priority: str) -> float:
+        if priority == "interactive":
+            return settings.SCHEDULER_INTERACTIVE_WEIGHT
+        return settings.SCHEDULER_BULK_WEIGHT
+
+    async def acquire(self, share: str, priority: str = "bulk") -> None:
+        """
+        Wait for a run slot; release() it when done
+        """
+        if priority not in PRIORITY_CLASSES:
+            priority = "bulk"
+
+        if self.busy < self.slots and not self.waiting:
+            self.busy += 1
+            self._record(priority, 0.0)
+            return
+
+        key = (priority, share)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, key)
+        start = max(self._virtual_time, self._finish.get(key, 0.0))
+        finish = start + 1.0 / self.weight(priority)
+        self._finish[key] = finish
+        self._queued[key] = self._queued.get(key, 0) + 1
+        if len(self._finish) > self._prune_at:
+            self._prune()
+        heapq.heappush(self._heap, (finish, next(self._seq), start, waiter))
+        self._fifo.append(waiter)
+        self.waiting += 1
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.done:
+                # Granted a slot just as we were cancelled; hand it on
+                self.release()
+            else:
+                waiter.done = True
+                self.waiting -= 1
+                self._dequeued(waiter)
+            raise
+
+    def release(self) -> None:
+        self.busy -= 1
+        self._dispatch()
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        while self._fifo and self._fifo[0].done:
+            self._fifo.popleft()
+
+        # Starvation protection: the oldest waiter goes first once it has waited too long
+        if self._fifo and time.monotonic() - self._fifo[0].enqueued_at > settings.SCHEDULER_MAX_WAIT_SECONDS:
+            return self._fifo.popleft()
+
+        while self._heap:
+            _, _, start, waiter = heapq.heappop(self._heap)
+            if waiter.done:
+                continue
+            self._virtual_time = max(self._virtual_time, start)
+            return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while self.busy < self.slots:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            waiter.done = True
+            self.waiting -= 1
+            self._dequeued(waiter)
+            self.busy += 1
+            self._record(waiter.priority, time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _dequeued(self, waiter: _Waiter) -> None:
+        remaining = self._queued[waiter.key] - 1
+        if remaining:
+            self._queued[waiter.key] = remaining
+        else:
+            del self._queued[waiter.key]
+            self._forget(waiter.key)
+
+        if not self.waiting:
+            # Nothing queued: move the clock past every tag, leaving all shares level
+            self._virtual_time = max(self._finish.values(), default=self._virtual_time)
+            self._finish.clear()
+
+    def _forget(self, key: Tuple[str, str]) -> None:
+        """
+        Drop a share's finish tag once it has nothing queued and the virtual
+        clock has passed it; a new job would start from the clock anyway
+        """
+        if key not in self._queued and self._finish.get(key, 0.0) <= self._virtual_time:
+            self._finish.pop(key, None)
+
+    def _prune(self) -> None:
+        # Shares whose queue emptied before the clock passed their tag
+        for key in list(self._finish):
+            self._forget(key)
+        self._prune_at = max(PRUNE_MIN_SHARES, 2 * len(self._finish))
+
+    def _record(self, priority: str, wait: float) -> None:
+        self._waits[priority].append(wait)
+        self._dispatched[priority] += 1
+
+    def metrics(self) -> Dict[str, dict]:
+        """
+        Per-class dispatch counts and wait times over the last 1000 jobs of each class
+        """
+        waiting = {name: 0 for name in PRIORITY_CLASSES}
+        for waiter in self._fifo:
+            if not waiter.done:
+                waiting[waiter.priority] += 1
+
+        return {
+            name: {
+                "weight": self.weight(name),
+                "waiting": waiting[name],
+                "dispatched": self._dispatched[name],
+                "wait_p50_s": round(_percentile(list(waits), 50), 3),
+                "wait_p95_s": round(_percentile(list(waits), 95), 3),
+                "wait_max_s": round(max(waits, default=0.0), 3),
+            }
+            for name, waits in self._waits.items()
+        }
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.usage import buffered_usage, requeue_usage, spent_by_provider, take_usage, unwritten_cost, write_usage
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("openai", "kling")
+
+# Provider each job kind is billed by
+KIND_PROVIDERS = {"image": "openai", "video": "kling"}
+
+
+def seconds_until_reset() -> int:
+    """
+    Seconds until the daily budgets reset, at midnight UTC
+    """
+    now = datetime.utcnow()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((midnight - now).total_seconds()) + 1)
+
+
+class UsageLedger:
+    """
+    Write recorded provider usage to provider_usage and enforce daily budgets.
+
+    Every USAGE_FLUSH_SECONDS the buffered usage is written out and today's
+    spend per provider re-read, so the budgets cover every process sharing
+    the database. Past USAGE_SOFT_BUDGET_RATIO of a provider's daily budget
+    bulk jobs are slowed down, more the closer the spend gets to the budget;
+    once it is spent, jobs wait for the next day and new work is refused.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._day = None
+        self._spent: Dict[str, float] = {}
+
+    def budget(self, provider: str) -> Optional[float]:
+        return {
+            "openai": settings.OPENAI_DAILY_BUDGET_USD,
+            "kling": settings.KLING_DAILY_BUDGET_USD,
+        }[provider]
+
+    def spent(self, provider: str) -> float:
+        """
+        Today's estimated spend, including usage not written yet
+        """
+        written = self._spent.get(provider, 0.0) if self._day == datetime.utcnow().date() else 0.0
+        return written + unwritten_cost(provider)
+
+    def state(self, provider: str) -> str:
+        """
+        "ok", "soft" past the soft limit, or "hard" once the budget is spent
+        """
+        budget = self.budget(provider)
+        if budget is None:
+            return "ok"
+        spent = self.spent(provider)
+        if spent >= budget:
+            return "hard"
+        if spent >= budget * settings.USAGE_SOFT_BUDGET_RATIO:
+            return "soft"
+        return "ok"
+
+    def delay(self, provider: str) -> float:
+        """
+        How long a bulk job waits before starting, growing from nothing at the
+        soft limit to USAGE_SOFT_MAX_DELAY_SECONDS at the budget
+        """
+        if self.state(provider) != "soft":
+            return 0.0
+        budget = self.budget(provider)
+        soft = budget * settings.USAGE_SOFT_BUDGET_RATIO
+        if budget <= soft:
+            return 0.0
+        return settings.USAGE_SOFT_MAX_DELAY_SECONDS * (self.spent(provider) - soft) / (budget - soft)
+
+    async def throttle(self, provider: str, priority: str) -> None:
+        """
+        Hold a job back while its provider's budget is spent, and slow bulk
+        jobs down past the soft limit
+        """
+        while self.state(provider) == "hard":
+            # Spend only goes down when the day rolls over or the budget is raised
+            await asyncio.sleep(min(seconds_until_reset(), 60))
+        if priority == "bulk":
+            delay = self.delay(provider)
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far and refresh today's spend; returns
+        how many calls' usage was written
+        """
+        written = 0
+        while True:
+            entries = take_usage(settings.USAGE_BATCH_SIZE)
+            if not entries:
+                break
+            try:
+                async with AsyncSessionLocal() as db:
+                    await write_usage(db, entries)
+                    await db.commit()
+            except Exception:
+                requeue_usage(entries)
+                raise
+            # Keep counting it until the refresh below reads it back
+            for entry in entries:
+                if entry["day"] == self._day:
+                    self._spent[entry["provider"]] = self._spent.get(entry["provider"], 0.0) + entry["cost_usd"]
+            written += len(entries)
+
+        await self.refresh()
+        return written
+
+    async def refresh(self) -> None:
+        today = datetime.utcnow().date()
+        async with AsyncSessionLocal() as db:
+            self._spent = await spent_by_provider(db, today)
+        self._day = today
+
+    def snapshot(self) -> Dict[str, dict]:
+        budgets = {}
+        for provider in PROVIDERS:
+            budget = self.budget(provider)
+            spent = self.spent(provider)
+            budgets[provider] = {
+                "provider": provider,
+                "daily_budget_usd": budget,
+                "soft_limit_usd": None if budget is None else round(budget * settings.USAGE_SOFT_BUDGET_RATIO, 4),
+                "spent_usd": round(spent, 4),
+                "remaining_usd": None if budget is None else round(max(0.0, budget - spent), 4),
+                "state": self.state(provider),
+                "bulk_delay_seconds": round(self.delay(provider), 2),
+                "resets_in_seconds": seconds_until_reset(),
+            }
+        return budgets
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Could not read today's provider usage: {str(e)}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Write the usage of the drained jobs on the way out
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Dropped usage of {buffered_usage()} provider calls at shutdown: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.USAGE_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Usage ledger error: {str(e)}")
+
+
+usage_ledger = UsageLedger()
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.job_counters import transition
+from app.db.session import AsyncSessionLocal
+from app.models import VideoJob, VideoJobStatus
+from app.services.coordinator import coordinator
+from app.services.kling_service import kling_service
+from app.utils.deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+VIDEO_TIMEOUT_MESSAGE = "Timeout waiting for video generation"
+
+
+def video_poll_lease(job_id: UUID) -> str:
+    """
+    Lease held while polling a submitted job's KLING task
+    """
+    return f"video:{job_id}"
+
+
+class VideoPoller:
+    """
+    Poll KLING for every in-flight video job this node owns.
+
+    Jobs are partitioned across live worker nodes by hashing their
+    external_task_id, so polling work spreads evenly regardless of which
+    process accepted the original request, and moves to the surviving
+    nodes when one dies.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self) -> None:
+        """
+        Poll soon instead of waiting for the next interval, e.g. after a submission
+        """
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Video poller error: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.KLING_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def poll_once(self) -> int:
+        """
+        Check every owned in-flight job once; returns how many were checked
+        """
+        if kling_service.breaker.state == "open":
+            # Let KLING recover instead of piling status checks onto it
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    VideoJob.id, VideoJob.external_task_id, VideoJob.progress,
+                    VideoJob.submitted_at, VideoJob.updated_at, VideoJob.deadline_at
+                ).where(
+                    VideoJob.status == VideoJobStatus.PROCESSING,
+                    VideoJob.external_task_id.is_not(None)
+                )
+            )
+            jobs = [job for job in result.all() if coordinator.owns(job.external_task_id)]
+
+        semaphore = asyncio.Semaphore(settings.VIDEO_POLL_CONCURRENCY)
+
+        async def bounded(job):
+            async with semaphore:
+                await self._check(job)
+
+        await asyncio.gather(*(bounded(job) for job in jobs))
+        return len(jobs)
+
+    async def _check(self, job) -> None:
+        job_id = job.id
+        resource = video_poll_lease(job_id)
+        if not await coordinator.acquire_lease(resource):
+            return
+
+        # Jobs submitted before submitted_at was recorded time out from their last update
+        submitted_at = job.submitted_at or job.updated_at
+        timed_out = datetime.utcnow() - submitted_at > timedelta(seconds=settings.VIDEO_JOB_TIMEOUT_SECONDS)
+
+        values = None
+        # When KLING finished the task, to tell render time from polling delay
+        provider_at = None
+        try:
+            if job.deadline_at and datetime.utcnow() >= job.deadline_at:
+                # Too late to be of use; stop spending status checks on it
+                raise DeadlineExceeded()
+
+            status = await kling_service.check_task_status(job.external_task_id)
+
+            if status["status"] in ("completed", "failed"):
+                provider_at = status.get("updated_at")
+
+            if status["status"] == "completed":
+                values = dict(
+                    progress=status["progress"],
+                    video_url=status.get("video_url"),
+                    status=VideoJobStatus.COMPLETED,
+                    completed_at=datetime.utcnow()
+                )
+            elif status["status"] == "failed":
+                values = dict(
+                    status=VideoJobStatus.FAILED,
+                    error_message=status.get("error", "Video generation failed")
+                )
+            elif timed_out:
+                values = dict(status=VideoJobStatus.FAILED, error_message=VIDEO_TIMEOUT_MESSAGE)
+            elif status["progress"] != job.progress:
+                values = dict(progress=status["progress"])
+
+        except DeadlineExceeded as e:
+            values = dict(status=VideoJobStatus.FAILED, error_message=str(e))
+        except Exception as e:
+            logger.error(f"Video job {job_id} status check failed: {str(e)}")
+            # Transient errors are retried on the next poll, persistent ones until the timeout
+            if not timed_out:
+                return
+            values = dict(status=VideoJobStatus.FAILED, error_message=f"{VIDEO_TIMEOUT_MESSAGE}: {str(e)}")
+
+        if not values:
+            return
+
+        async with AsyncSessionLocal() as db:
+            # Only act on jobs still in flight, in case another node finished it
+            status = values.pop("status", VideoJobStatus.PROCESSING)
+            await transition(
+                db, VideoJob, job_id, VideoJobStatus.PROCESSING, status,
+                provider_at=provider_at, **values
+            )
+            await db.commit()
+
+        if status in (VideoJobStatus.COMPLETED, VideoJobStatus.FAILED):
+            await coordinator.release_lease(resource)
+
+
+video_poller = VideoPoller()
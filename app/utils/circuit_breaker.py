@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an error says the provider is unhealthy, rather than the request being bad
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Trip after consecutive upstream failures.
+
+    While open, callers are told to back off until the cooldown ends; then a
+    single probe is let through (half-open), and its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        # When the current half-open probe started, if one is out
+        self._probe_started = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> float:
+        """
+        Seconds until the breaker lets a probe through
+        """
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now; in half-open state only one probe may
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        now = time.monotonic()
+        # A probe that never reported back (e.g. cancelled) stops blocking after a cooldown
+        if state == "half_open" and (self._probe_started is None or now - self._probe_started > self.reset_timeout):
+            self._probe_started = now
+            return True
+        return False
+
+    async def wait(self) -> None:
+        """
+        Wait until a call may go ahead
+        """
+        while not self.allow():
+            await asyncio.sleep(max(self.retry_after(), 1.0))
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_error(self, error: BaseException) -> None:
+        """
+        Count an error against the breaker if it points at the provider
+        """
+        if not is_upstream_failure(error):
+            # The provider answered; a bad request says nothing against its health
+            if self._probe_started is not None:
+                self.record_success()
+            return
+        self.failures += 1
+        if self._probe_started is not None or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 1)
+        }
@@ -0,0 +1,11 @@
+from fastapi import Request
+
+
+def client_id(request: Request) -> str:
+    """
+    The calling API client: its X-Client-Id header, else its address
+    """
+    client = request.headers.get("X-Client-Id")
+    if client:
+        return f"client:{client[:64]}"
+    return f"client:{request.client.host if request.client else 'unknown'}"
@@ -0,0 +1,76 @@
+"""
+Per-job deadlines, carried through service calls in a context variable.
+
+A job's work runs inside deadline_scope(job.deadline_at): the block is
+cancelled when the deadline passes, and the services it calls can check()
+the deadline before starting anything costly, so queued or retried work
+that is already too late never reaches the provider. Tasks created inside
+the scope (e.g. hedged requests) inherit the deadline.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+_deadline: ContextVar[Optional[datetime]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self):
+        super().__init__("Deadline exceeded")
+
+
+def after(seconds: Optional[float]) -> Optional[datetime]:
+    """
+    The deadline seconds from now, as stored on jobs; None for no deadline
+    """
+    if seconds is None:
+        return None
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+def current() -> Optional[datetime]:
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline, or None without one
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return (deadline - datetime.utcnow()).total_seconds()
+
+
+def check() -> None:
+    """
+    Raise DeadlineExceeded if the current deadline has passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+@asynccontextmanager
+async def deadline_scope(deadline: Optional[datetime]) -> AsyncIterator[None]:
+    """
+    Run a block under a deadline (naive UTC, as stored); None means no deadline.
+    Raises DeadlineExceeded if it passes first.
+    """
+    token = _deadline.set(deadline)
+    try:
+        left = remaining()
+        if left is None:
+            yield
+            return
+        if left <= 0:
+            raise DeadlineExceeded()
+        try:
+            async with asyncio.timeout(left):
+                yield
+        except TimeoutError:
+            raise DeadlineExceeded()
+    finally:
+        _deadline.reset(token)
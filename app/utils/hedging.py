@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Latencies kept for the rolling p95
+LATENCY_WINDOW = 200
+
+# Calls seen before the first hedge, so the p95 means something
+MIN_SAMPLES = 20
+
+
+class HedgeBudget:
+    """
+    Cap hedges to a fraction of requests.
+
+    Every request earns `ratio` of a token (up to `burst`) and every hedge
+    spends one, so hedging adds at most about ratio extra upstream load.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class Hedger:
+    """
+    Send a duplicate of a slow call and take whichever answers first.
+
+    The duplicate is sent once the call has run longer than the rolling p95
+    of recent calls (never sooner than min_delay), if the shared budget
+    allows. The slower attempt is cancelled. An attempt that fails does not
+    end the call while the other is still running.
+    """
+
+    def __init__(self, name: str, budget: HedgeBudget, min_delay: float):
+        self.name = name
+        self.budget = budget
+        self.min_delay = min_delay
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging, or None until there are enough samples
+        """
+        if len(self._latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.min_delay, ordered[int(len(ordered) * 0.95)])
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # A losing attempt took at least this long; leaving it out would
+            # drop exactly the slow calls and bias the p95 low
+            self._latencies.append(time.monotonic() - started)
+            raise
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await call(), hedging it with a second call() if it is slow
+        """
+        self.calls += 1
+        self.budget.earn()
+        delay = self.delay()
+
+        primary = asyncio.ensure_future(self._timed(call))
+        attempts = [primary]
+        try:
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if done or not self.budget.spend():
+                return await primary
+
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._timed(call))
+            attempts.append(hedge)
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is hedge:
+                            self.hedge_wins += 1
+                        return attempt.result()
+                    # Prefer the first call's error if both fail
+                    if error is None or attempt is primary:
+                        error = attempt.exception()
+            raise error
+        finally:
+            # Also stops the attempts if our caller is cancelled
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def snapshot(self) -> dict:
+        delay = self.delay()
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_after_s": round(delay, 3) if delay is not None else None,
+        }
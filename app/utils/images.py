@@ -0,0 +1,101 @@
+"""
+CPU-bound image helpers.
+
+These functions run inside worker processes, so they take and return plain
+bytes and import Pillow lazily to keep the web process import cheap.
+"""
+import io
+
+
+def _displayed_size(image) -> tuple:
+    """
+    Width and height once the EXIF orientation is applied
+    """
+    # Orientations 5-8 are rotated a quarter turn
+    if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+        return image.height, image.width
+    return image.width, image.height
+
+
+def _fit_size(width: int, height: int, max_long_side: int, max_short_side: int) -> tuple:
+    scale = min(1.0, max_long_side / max(width, height), max_short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def make_variant(data: bytes, width: int, fmt: str, quality: int) -> bytes:
+    """
+    Resize an encoded image to at most ``width`` pixels wide and re-encode it
+    as WebP or JPEG
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(data))
+
+    # Let the JPEG decoder skip detail we are about to throw away. The draft
+    # size is in stored orientation; width applies to the displayed one.
+    if image.format == "JPEG":
+        displayed_width, displayed_height = _displayed_size(image)
+        draft = (width, width * displayed_height // max(displayed_width, 1))
+        if (displayed_width, displayed_height) != image.size:
+            draft = draft[::-1]
+        image.draft("RGB", draft)
+
+    image = ImageOps.exif_transpose(image)
+
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    output = io.BytesIO()
+    if fmt == "jpeg":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        image.save(output, format="WEBP", quality=quality, method=4)
+
+    return output.getvalue()
+
+
+def probe_image(data: bytes) -> tuple:
+    """
+    Read format and dimensions from the image header without decoding pixels
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return image.format, image.width, image.height
+
+
+def fit_image(data: bytes, max_long_side: int, max_short_side: int, quality: int) -> bytes:
+    """
+    Downscale an image to fit the given bounds and re-encode it as JPEG
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(data))
+
+    # The bounds do not depend on orientation, so the stored size will do here
+    if image.format == "JPEG":
+        image.draft("RGB", _fit_size(image.width, image.height, max_long_side, max_short_side))
+
+    # Size the output from the displayed orientation, which may be a quarter turn from the stored one
+    image = ImageOps.exif_transpose(image)
+    target = _fit_size(image.width, image.height, max_long_side, max_short_side)
+    if target != image.size:
+        image = image.resize(target, Image.LANCZOS)
+
+    # JPEG has no alpha channel, so flatten transparency onto white
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
@@ -0,0 +1,89 @@
+"""
+MinHash signatures and LSH band keys for near-duplicate text.
+
+Text is normalized (case, punctuation and whitespace folded) and split
+into words; the shingles are the words plus the character trigrams of
+each word, so word order does not matter and scripts written without
+spaces still get useful shingles. Two signatures agree at a position
+with probability equal to the Jaccard similarity of their shingle sets.
+"""
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+from typing import List, Optional, Sequence, Set
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: stored signatures must stay comparable across processes and releases
+_random = random.Random(1_000_003)
+_PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(re.findall(r"\w+", text))
+
+
+def shingles(text: str) -> Set[str]:
+    result = set()
+    for word in normalize(text).split():
+        result.add(word)
+        for start in range(len(word) - 2):
+            result.add("#" + word[start:start + 3])
+    return result
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+
+
+def signature(text: str) -> Optional[List[int]]:
+    """
+    MinHash signature of a text, or None if it has no words
+    """
+    hashes = [_hash(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [
+        min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """
+    Estimated Jaccard similarity of the texts behind two signatures
+    """
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERMUTATIONS
+
+
+def band_keys(values: Sequence[int]) -> List[int]:
+    """
+    One signed 64-bit key per LSH band; texts sharing any key are candidates
+    """
+    keys = []
+    for band in range(BANDS):
+        chunk = values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"<I{ROWS_PER_BAND}I", band, *chunk), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def pack(values: Sequence[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *values)
+
+
+def unpack(data: bytes) -> List[int]:
+    return list(struct.unpack(_SIGNATURE_FORMAT, data))
@@ -0,0 +1,39 @@
+"""
+Estimated provider prices in USD, from public list prices.
+
+The usage ledger records the cost of each call with these, and the daily
+budgets are enforced against those estimates, so adjust them here if the
+account is billed differently.
+"""
+from typing import Dict, Tuple
+
+# gpt-image-1, per image at medium quality
+IMAGE_PRICES: Dict[str, float] = {
+    "1024x1024": 0.042,
+    "1792x1024": 0.063,
+    "1024x1792": 0.063,
+}
+DEFAULT_IMAGE_PRICE = 0.063
+
+# (input, output) per million tokens
+TOKEN_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4-vision-preview": (10.0, 30.0),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+DEFAULT_TOKEN_PRICE = (10.0, 30.0)
+
+# kling-v1 standard mode, per second of video
+KLING_PRICE_PER_SECOND = 0.028
+
+
+def image_cost(size: str, images: int) -> float:
+    return IMAGE_PRICES.get(size, DEFAULT_IMAGE_PRICE) * images
+
+
+def token_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = TOKEN_PRICES.get(model, DEFAULT_TOKEN_PRICE)
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def video_cost(seconds: float) -> float:
+    return KLING_PRICE_PER_SECOND * seconds
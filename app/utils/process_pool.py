@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared worker pool for CPU-bound image work, creating it lazily
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKER_PROCESSES)
+        logger.info(f"Started image worker pool with {settings.IMAGE_WORKER_PROCESSES} processes")
+    return _pool
+
+
+async def run_in_process(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a picklable function in the worker pool without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), fn, *args)
+
+
+def shutdown_process_pool() -> None:
+    """
+    Stop the worker pool if it was started
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,61 @@
+from typing import Any, Collection, Iterable, List, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, create_model
+
+
+def schema_columns(model: Any, schema: Type[BaseModel], fields: Optional[Iterable[str]] = None) -> List[Any]:
+    """
+    Model columns backing each field of a response schema, for column-only selects
+    """
+    return [getattr(model, name) for name in (fields or schema.model_fields)]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def resolve_fields(
+    schema: Type[BaseModel],
+    fields: Optional[str],
+    exclude: Optional[str],
+    default_exclude: Collection[str] = ()
+) -> List[str]:
+    """
+    Turn comma-separated fields=/exclude= values into schema field names.
+
+    Without fields=, everything but default_exclude is returned. The id is
+    always included. Raises ValueError for names the schema does not have.
+    """
+    available = list(schema.model_fields)
+    requested = _split(fields) or [name for name in available if name not in default_exclude]
+    excluded = set(_split(exclude))
+
+    unknown = (set(requested) | excluded) - set(available)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    return [name for name in available if name == "id" or (name in requested and name not in excluded)]
+
+
+def partial_schema(schema: Type[BaseModel], name: str) -> Type[BaseModel]:
+    """
+    Copy of a response schema where every field but id may be left out
+    """
+    definitions = {
+        field_name: (info.annotation, ...) if field_name == "id" else (Optional[info.annotation], None)
+        for field_name, info in schema.model_fields.items()
+    }
+    return create_model(name, **definitions)
+
+
+def rows_response(rows: Iterable[Any]) -> ORJSONResponse:
+    """
+    Encode database rows straight to JSON.
+
+    Rows come from our own tables, so re-validating them through the response
+    schema (URL parsing, enum and UUID coercion) is skipped; orjson handles
+    UUIDs, datetimes and enums natively.
+    """
+    return ORJSONResponse([row._asdict() for row in rows])
+
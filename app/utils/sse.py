@@ -0,0 +1,10 @@
+from typing import Any
+
+import orjson
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """
+    Encode one server-sent event with a JSON payload
+    """
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Image to Video API.
+
+Run them from the repository root, for example::
+
+    python -m benchmarks.load --workload image --jobs 200 --concurrency 20
+"""
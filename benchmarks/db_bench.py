@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Database-scale benchmark for the list and lookup endpoints.
+
+Calls the endpoint functions directly against a seeded database (see
+``benchmarks.seed_db``), records latency percentiles per endpoint and
+captures the EXPLAIN plan of every statement each endpoint issues.
+
+    python -m benchmarks.db_bench --database-url sqlite:///./bench.db
+    python -m benchmarks.db_bench --database-url postgresql+asyncpg://... --iterations 500 --analyze --output pg.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from benchmarks.load import percentile
+
+
+def _configure(database_url: str) -> None:
+    """
+    Point the app at the benchmark database before any app module is imported
+    """
+    if "app.db.session" in sys.modules:
+        raise RuntimeError("Configure the database before importing app modules")
+    os.environ["DATABASE_URL"] = database_url
+    for key in ("OPENAI_API_KEY", "KLING_ACCESS_KEY", "KLING_SECRET_KEY", "JWT_SECRET_KEY"):
+        os.environ.setdefault(key, "bench")
+
+
+class StatementRecorder:
+    """
+    Capture the SQL an endpoint issues so it can be EXPLAINed afterwards
+    """
+
+    def __init__(self, sync_engine):
+        from sqlalchemy import event
+
+        self.enabled = False
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and not executemany:
+            self.statements.append((statement, parameters))
+
+
+async def explain(engine, statement: str, parameters: Any, analyze: bool) -> List[str]:
+    dialect = engine.dialect.name
+    is_select = statement.lstrip().upper().startswith("SELECT")
+
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze and is_select else "EXPLAIN "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        prefix = "EXPLAIN "
+
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(prefix + statement, parameters)
+        rows = result.fetchall()
+        await conn.rollback()
+
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" | ".join(str(col) for col in row) for row in rows]
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    _configure(args.database_url)
+
+    from sqlalchemy import func, select
+
+    from app.api.v1.endpoints import image_jobs, rows, video_jobs
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models import ImageJob, ImageJobStatus, Row, VideoJob, VideoJobStatus
+
+    async with AsyncSessionLocal() as db:
+        counts = {
+            "rows": (await db.execute(select(func.count()).select_from(Row))).scalar_one(),
+            "image_jobs": (await db.execute(select(func.count()).select_from(ImageJob))).scalar_one(),
+            "video_jobs": (await db.execute(select(func.count()).select_from(VideoJob))).scalar_one(),
+        }
+        sample_rows = list((await db.execute(
+            select(ImageJob.row_id).where(ImageJob.row_id.is_not(None)).limit(args.sample_size)
+        )).scalars())
+        sample_rows += list((await db.execute(select(Row.id).limit(args.sample_size))).scalars())
+        sample_external_ids = list((await db.execute(
+            select(VideoJob.external_task_id).where(VideoJob.external_task_id.is_not(None)).limit(args.sample_size)
+        )).scalars())
+        delete_candidates = list((await db.execute(
+            select(Row.id).order_by(Row.created_at).limit(args.delete_iterations)
+        )).scalars())
+
+    if not sample_rows or not sample_external_ids:
+        raise RuntimeError("The database looks empty; run benchmarks.seed_db first")
+
+    max_skip = max(0, min(counts["rows"], counts["image_jobs"]) - args.page_size)
+
+    def skip() -> int:
+        # Mostly first pages, with some deep pagination
+        return 0 if random.random() < 0.7 else random.randint(0, max_skip)
+
+    # Default listing fieldsets, as resolved for a request without fields=
+    image_fields = image_jobs.list_fields(fields=None, exclude=None)
+    video_fields = video_jobs.list_fields(fields=None, exclude=None)
+
+    scenarios: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+        "list_rows": lambda db: rows.list_rows(skip=skip(), limit=args.page_size, status=None, db=db),
+        "list_rows?status": lambda db: rows.list_rows(
+            skip=0, limit=args.page_size, status="FAILED", db=db),
+        "list_image_jobs": lambda db: image_jobs.list_image_jobs(
+            skip=skip(), limit=args.page_size, row_id=None, status=None, fields=image_fields, db=db),
+        "list_image_jobs?row_id": lambda db: image_jobs.list_image_jobs(
+            skip=0, limit=args.page_size, row_id=random.choice(sample_rows), status=None,
+            fields=image_fields, db=db),
+        "list_image_jobs?status": lambda db: image_jobs.list_image_jobs(
+            skip=0, limit=args.page_size, row_id=None, status=ImageJobStatus.FAILED,
+            fields=image_fields, db=db),
+        "list_video_jobs": lambda db: video_jobs.list_video_jobs(
+            skip=skip(), limit=args.page_size, row_id=None, image_job_id=None, status=None,
+            fields=video_fields, db=db),
+        "list_video_jobs?row_id": lambda db: video_jobs.list_video_jobs(
+            skip=0, limit=args.page_size, row_id=random.choice(sample_rows), image_job_id=None,
+            status=None, fields=video_fields, db=db),
+        "list_video_jobs?status": lambda db: video_jobs.list_video_jobs(
+            skip=0, limit=args.page_size, row_id=None, image_job_id=None,
+            status=VideoJobStatus.PROCESSING, fields=video_fields, db=db),
+        "get_video_job_by_external_id": lambda db: video_jobs.get_video_job_by_external_id(
+            external_task_id=random.choice(sample_external_ids), db=db),
+    }
+
+    recorder = StatementRecorder(engine.sync_engine)
+    report: Dict[str, Dict] = {}
+
+    async def measure(name: str, call: Callable[[Any], Awaitable[Any]], iterations: int) -> None:
+        latencies = []
+        for i in range(iterations + args.warmup):
+            async with AsyncSessionLocal() as db:
+                recorder.enabled = i == args.warmup
+                recorder.statements = [] if recorder.enabled else recorder.statements
+                started = time.perf_counter()
+                await call(db)
+                elapsed = time.perf_counter() - started
+                recorder.enabled = False
+            if i >= args.warmup:
+                latencies.append(elapsed * 1000)
+
+        plans = []
+        for statement, parameters in recorder.statements:
+            plans.append({
+                "sql": " ".join(statement.split()),
+                "plan": await explain(engine, statement, parameters, args.analyze),
+            })
+
+        report[name] = {
+            "iterations": len(latencies),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(max(latencies), 3) if latencies else 0.0,
+            "plans": plans,
+        }
+        print(f"{name:32} p50 {report[name]['p50_ms']:9.2f}ms  p95 {report[name]['p95_ms']:9.2f}ms  "
+              f"p99 {report[name]['p99_ms']:9.2f}ms")
+
+    for name, call in scenarios.items():
+        await measure(name, call, args.iterations)
+
+    if args.delete_iterations and delete_candidates:
+        # Deletes are destructive, so each iteration removes a different row
+        remaining = iter(delete_candidates)
+        saved_warmup = args.warmup
+        args.warmup = 0
+        await measure(
+            "delete_row",
+            lambda db: rows.delete_row(row_id=next(remaining), db=db),
+            len(delete_candidates)
+        )
+        args.warmup = saved_warmup
+
+    await engine.dispose()
+    return {
+        "dialect": engine.dialect.name,
+        "counts": counts,
+        "page_size": args.page_size,
+        "endpoints": report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--sample-size", type=int, default=1000)
+    parser.add_argument("--delete-iterations", type=int, default=20,
+                        help="Rows to delete through delete_row (destructive); 0 skips it")
+    parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE for SELECTs on PostgreSQL")
+    parser.add_argument("--show-plans", action="store_true")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    result = asyncio.run(run(args))
+
+    if args.show_plans:
+        for name, data in result["endpoints"].items():
+            print(f"\n== {name}")
+            for item in data["plans"]:
+                print(f"  {item['sql']}")
+                for line in item["plan"]:
+                    print(f"    {line}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"\nSaved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
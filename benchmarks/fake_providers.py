@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Local fake OpenAI and KLING servers for benchmarks.
+
+OpenAI routes are served under /openai/v1 and KLING routes under /kling/v1,
+so the app can be pointed here with OPENAI_BASE_URL and KLING_BASE_URL.
+Latency, error rate and 429 behaviour are configurable per provider.
+
+    python -m benchmarks.fake_providers --port 9100 --openai-latency lognormal:1.5:0.4
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+FAKE_YAML = """scene:
+  description: A quiet mountain lake at sunrise
+  mood: calm
+  time_of_day: morning
+  weather: clear
+
+subjects:
+  - type: mountain
+    description: Snow-capped peak reflected in the water
+    position: background
+    attributes:
+      - tall
+"""
+
+
+def _sample_png(size: int = 1024) -> bytes:
+    """
+    Render a gradient PNG so image fetches carry realistic payloads
+    """
+    from PIL import Image
+
+    image = Image.linear_gradient("L").resize((size, size)).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+class LatencyModel:
+    """
+    Sample response delays in seconds from a simple distribution.
+
+    Specs look like ``fixed:0.5``, ``uniform:0.2:1.0`` or
+    ``lognormal:<median>:<sigma>``.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.params = [float(p) for p in parts[1:]]
+
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        median, sigma = self.params
+        return random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+class ProviderBehavior:
+    """
+    Failure injection settings for one fake provider
+    """
+
+    def __init__(self, latency: str, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 max_rps: float = 0.0, retry_after: float = 1.0):
+        self.latency = LatencyModel(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self._tokens = max_rps
+        self._last_refill = time.monotonic()
+
+    def _take_token(self) -> bool:
+        if self.max_rps <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.max_rps, self._tokens + (now - self._last_refill) * self.max_rps)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def gate(self):
+        """
+        Return an error response to send instead of the real one, or None
+        """
+        if not self._take_token() or random.random() < self.rate_limit_rate:
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit exceeded"}},
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        await asyncio.sleep(self.latency.sample())
+
+        if random.random() < self.error_rate:
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected failure"}})
+        return None
+
+
+def create_app(openai: ProviderBehavior, kling_submit: ProviderBehavior,
+               kling_status: ProviderBehavior, render_time: LatencyModel) -> FastAPI:
+    """
+    Build the fake provider application
+    """
+    app = FastAPI(title="Fake providers")
+    calls: Counter = Counter()
+    tasks: Dict[str, float] = {}
+    references: Dict[str, str] = {}
+    sample_png = _sample_png()
+
+    @app.middleware("http")
+    async def count_calls(request: Request, call_next):
+        if not request.url.path.startswith("/_"):
+            calls[request.url.path.split("/")[1]] += 1
+            calls["total"] += 1
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def stats():
+        return {"calls": dict(calls), "tasks": len(tasks)}
+
+    @app.post("/_reset")
+    async def reset():
+        calls.clear()
+        tasks.clear()
+        references.clear()
+        return {"status": "reset"}
+
+    @app.get("/_files/{name}")
+    async def files(name: str):
+        return Response(content=sample_png, media_type="image/png")
+
+    @app.post("/openai/v1/images/generations")
+    async def images_generations(request: Request):
+        body = await request.json()
+        error = await openai.gate()
+        if error:
+            return error
+        return {
+            "created": int(time.time()),
+            "data": [
+                {"url": f"{request.base_url}_files/{uuid.uuid4()}.png"}
+                for _ in range(int(body.get("n", 1)))
+            ]
+        }
+
+    async def stream_chat(content: str):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for token in content.split(" "):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": token + " "}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(0.005)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await openai.gate()
+        if error:
+            return error
+        content = FAKE_YAML if body.get("model", "").startswith("gpt-4") else (
+            "A calm mountain lake at sunrise with a snow-capped peak reflected in still water"
+        )
+        if body.get("stream"):
+            return StreamingResponse(stream_chat(content), media_type="text/event-stream")
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 850, "completion_tokens": 220, "total_tokens": 1070}
+        }
+
+    @app.post("/kling/v1/videos/image2video")
+    async def create_video_task(request: Request):
+        body = await request.json()
+        error = await kling_submit.gate()
+        if error:
+            return error
+        reference = body.get("external_task_id")
+        if reference in references:
+            return JSONResponse(status_code=409, content={"code": 1201, "message": "external_task_id already exists"})
+        task_id = uuid.uuid4().hex
+        if reference:
+            references[reference] = task_id
+        tasks[task_id] = time.time() + render_time.sample()
+        return {"code": 0, "message": "SUCCEED", "data": {"task_id": task_id, "task_status": "submitted"}}
+
+    @app.get("/kling/v1/videos/image2video/{task_id}")
+    async def get_video_task(task_id: str):
+        error = await kling_status.gate()
+        if error:
+            return error
+        # Tasks can be looked up by their external_task_id too
+        task_id = references.get(task_id, task_id)
+        ready_at = tasks.get(task_id)
+        if ready_at is None:
+            return {"code": 1201, "message": "Task not found"}
+        if time.time() < ready_at:
+            return {"code": 0, "data": {"task_id": task_id, "task_status": "processing"}}
+        return {
+            "code": 0,
+            "data": {
+                "task_id": task_id,
+                "task_status": "succeed",
+                "updated_at": int(ready_at * 1000),
+                "works": [{"url": f"https://fake-kling.local/videos/{task_id}.mp4"}]
+            }
+        }
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Register fake provider options on a parser
+    """
+    parser.add_argument("--openai-latency", default="lognormal:0.5:0.3")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-429-rate", type=float, default=0.0)
+    parser.add_argument("--openai-max-rps", type=float, default=0.0, help="Token bucket limit, 0 disables")
+    parser.add_argument("--kling-latency", default="lognormal:0.2:0.3")
+    parser.add_argument("--kling-error-rate", type=float, default=0.0)
+    parser.add_argument("--kling-429-rate", type=float, default=0.0)
+    parser.add_argument("--kling-max-rps", type=float, default=0.0, help="Token bucket limit, 0 disables")
+    parser.add_argument("--kling-render-time", default="uniform:2:5")
+
+
+def app_from_args(args: argparse.Namespace) -> FastAPI:
+    kling_args = dict(
+        error_rate=args.kling_error_rate,
+        rate_limit_rate=args.kling_429_rate,
+        max_rps=args.kling_max_rps
+    )
+    return create_app(
+        openai=ProviderBehavior(
+            args.openai_latency,
+            error_rate=args.openai_error_rate,
+            rate_limit_rate=args.openai_429_rate,
+            max_rps=args.openai_max_rps
+        ),
+        kling_submit=ProviderBehavior(args.kling_latency, **kling_args),
+        kling_status=ProviderBehavior(args.kling_latency, **kling_args),
+        render_time=LatencyModel(args.kling_render_time)
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(app_from_args(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Image to Video API.
+
+Starts the fake providers and the real FastAPI app (each in its own process,
+with a throwaway SQLite database), drives job creation through the HTTP API,
+and waits for every job to reach a terminal state. Reports jobs/sec, p50/p99
+end-to-end latency, upstream calls per job and the app's peak memory.
+
+    python -m benchmarks.load --workload video --jobs 100 --concurrency 20 --save-baseline main
+    python -m benchmarks.load --workload video --jobs 100 --concurrency 20 --compare main
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_providers
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile; returns 0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(p / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """
+    Read a process's peak resident set size from /proc (Linux only)
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def wait_until_healthy(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not become healthy")
+
+
+class LoadGenerator:
+    def __init__(self, api_base: str, provider_url: str, workload: str, poll_interval: float, job_timeout: float):
+        self.api_base = api_base
+        self.provider_url = provider_url
+        self.workload = workload
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.latencies: List[float] = []
+        self.outcomes: Dict[str, int] = {}
+        self.throttled = 0
+
+    async def _post(self, client: httpx.AsyncClient, url: str, body: Dict) -> httpx.Response:
+        # Back off as told when the app refuses work with 429
+        while True:
+            response = await client.post(url, json=body)
+            if response.status_code != 429:
+                return response
+            self.throttled += 1
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    async def _create_job(self, client: httpx.AsyncClient, index: int) -> str:
+        if self.workload == "image" or (self.workload == "mixed" and index % 2 == 0):
+            response = await self._post(
+                client,
+                f"{self.api_base}/image-jobs/",
+                {"prompt": f"Benchmark landscape #{index} with a lake at sunrise"}
+            )
+            return f"image-jobs/{response.json()['id']}"
+
+        response = await self._post(
+            client,
+            f"{self.api_base}/video-jobs/",
+            {
+                "source_image_url": f"{self.provider_url}/_files/{index}.png",
+                "motion_prompt": "Camera slowly pans from left to right",
+                "model": "kling",
+                "duration": 5
+            }
+        )
+        return f"video-jobs/{response.json()['id']}"
+
+    async def run_one(self, client: httpx.AsyncClient, index: int) -> None:
+        started = time.perf_counter()
+        try:
+            path = await self._create_job(client, index)
+            status = "timeout"
+            while time.perf_counter() - started < self.job_timeout:
+                job = (await client.get(f"{self.api_base}/{path}")).json()
+                if job["status"] in TERMINAL_STATUSES:
+                    status = job["status"]
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except Exception:
+            status = "client_error"
+
+        self.outcomes[status] = self.outcomes.get(status, 0) + 1
+        if status == "completed":
+            self.latencies.append(time.perf_counter() - started)
+
+    async def run(self, jobs: int, concurrency: int) -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency * 2)
+
+        async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+            async def bounded(index: int):
+                async with semaphore:
+                    await self.run_one(client, index)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(bounded(i) for i in range(jobs)))
+            return time.perf_counter() - started
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    provider_port = _free_port()
+    app_port = _free_port()
+    provider_url = f"http://127.0.0.1:{provider_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+
+    provider_cmd = [
+        sys.executable, "-m", "benchmarks.fake_providers",
+        "--port", str(provider_port),
+        "--openai-latency", args.openai_latency,
+        "--openai-error-rate", str(args.openai_error_rate),
+        "--openai-429-rate", str(args.openai_429_rate),
+        "--openai-max-rps", str(args.openai_max_rps),
+        "--kling-latency", args.kling_latency,
+        "--kling-error-rate", str(args.kling_error_rate),
+        "--kling-429-rate", str(args.kling_429_rate),
+        "--kling-max-rps", str(args.kling_max_rps),
+        "--kling-render-time", args.kling_render_time,
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    app_env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        DB_AUTO_MIGRATE="true",
+        OPENAI_BASE_URL=f"{provider_url}/openai/v1",
+        KLING_BASE_URL=f"{provider_url}/kling/v1",
+        KLING_POLL_INTERVAL_SECONDS=str(args.kling_poll_interval),
+        IMAGE_CACHE_DIR=os.path.join(workdir, "cache"),
+        # Source images are served by the local fake provider
+        IMAGE_FETCH_ALLOW_PRIVATE="true",
+        OPENAI_API_KEY="bench",
+        KLING_ACCESS_KEY="bench",
+        KLING_SECRET_KEY="bench",
+        JWT_SECRET_KEY="bench",
+    )
+    app_cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--port", str(app_port), "--log-level", "warning",
+        "--workers", str(args.app_workers),
+    ]
+
+    log_path = os.path.join(workdir, "app.log")
+    log_file = open(log_path, "w")
+    providers = subprocess.Popen(provider_cmd, cwd=ROOT_DIR)
+    app = subprocess.Popen(app_cmd, cwd=ROOT_DIR, env=app_env, stdout=log_file, stderr=subprocess.STDOUT)
+    try:
+        await wait_until_healthy(f"{provider_url}/_stats")
+        await wait_until_healthy(f"{app_url}/health")
+
+        generator = LoadGenerator(
+            f"{app_url}/api/v1", provider_url, args.workload, args.client_poll_interval, args.job_timeout
+        )
+        wall_time = await generator.run(args.jobs, args.concurrency)
+
+        async with httpx.AsyncClient() as client:
+            upstream = (await client.get(f"{provider_url}/_stats")).json()["calls"]
+        peak_memory = peak_rss_mb(app.pid)
+    finally:
+        app.terminate()
+        providers.terminate()
+        app.wait()
+        providers.wait()
+        log_file.close()
+
+    if peak_memory is None:
+        peak_memory = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    completed = generator.outcomes.get("completed", 0)
+    return {
+        "workload": args.workload,
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "app_workers": args.app_workers,
+        "wall_time_s": round(wall_time, 3),
+        "jobs_per_sec": round(completed / wall_time, 3) if wall_time else 0.0,
+        "latency_p50_s": round(percentile(generator.latencies, 50), 3),
+        "latency_p99_s": round(percentile(generator.latencies, 99), 3),
+        "upstream_calls_per_job": round(upstream.get("total", 0) / args.jobs, 3),
+        "upstream_calls": upstream,
+        "peak_memory_mb": round(peak_memory, 1),
+        "outcomes": generator.outcomes,
+        "throttled_requests": generator.throttled,
+        "app_log": log_path,
+    }
+
+
+# Metrics compared against baselines, and whether higher is better
+COMPARED_METRICS = {
+    "jobs_per_sec": True,
+    "latency_p50_s": False,
+    "latency_p99_s": False,
+    "upstream_calls_per_job": False,
+    "peak_memory_mb": False,
+}
+
+# Per-run details that should not be stored in a baseline
+UNSAVED_FIELDS = ("app_log",)
+
+
+def compare(result: Dict, baseline: Dict) -> None:
+    print(f"\nComparison with baseline ({baseline.get('workload')}, {baseline.get('jobs')} jobs):")
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        marker = "better" if better else ("worse" if change else "same")
+        print(f"  {metric:24} {old:>10} -> {new:>10}  ({change:+.1f}%, {marker})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=["image", "video", "mixed"], default="image")
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--app-workers", type=int, default=1,
+                        help="uvicorn worker processes; peak memory then covers the supervisor only")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--client-poll-interval", type=float, default=0.2)
+    parser.add_argument("--kling-poll-interval", type=float, default=0.5)
+    parser.add_argument("--job-timeout", type=float, default=120.0)
+    parser.add_argument("--database-url", help="Use this database instead of a throwaway SQLite file")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    fake_providers.add_arguments(parser)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    print(json.dumps(result, indent=2))
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            compare(result, json.load(f))
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        with open(path, "w") as f:
+            json.dump({k: v for k, v in result.items() if k not in UNSAVED_FIELDS}, f, indent=2)
+        print(f"\nSaved baseline to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Bulk-seed a database with synthetic rows, image jobs and video jobs.
+
+Jobs are spread over rows with a configurable skew (a few rows own most of
+the jobs, as with real batch uploads) and statuses follow a production-like
+mix. PostgreSQL is loaded with COPY; other databases use batched inserts.
+
+    python -m benchmarks.seed_db --database-url sqlite:///./bench.db --rows 100000
+    python -m benchmarks.seed_db --database-url postgresql+asyncpg://... --rows 1000000 --jobs-per-row 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Sequence
+
+# The app reads its settings on import; provide the required ones
+for _key in ("OPENAI_API_KEY", "KLING_ACCESS_KEY", "KLING_SECRET_KEY", "JWT_SECRET_KEY"):
+    os.environ.setdefault(_key, "bench")
+
+ROW_STATUS_WEIGHTS = {"COMPLETED": 70, "PROCESSING": 5, "PENDING": 15, "FAILED": 10}
+JOB_STATUS_WEIGHTS = {"COMPLETED": 82, "FAILED": 8, "PROCESSING": 3, "PENDING": 7}
+
+SUBJECTS = ["sunset beach", "mountain lake", "city skyline", "forest trail", "product shot",
+            "coffee cup", "neon street", "desert dunes", "snowy village", "studio portrait"]
+STYLES = ["cinematic", "watercolor", "photorealistic", "anime", "isometric", "film grain"]
+
+YAML_TEMPLATE = """scene:
+  description: {subject} in {style} style
+  mood: calm
+  time_of_day: morning
+  weather: clear
+
+subjects:
+  - type: {subject}
+    description: Detailed {subject} with soft light
+    position: center
+    attributes:
+      - sharp
+      - vivid
+
+environment:
+  setting: outdoor
+  foreground: grass
+  background: hills
+  lighting: golden hour
+"""
+
+
+def weighted_choices(weights: Dict[str, int], k: int) -> List[str]:
+    return random.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def skewed_index(n: int, skew: float) -> int:
+    """
+    Pick an index in [0, n) where low indices are far more likely for skew > 1
+    """
+    return min(n - 1, int(n * random.random() ** skew))
+
+
+class Seeder:
+    def __init__(self, rows: int, jobs_per_row: float, videos_per_image: float, skew: float,
+                 orphan_ratio: float, days: int):
+        self.rows = rows
+        self.image_jobs = int(rows * jobs_per_row)
+        self.video_jobs = int(self.image_jobs * videos_per_image)
+        self.skew = skew
+        self.orphan_ratio = orphan_ratio
+        self.now = datetime.utcnow()
+        self.span_seconds = days * 86400
+        self.row_ids: List[uuid.UUID] = []
+        self.image_ids: List[uuid.UUID] = []
+        self.image_rows: List[uuid.UUID] = []
+
+    def _timestamp(self) -> datetime:
+        return self.now - timedelta(seconds=random.randrange(self.span_seconds))
+
+    def row_batches(self, batch_size: int) -> Iterator[List[Dict]]:
+        for start in range(0, self.rows, batch_size):
+            count = min(batch_size, self.rows - start)
+            statuses = weighted_choices(ROW_STATUS_WEIGHTS, count)
+            batch = []
+            for i in range(count):
+                row_id = uuid.uuid4()
+                self.row_ids.append(row_id)
+                created = self._timestamp()
+                subject = random.choice(SUBJECTS)
+                batch.append({
+                    "id": row_id,
+                    "google_sheet_row_id": str(start + i + 2),
+                    "title": f"{subject.title()} #{start + i}",
+                    "description": f"Batch upload of {subject} references",
+                    "status": statuses[i],
+                    "created_at": created,
+                    "updated_at": created,
+                })
+            yield batch
+
+    def image_job_batches(self, batch_size: int) -> Iterator[List[Dict]]:
+        for start in range(0, self.image_jobs, batch_size):
+            count = min(batch_size, self.image_jobs - start)
+            statuses = weighted_choices(JOB_STATUS_WEIGHTS, count)
+            batch = []
+            for i in range(count):
+                job_id = uuid.uuid4()
+                row_id = None
+                if random.random() >= self.orphan_ratio:
+                    row_id = self.row_ids[skewed_index(len(self.row_ids), self.skew)]
+                self.image_ids.append(job_id)
+                self.image_rows.append(row_id)
+
+                status = statuses[i]
+                created = self._timestamp()
+                subject, style = random.choice(SUBJECTS), random.choice(STYLES)
+                completed = status == "COMPLETED"
+                batch.append({
+                    "id": job_id,
+                    "row_id": row_id,
+                    "prompt": f"A {style} image of a {subject}, detailed composition, soft light, "
+                              f"high dynamic range, variation {random.randrange(10000)}",
+                    "reference_image_url": f"https://cdn.example.com/ref/{job_id.hex}.jpg" if random.random() < 0.4 else None,
+                    "yaml_content": YAML_TEMPLATE.format(subject=subject, style=style) if random.random() < 0.6 else None,
+                    "image_url": f"https://cdn.example.com/img/{job_id.hex}.png" if completed else None,
+                    "status": status,
+                    "error_message": "Image generation failed: upstream timeout" if status == "FAILED" else None,
+                    "model": "gpt-image-1",
+                    "size": random.choice(["1024x1024", "1792x1024", "1024x1792"]),
+                    "created_at": created,
+                    "updated_at": created,
+                    "completed_at": created + timedelta(seconds=random.randrange(10, 90)) if completed else None,
+                })
+            yield batch
+
+    def video_job_batches(self, batch_size: int) -> Iterator[List[Dict]]:
+        for start in range(0, self.video_jobs, batch_size):
+            count = min(batch_size, self.video_jobs - start)
+            statuses = weighted_choices(JOB_STATUS_WEIGHTS, count)
+            batch = []
+            for i in range(count):
+                job_id = uuid.uuid4()
+                index = skewed_index(len(self.image_ids), self.skew)
+                status = statuses[i]
+                created = self._timestamp()
+                completed = status == "COMPLETED"
+                batch.append({
+                    "id": job_id,
+                    "row_id": self.image_rows[index],
+                    "image_job_id": self.image_ids[index],
+                    "source_image_url": f"https://cdn.example.com/img/{self.image_ids[index].hex}.png",
+                    "motion_prompt": random.choice(["Camera slowly pans left", "Slow zoom in", "Gentle parallax"]),
+                    "duration": random.choice([5, 10]),
+                    "model": "KLING",
+                    "external_task_id": uuid.uuid4().hex if status != "PENDING" else None,
+                    "video_url": f"https://cdn.example.com/vid/{job_id.hex}.mp4" if completed else None,
+                    "status": status,
+                    "progress": 100 if completed else (50 if status == "PROCESSING" else 0),
+                    "error_message": "KLING API error: task failed" if status == "FAILED" else None,
+                    "created_at": created,
+                    "updated_at": created,
+                    "completed_at": created + timedelta(seconds=random.randrange(60, 300)) if completed else None,
+                })
+            yield batch
+
+
+async def copy_batch(conn, table, batch: Sequence[Dict]) -> None:
+    """
+    Load a batch with PostgreSQL COPY through the raw asyncpg connection
+    """
+    columns = list(batch[0])
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(item[c] for c in columns) for item in batch],
+        columns=columns
+    )
+
+
+async def seed(args: argparse.Namespace) -> None:
+    from sqlalchemy import insert, text
+
+    # Migrations and the engine both read DATABASE_URL from settings
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.db.base_class import Base
+    from app.db.init_db import run_migrations
+    from app.db.job_counters import recount
+    from app.db.search import SEARCH_TARGETS, fts_table
+    from app.db.session import engine
+    from app.models import Row, ImageJob, VideoJob
+
+    use_copy = engine.dialect.name == "postgresql"
+
+    if args.drop:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+            # SQLite search tables are not in the metadata
+            for table, _ in SEARCH_TARGETS.values():
+                await conn.execute(text(f"DROP TABLE IF EXISTS {fts_table(table)}"))
+    await asyncio.to_thread(run_migrations)
+
+    seeder = Seeder(args.rows, args.jobs_per_row, args.videos_per_image, args.skew,
+                    args.orphan_ratio, args.days)
+    plan = [
+        (Row, seeder.row_batches, seeder.rows),
+        (ImageJob, seeder.image_job_batches, seeder.image_jobs),
+        (VideoJob, seeder.video_job_batches, seeder.video_jobs),
+    ]
+
+    for model, batches, total in plan:
+        started = time.perf_counter()
+        done = 0
+        for batch in batches(args.batch_size):
+            async with engine.begin() as conn:
+                if use_copy:
+                    await copy_batch(conn, model.__table__, batch)
+                else:
+                    await conn.execute(insert(model.__table__), batch)
+            done += len(batch)
+            print(f"\r{model.__tablename__}: {done}/{total}", end="", flush=True)
+        elapsed = time.perf_counter() - started
+        print(f"\r{model.__tablename__}: {done} inserted in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f}/s)")
+
+    # Bulk inserts bypass the ORM flush hook that maintains the counters
+    async with engine.begin() as conn:
+        await conn.run_sync(recount)
+
+    if use_copy:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+    else:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--jobs-per-row", type=float, default=3.0, help="Average image jobs per row")
+    parser.add_argument("--videos-per-image", type=float, default=0.8)
+    parser.add_argument("--skew", type=float, default=3.0, help="Higher values concentrate jobs on fewer rows")
+    parser.add_argument("--orphan-ratio", type=float, default=0.05, help="Share of image jobs without a row")
+    parser.add_argument("--days", type=int, default=180, help="Spread created_at over this many days")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop", action="store_true", help="Drop existing tables first")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    main()
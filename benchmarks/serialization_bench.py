@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Per-item cost of the list endpoint response path.
+
+Compares the ORM path (load full objects, validate them through the response
+schema with ``from_attributes`` and encode with the stdlib JSON response)
+against the fast path (select plain columns and encode the rows with orjson),
+with all fields and with the default listing fieldset.
+Runs against an in-memory SQLite database so the numbers isolate row loading
+and serialization from network and disk.
+
+    python -m benchmarks.serialization_bench --items 100 --iterations 200
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from benchmarks.load import percentile
+
+# The app reads its settings on import; provide the required ones
+for key in ("OPENAI_API_KEY", "KLING_ACCESS_KEY", "KLING_SECRET_KEY", "JWT_SECRET_KEY"):
+    os.environ.setdefault(key, "bench")
+
+
+def seed(session, items: int) -> None:
+    from app.models import ImageJob, ImageJobStatus, Row, VideoJob, VideoJobStatus, VideoModel
+
+    row = Row(title="bench")
+    session.add(row)
+    session.flush()
+
+    now = datetime.utcnow()
+    for i in range(items):
+        image = ImageJob(
+            id=uuid.uuid4(),
+            row_id=row.id,
+            prompt="A lighthouse on a cliff at dusk, volumetric light, 35mm " * 3,
+            size="1024x1024",
+            status=random.choice(list(ImageJobStatus)),
+            image_url=f"https://cdn.example.com/images/{uuid.uuid4().hex}.png",
+            reference_image_url=f"https://cdn.example.com/ref/{i}.jpg",
+            created_at=now - timedelta(seconds=i),
+            updated_at=now,
+            completed_at=now,
+        )
+        session.add(image)
+        session.add(VideoJob(
+            id=uuid.uuid4(),
+            row_id=row.id,
+            image_job_id=image.id,
+            source_image_url=image.image_url,
+            motion_prompt="Slow dolly in, waves crashing",
+            model=VideoModel.KLING,
+            duration=5,
+            status=random.choice(list(VideoJobStatus)),
+            progress=random.randint(0, 100),
+            video_url=f"https://cdn.example.com/videos/{uuid.uuid4().hex}.mp4",
+            external_task_id=uuid.uuid4().hex,
+            created_at=now - timedelta(seconds=i),
+            updated_at=now,
+            submitted_at=now,
+            completed_at=now,
+        ))
+    session.commit()
+
+
+def measure(fn: Callable[[], bytes], iterations: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(args: argparse.Namespace) -> Dict:
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+
+    from app.db.base_class import Base
+    from app.models import ImageJob, VideoJob
+    from app.schemas import image_job as image_schemas, video_job as video_schemas
+    from app.utils.serialization import resolve_fields, rows_response, schema_columns
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.items)
+
+    report = {}
+    for name, model, schema, deferred in (
+        ("image_jobs", ImageJob, image_schemas.ImageJob, image_schemas.LIST_DEFERRED_FIELDS),
+        ("video_jobs", VideoJob, video_schemas.VideoJob, video_schemas.LIST_DEFERRED_FIELDS),
+    ):
+        adapter = TypeAdapter(List[schema])
+        order = model.created_at.desc()
+
+        def orm_path() -> bytes:
+            # What FastAPI does for a response_model with from_attributes
+            with Session(engine) as session:
+                jobs = session.execute(select(model).order_by(order)).scalars().all()
+                content = adapter.dump_python(adapter.validate_python(jobs, from_attributes=True), mode="json")
+                return JSONResponse(content).body
+
+        def fast_path() -> bytes:
+            with Session(engine) as session:
+                rows = session.execute(select(*schema_columns(model, schema)).order_by(order))
+                return rows_response(rows).body
+
+        listing_fields = resolve_fields(schema, None, None, deferred)
+
+        def listing_path() -> bytes:
+            # Fast path with the default listing fieldset (large text left out)
+            with Session(engine) as session:
+                rows = session.execute(select(*schema_columns(model, schema, listing_fields)).order_by(order))
+                return rows_response(rows).body
+
+        before = measure(orm_path, args.iterations, args.warmup)
+        after = measure(fast_path, args.iterations, args.warmup)
+        sparse = measure(listing_path, args.iterations, args.warmup)
+
+        per_item = lambda timings: percentile(timings, 50) / args.items * 1e6
+        report[name] = {
+            "items": args.items,
+            "orm_us_per_item": round(per_item(before), 2),
+            "fast_us_per_item": round(per_item(after), 2),
+            "listing_us_per_item": round(per_item(sparse), 2),
+            "full_bytes_per_item": len(fast_path()) // args.items,
+            "listing_bytes_per_item": len(listing_path()) // args.items,
+            "orm_p99_ms": round(percentile(before, 99) * 1000, 3),
+            "fast_p99_ms": round(percentile(after, 99) * 1000, 3),
+        }
+        report[name]["speedup"] = round(report[name]["orm_us_per_item"] / report[name]["fast_us_per_item"], 2)
+        print(f"{name:12} orm {report[name]['orm_us_per_item']:8.2f}us/item  "
+              f"fast {report[name]['fast_us_per_item']:8.2f}us/item  x{report[name]['speedup']}  "
+              f"listing {report[name]['listing_us_per_item']:8.2f}us/item "
+              f"({report[name]['full_bytes_per_item']} -> {report[name]['listing_bytes_per_item']} bytes/item)")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="Jobs per page")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
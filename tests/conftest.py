@@ -0,0 +1,75 @@
+"""
+Shared test setup: settings for a throwaway SQLite database, and empty
+tables for each test that touches the database.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+import pytest_asyncio
+
+_tmp_dir = tempfile.mkdtemp(prefix="image-to-video-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_tmp_dir, "cache")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("KLING_ACCESS_KEY", "test-key")
+os.environ.setdefault("KLING_SECRET_KEY", "test-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+_schema_created = False
+
+
+@pytest_asyncio.fixture
+async def db():
+    """
+    A session on an empty database with every table created
+    """
+    global _schema_created
+    from app.db.base_class import Base
+    from app.db.init_db import run_migrations
+    from app.db.session import AsyncSessionLocal, engine
+    import app.models  # noqa: F401 - registers the tables
+
+    if not _schema_created:
+        # Migrations, not create_all, so the search index exists too
+        await asyncio.to_thread(run_migrations)
+        _schema_created = True
+
+    async with AsyncSessionLocal() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    # Connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(db):
+    """
+    An HTTP client calling the app in-process, without its background services
+    """
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """
+    Runner keys of the jobs handed to the runner, which is not started in tests
+    """
+    from app.services.job_runner import job_runner
+
+    keys = []
+    monkeypatch.setattr(job_runner, "submit", lambda key, *args, **kwargs: keys.append(key) or True)
+    return keys
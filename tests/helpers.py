@@ -0,0 +1,31 @@
+from app.db.session import AsyncSessionLocal
+from app.models import Row, VideoJob, VideoModel
+
+
+def video_job(status, **values) -> VideoJob:
+    return VideoJob(
+        source_image_url="https://images.test/a.png", motion_prompt="pan left",
+        model=VideoModel.KLING, status=status, **values
+    )
+
+
+async def add_row(db, *jobs) -> Row:
+    """
+    Commit a new row holding the given jobs
+    """
+    row = Row(title="row")
+    db.add(row)
+    await db.flush()
+    for job in jobs:
+        job.row_id = row.id
+        db.add(job)
+    await db.commit()
+    return row
+
+
+async def load(model, job_id):
+    """
+    Read a job as committed, bypassing the test session's identity map
+    """
+    async with AsyncSessionLocal() as session:
+        return await session.get(model, job_id)
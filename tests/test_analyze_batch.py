@@ -0,0 +1,66 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.core.config import settings
+from app.services import image_preprocess_service, openai_service
+
+
+@pytest.fixture
+def vision(monkeypatch):
+    """
+    Analyses that finish after the delay given in the image URL's path, or fail for /bad
+    """
+    running = {"now": 0, "peak": 0}
+
+    async def prepare_for_vision(image_url):
+        return image_url, "low"
+
+    async def analyze_image(image_url, detail="high"):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        try:
+            name = image_url.rsplit("/", 1)[1]
+            if name == "bad":
+                raise Exception("vision failed")
+            await asyncio.sleep(float(name))
+            return {"yaml": f"image: {name}", "preview": {}}
+        finally:
+            running["now"] -= 1
+
+    monkeypatch.setattr(image_preprocess_service, "prepare_for_vision", prepare_for_vision)
+    monkeypatch.setattr(openai_service, "analyze_image", analyze_image)
+    return running
+
+
+async def _lines(client, urls):
+    response = await client.post("/api/v1/image-jobs/analyze/batch", json={"image_urls": urls})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order(client, vision):
+    urls = ["https://images.test/0.1", "https://images.test/0", "https://images.test/0.05"]
+    lines = await _lines(client, urls)
+    assert [line["index"] for line in lines] == [1, 2, 0]
+    assert lines[0] == {"index": 1, "image_url": urls[1], "yaml": "image: 0", "preview": {}}
+
+
+@pytest.mark.asyncio
+async def test_a_failed_image_does_not_fail_the_batch(client, vision):
+    lines = await _lines(client, ["https://images.test/bad", "https://images.test/0"])
+    assert sorted(lines, key=lambda line: line["index"]) == [
+        {"index": 0, "image_url": "https://images.test/bad", "error": "vision failed"},
+        {"index": 1, "image_url": "https://images.test/0", "yaml": "image: 0", "preview": {}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(client, vision, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_VISION_CONCURRENCY", 2)
+    lines = await _lines(client, [f"https://images.test/0.0{i}" for i in range(6)])
+    assert len(lines) == 6
+    assert vision["peak"] == 2
@@ -0,0 +1,89 @@
+import importlib
+import json
+
+import httpx
+import pytest
+
+from app.db.usage import MAX_BUFFERED_USAGE, take_usage
+from app.services import image_preprocess_service
+
+# The package re-exports the service instance under the module's name
+openai_module = importlib.import_module("app.services.openai_service")
+
+
+def _chunks(*tokens, usage=None) -> bytes:
+    lines = [{"choices": [{"delta": {"content": token}}]} for token in tokens]
+    lines.append({"choices": [], "usage": usage})
+    return "".join(f"data: {json.dumps(line)}\n\n" for line in lines).encode() + b"data: [DONE]\n\n"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Chat completions streamed from a list of responses, one per call
+    """
+    responses = []
+    requests = []
+
+    async def prepare_for_vision(image_url):
+        return image_url, "low"
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return responses.pop(0)
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(image_preprocess_service, "prepare_for_vision", prepare_for_vision)
+    monkeypatch.setattr(
+        openai_module.httpx, "AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))
+    )
+    take_usage(MAX_BUFFERED_USAGE)
+    yield responses, requests
+    take_usage(MAX_BUFFERED_USAGE)
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_analysis_then_prompt_stream_as_tokens(client, upstream):
+    responses, requests = upstream
+    usage = {"prompt_tokens": 10, "completion_tokens": 3}
+    responses.append(httpx.Response(200, content=_chunks("description: ", "a cat", usage=usage)))
+    responses.append(httpx.Response(200, content=_chunks("A cat ", "sleeping", usage=usage)))
+
+    response = await client.post(
+        "/api/v1/image-jobs/analyze-to-prompt/stream", json={"image_url": "https://images.test/cat.png"}
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _events(response.text) == [
+        ("token", {"stage": "analysis", "text": "description: "}),
+        ("token", {"stage": "analysis", "text": "a cat"}),
+        ("analysis", {
+            "yaml": "description: a cat",
+            "preview": {"description": "a cat", "mainSubjects": ["No specific subjects identified"], "mood": "neutral"}
+        }),
+        ("token", {"stage": "prompt", "text": "A cat "}),
+        ("token", {"stage": "prompt", "text": "sleeping"}),
+        ("prompt", {"prompt": "A cat sleeping"}),
+        ("done", {}),
+    ]
+    assert all(request["stream"] for request in requests)
+    # The prompt call is given the streamed YAML
+    assert "description: a cat" in json.dumps(requests[1])
+    assert [entry["input_tokens"] for entry in take_usage(MAX_BUFFERED_USAGE)] == [10, 10]
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_ends_the_stream_with_an_error_event(client, upstream):
+    responses, _ = upstream
+    responses.append(httpx.Response(500, content=b"overloaded"))
+
+    response = await client.post("/api/v1/image-jobs/yaml-to-prompt/stream", json={"yaml": "description: a cat"})
+    assert response.status_code == 200
+    assert _events(response.text) == [("error", {"detail": "Chat completion failed: overloaded"})]
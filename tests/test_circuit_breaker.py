@@ -0,0 +1,80 @@
+import httpx
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, is_upstream_failure
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.test/")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(code, request=request))
+
+
+def _expire(breaker: CircuitBreaker) -> None:
+    breaker._opened_at -= breaker.reset_timeout
+
+
+def test_upstream_failures():
+    assert is_upstream_failure(_status_error(500))
+    assert is_upstream_failure(_status_error(429))
+    assert is_upstream_failure(httpx.ConnectError("refused"))
+    assert not is_upstream_failure(_status_error(400))
+    assert not is_upstream_failure(ValueError("bad"))
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.record_error(_status_error(503))
+    assert breaker.state == "closed"
+    breaker.record_error(_status_error(503))
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 30
+
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.record_error(_status_error(503))
+    breaker.record_success()
+    breaker.record_error(_status_error(503))
+    assert breaker.state == "closed"
+
+
+def test_bad_requests_do_not_count():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.record_error(_status_error(400))
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.record_error(_status_error(503))
+    _expire(breaker)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_outcome_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.record_error(_status_error(503))
+    _expire(breaker)
+    assert breaker.allow()
+    breaker.record_error(_status_error(503))
+    assert breaker.state == "open"
+
+    _expire(breaker)
+    assert breaker.allow()
+    breaker.record_error(_status_error(422))
+    assert breaker.state == "closed"
+
+
+def test_snapshot():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    assert breaker.snapshot() == {"state": "closed", "failures": 0, "retry_after": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_at_once_when_closed():
+    await CircuitBreaker("test", failure_threshold=1, reset_timeout=30).wait()
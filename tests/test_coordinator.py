@@ -0,0 +1,36 @@
+from app.services.coordinator import HashRing
+
+
+def _owners(ring: HashRing, keys):
+    return {key: ring.node_for(key) for key in keys}
+
+
+def test_empty_ring_owns_nothing():
+    assert HashRing().node_for("task") is None
+
+
+def test_every_key_maps_to_a_member():
+    ring = HashRing(["a", "b", "c"])
+    assert set(_owners(ring, [f"task-{i}" for i in range(300)]).values()) == {"a", "b", "c"}
+
+
+def test_node_order_does_not_matter():
+    keys = [f"task-{i}" for i in range(100)]
+    assert _owners(HashRing(["a", "b", "c"]), keys) == _owners(HashRing(["c", "a", "b", "a"]), keys)
+
+
+def test_only_a_leaving_nodes_keys_move():
+    keys = [f"task-{i}" for i in range(1000)]
+    before = _owners(HashRing(["a", "b", "c"]), keys)
+    after = _owners(HashRing(["a", "b"]), keys)
+
+    for key in keys:
+        if before[key] != "c":
+            assert after[key] == before[key]
+
+
+def test_keys_spread_across_nodes():
+    keys = [f"task-{i}" for i in range(3000)]
+    owners = list(_owners(HashRing(["a", "b", "c"]), keys).values())
+    for node in "abc":
+        assert owners.count(node) > 500
@@ -0,0 +1,59 @@
+import os
+
+from app.utils.disk_cache import DiskLRUCache
+
+
+def test_get_returns_what_was_put(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=100)
+    cache.put("abc", b"data")
+    assert cache.get("abc") == b"data"
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=10)
+    cache.put("aa1", b"12345")
+    cache.put("aa2", b"12345")
+    cache.get("aa1")
+    cache.put("aa3", b"12345")
+
+    assert cache.get("aa1") == b"12345"
+    assert cache.get("aa2") is None
+    assert cache.get("aa3") == b"12345"
+
+
+def test_overwrite_replaces_size(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=10)
+    cache.put("aa1", b"1234567890")
+    cache.put("aa1", b"12")
+    cache.put("aa2", b"12345678")
+    assert cache.get("aa1") == b"12"
+    assert cache._total_bytes == 10
+
+
+def test_entries_larger_than_the_cache_are_skipped(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=4)
+    cache.put("aa1", b"12345")
+    assert cache.get("aa1") is None
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=10)
+    cache.put("aa1", b"12345")
+    cache.put("aa2", b"12345")
+    # Make aa1 the older entry regardless of timestamp resolution
+    os.utime(cache._path("aa1"), (1, 1))
+
+    reopened = DiskLRUCache(str(tmp_path), max_bytes=10)
+    assert reopened.get("aa2") == b"12345"
+    reopened.put("aa3", b"12345")
+    assert reopened.get("aa1") is None
+    assert reopened.get("aa3") == b"12345"
+
+
+def test_file_removed_behind_the_cache_is_a_miss(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=10)
+    cache.put("aa1", b"12345")
+    os.remove(cache._path("aa1"))
+    assert cache.get("aa1") is None
+    assert cache._total_bytes == 0
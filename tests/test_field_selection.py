@@ -0,0 +1,47 @@
+import pytest
+
+from app.schemas.image_job import ImageJob, LIST_DEFERRED_FIELDS
+from app.utils.serialization import resolve_fields
+
+
+def test_default_leaves_out_deferred_fields():
+    fields = resolve_fields(ImageJob, None, None, LIST_DEFERRED_FIELDS)
+    assert "id" in fields
+    assert not set(fields) & LIST_DEFERRED_FIELDS
+
+
+def test_requested_fields_keep_schema_order_and_the_id():
+    fields = resolve_fields(ImageJob, "status, prompt", None, LIST_DEFERRED_FIELDS)
+    assert fields == [name for name in ImageJob.model_fields if name in ("id", "prompt", "status")]
+
+
+def test_exclude_applies_after_fields():
+    fields = resolve_fields(ImageJob, None, "status,image_url", LIST_DEFERRED_FIELDS)
+    assert "status" not in fields
+    assert "image_url" not in fields
+    assert "created_at" in fields
+
+
+def test_id_cannot_be_excluded():
+    assert set(resolve_fields(ImageJob, "status", "id", ())) == {"id", "status"}
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="bogus"):
+        resolve_fields(ImageJob, "status,bogus", None)
+    with pytest.raises(ValueError, match="nope"):
+        resolve_fields(ImageJob, None, "nope")
+
+
+@pytest.mark.asyncio
+async def test_job_list_leaves_out_deferred_fields_unless_asked(client, submitted):
+    row = (await client.post("/api/v1/rows/", json={"title": "row"})).json()
+    await client.post("/api/v1/image-jobs/", json={"prompt": "a red fox", "row_id": row["id"]})
+
+    listed = (await client.get("/api/v1/image-jobs/")).json()
+    assert not set(listed[0]) & LIST_DEFERRED_FIELDS
+
+    listed = (await client.get("/api/v1/image-jobs/", params={"fields": "prompt"})).json()
+    assert listed[0] == {"id": listed[0]["id"], "prompt": "a red fox"}
+
+    assert (await client.get("/api/v1/image-jobs/", params={"fields": "bogus"})).status_code == 400
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.utils import hedging
+from app.utils.hedging import HedgeBudget, Hedger
+
+
+def _warm(hedger: Hedger, latency: float) -> None:
+    hedger._latencies.extend([latency] * hedging.MIN_SAMPLES)
+
+
+def test_budget_allows_hedges_only_for_earned_tokens():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+    assert not budget.spend()
+    budget.earn()
+    assert not budget.spend()
+    budget.earn()
+    assert budget.spend()
+    assert not budget.spend()
+
+
+def test_budget_is_capped_at_burst():
+    budget = HedgeBudget(ratio=1.0, burst=2.0)
+    for _ in range(5):
+        budget.earn()
+    assert budget.tokens == 2.0
+
+
+def test_no_delay_until_enough_samples():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.01)
+    assert hedger.delay() is None
+    _warm(hedger, 0.05)
+    assert hedger.delay() == 0.05
+
+
+def test_delay_is_never_below_min_delay():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.5)
+    _warm(hedger, 0.01)
+    assert hedger.delay() == 0.5
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_the_faster_attempt_wins():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.01)
+    _warm(hedger, 0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        # The first attempt hangs; the hedge answers at once
+        await asyncio.sleep(10 if len(attempts) == 1 else 0)
+        return len(attempts)
+
+    assert await asyncio.wait_for(hedger.run(call), timeout=1) == 2
+    assert hedger.hedges == 1
+    assert hedger.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_attempt_latency_is_recorded():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.05)
+    _warm(hedger, 0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(10 if calls == 1 else 0)
+
+    await hedger.run(call)
+    await asyncio.sleep(0)
+    # Both attempts are recorded; the loser ran for at least the hedge delay
+    assert len(hedger._latencies) == hedging.MIN_SAMPLES + 2
+    assert max(hedger._latencies) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    hedger = Hedger("test", HedgeBudget(0.0), min_delay=0.01)
+    _warm(hedger, 0.01)
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert await hedger.run(call) == "done"
+    assert hedger.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_waits_for_the_other():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.01)
+    _warm(hedger, 0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("first attempt failed")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert await hedger.run(call) == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_primary_error_is_raised_when_both_fail():
+    hedger = Hedger("test", HedgeBudget(1.0), min_delay=0.01)
+    _warm(hedger, 0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        attempt = calls
+        await asyncio.sleep(0.05 if attempt == 1 else 0)
+        raise RuntimeError(f"attempt {attempt}")
+
+    with pytest.raises(RuntimeError, match="attempt 1"):
+        await hedger.run(call)
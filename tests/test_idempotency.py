@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models import IdempotencyKey, VideoJob, VideoJobStatus
+from app.services.idempotency import idempotency_service, request_fingerprint
+from tests.helpers import add_row, load, video_job
+
+JOB = {"source_image_url": "https://images.test/a.png", "motion_prompt": "pan left", "model": "kling"}
+
+
+async def _video_jobs(db) -> int:
+    return (await db.execute(select(func.count()).select_from(VideoJob))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_the_first_response_without_a_new_job(db, client, submitted):
+    headers = {"Idempotency-Key": "create-1"}
+    first = await client.post("/api/v1/video-jobs/", json=JOB, headers=headers)
+    again = await client.post("/api/v1/video-jobs/", json=JOB, headers=headers)
+
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert await _video_jobs(db) == 1
+    assert len(submitted) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_without_a_key_are_not_deduplicated(db, client, submitted):
+    await client.post("/api/v1/video-jobs/", json=JOB)
+    await client.post("/api/v1/video-jobs/", json=JOB)
+    assert await _video_jobs(db) == 2
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_a_different_request_is_refused(db, client, submitted):
+    headers = {"Idempotency-Key": "create-1"}
+    await client.post("/api/v1/video-jobs/", json=JOB, headers=headers)
+    response = await client.post("/api/v1/video-jobs/", json=dict(JOB, motion_prompt="zoom in"), headers=headers)
+    assert response.status_code == 422
+    assert await _video_jobs(db) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_in_progress_is_a_conflict(db, client, submitted):
+    body = json.dumps(JOB).encode()
+    # Claimed by the same request, still being handled
+    fingerprint = request_fingerprint("POST", "/api/v1/video-jobs/", "", body)
+    assert await idempotency_service.claim("create-1", "create_video_job", fingerprint) is None
+    response = await client.post(
+        "/api/v1/video-jobs/", content=body,
+        headers={"Idempotency-Key": "create-1", "Content-Type": "application/json"}
+    )
+    assert response.status_code == 409
+    assert await _video_jobs(db) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_its_key(db, client, submitted):
+    job = video_job(VideoJobStatus.PROCESSING)
+    await add_row(db, job)
+    job_id = job.id
+    headers = {"Idempotency-Key": "retry-1"}
+
+    assert (await client.post(f"/api/v1/video-jobs/{job_id}/retry", headers=headers)).status_code == 400
+    assert await load(IdempotencyKey, "retry-1") is None
+
+    await db.execute(update(VideoJob).where(VideoJob.id == job_id).values(status=VideoJobStatus.FAILED))
+    await db.commit()
+    assert (await client.post(f"/api/v1/video-jobs/{job_id}/retry", headers=headers)).status_code == 200
+    assert submitted == [f"video:{job_id}"]
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_purged(db):
+    db.add(IdempotencyKey(
+        key="old", endpoint="create_video_job", fingerprint="f",
+        expires_at=datetime.utcnow() - timedelta(seconds=1)
+    ))
+    db.add(IdempotencyKey(
+        key="new", endpoint="create_video_job", fingerprint="f",
+        expires_at=datetime.utcnow() + timedelta(hours=1)
+    ))
+    await db.commit()
+
+    assert await idempotency_service.purge_expired() == 1
+    assert await load(IdempotencyKey, "old") is None
+    assert await load(IdempotencyKey, "new") is not None
@@ -0,0 +1,113 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import image_fetch
+from app.services.image_fetch import UnsafeURLError, check_url, fetch_image
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """
+    Resolve hosts from a table instead of DNS
+    """
+    hosts = {}
+
+    async def _resolve(host, port):
+        return hosts[host]
+
+    monkeypatch.setattr(image_fetch, "_resolve", _resolve)
+    return hosts
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """
+    Serve fetches from a table of URL -> response
+    """
+    responses = {}
+
+    def handler(request):
+        return responses[str(request.url)]
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        image_fetch.httpx, "AsyncClient", lambda: real_client(transport=httpx.MockTransport(handler))
+    )
+    return responses
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("address", [
+    "127.0.0.1", "10.0.0.5", "172.16.0.1", "192.168.1.1", "169.254.169.254", "0.0.0.0",
+    "::1", "fd00:ec2::254", "fe80::1", "::ffff:127.0.0.1",
+])
+async def test_internal_addresses_are_refused(resolve, address):
+    resolve["images.test"] = [address]
+    with pytest.raises(UnsafeURLError):
+        await check_url(httpx.URL("https://images.test/a.png"))
+
+
+@pytest.mark.asyncio
+async def test_public_addresses_are_allowed(resolve):
+    resolve["images.test"] = ["93.184.216.34", "2606:2800:220:1::1"]
+    await check_url(httpx.URL("https://images.test/a.png"))
+
+
+@pytest.mark.asyncio
+async def test_a_host_with_any_internal_address_is_refused(resolve):
+    resolve["images.test"] = ["93.184.216.34", "10.0.0.5"]
+    with pytest.raises(UnsafeURLError):
+        await check_url(httpx.URL("https://images.test/a.png"))
+
+
+@pytest.mark.asyncio
+async def test_other_schemes_are_refused():
+    with pytest.raises(UnsafeURLError):
+        await check_url(httpx.URL("file:///etc/passwd"))
+
+
+@pytest.mark.asyncio
+async def test_private_addresses_can_be_allowed(resolve, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_FETCH_ALLOW_PRIVATE", True)
+    await check_url(httpx.URL("http://localhost:8080/a.png"))
+
+
+@pytest.mark.asyncio
+async def test_redirects_are_checked(resolve, served):
+    resolve["images.test"] = ["93.184.216.34"]
+    resolve["internal.test"] = ["169.254.169.254"]
+    served["https://images.test/a.png"] = httpx.Response(302, headers={"Location": "https://images.test/b.png"})
+    served["https://images.test/b.png"] = httpx.Response(200, content=b"image")
+    served["https://images.test/evil.png"] = httpx.Response(
+        302, headers={"Location": "http://internal.test/latest/meta-data/"}
+    )
+
+    assert await fetch_image("https://images.test/a.png") == b"image"
+    with pytest.raises(UnsafeURLError):
+        await fetch_image("https://images.test/evil.png")
+
+
+@pytest.mark.asyncio
+async def test_redirects_are_capped(resolve, served, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_FETCH_MAX_REDIRECTS", 2)
+    resolve["images.test"] = ["93.184.216.34"]
+    served["https://images.test/loop.png"] = httpx.Response(302, headers={"Location": "/loop.png"})
+
+    with pytest.raises(Exception, match="Too many redirects"):
+        await fetch_image("https://images.test/loop.png")
+
+
+@pytest.mark.asyncio
+async def test_oversized_images_are_refused(resolve, served, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 4)
+    resolve["images.test"] = ["93.184.216.34"]
+    served["https://images.test/a.png"] = httpx.Response(200, content=b"too large")
+
+    with pytest.raises(Exception, match="maximum file size"):
+        await fetch_image("https://images.test/a.png")
+
+
+@pytest.mark.asyncio
+async def test_data_urls_are_decoded():
+    assert await fetch_image("data:image/png;base64,aW1hZ2U=") == b"image"
@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.models import ImageJob, ImageJobStatus
+from app.services import openai_service
+from app.services.job_processing import image_job_key, process_image_generation
+from tests.helpers import add_row, load
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """
+    Image counts asked of OpenAI; each call returns as many images as the test allows
+    """
+    calls = []
+    limit = {"images": None}
+
+    async def generate_images(prompt, size, n):
+        calls.append(n)
+        count = n if limit["images"] is None else min(n, limit["images"])
+        return [f"https://images.test/{len(calls)}-{index}.png" for index in range(count)]
+
+    monkeypatch.setattr(openai_service, "generate_images", generate_images)
+    return calls, limit
+
+
+async def _variants(db, count):
+    """
+    Commit a pending variant group, grouped under the first job's id as the API does
+    """
+    group_id = uuid.uuid4()
+    jobs = [
+        ImageJob(
+            id=group_id if index == 0 else uuid.uuid4(), variant_group_id=group_id, variant_index=index,
+            prompt="a fox", status=ImageJobStatus.PENDING
+        )
+        for index in range(count)
+    ]
+    await add_row(db, *jobs)
+    return [job.id for job in jobs]
+
+
+@pytest.mark.asyncio
+async def test_variants_are_created_as_sibling_jobs(db, client, submitted):
+    response = await client.post("/api/v1/image-jobs/", json={"prompt": "a fox", "variants": 3})
+    assert response.status_code == 200
+    first = response.json()
+    assert (first["variant_group_id"], first["variant_index"]) == (first["id"], 0)
+    # One task generates the whole group
+    assert submitted == [image_job_key(first["id"])]
+
+    jobs = (await db.execute(
+        select(ImageJob).where(ImageJob.variant_group_id == uuid.UUID(first["id"])).order_by(ImageJob.variant_index)
+    )).scalars().all()
+    assert [job.variant_index for job in jobs] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_variants_are_generated_in_one_call(db, generated):
+    calls, _ = generated
+    job_ids = await _variants(db, 3)
+
+    await process_image_generation(job_ids[0])
+    assert calls == [3]
+    jobs = [await load(ImageJob, job_id) for job_id in job_ids]
+    assert [job.status for job in jobs] == [ImageJobStatus.COMPLETED] * 3
+    assert len({job.image_url for job in jobs}) == 3
+
+    # The siblings' own tasks find nothing left to do
+    await process_image_generation(job_ids[1])
+    assert calls == [3]
+
+
+@pytest.mark.asyncio
+async def test_variants_without_an_image_fail(db, generated):
+    _, limit = generated
+    limit["images"] = 2
+    job_ids = await _variants(db, 3)
+
+    await process_image_generation(job_ids[0])
+    jobs = [await load(ImageJob, job_id) for job_id in job_ids]
+    assert [job.status for job in jobs] == [
+        ImageJobStatus.COMPLETED, ImageJobStatus.COMPLETED, ImageJobStatus.FAILED
+    ]
+    assert jobs[2].error_message == "No image data in response"
+
+
+@pytest.mark.asyncio
+async def test_siblings_of_a_cancelled_job_are_still_generated(db, generated):
+    calls, _ = generated
+    job_ids = await _variants(db, 3)
+    first = await db.get(ImageJob, job_ids[0])
+    first.status = ImageJobStatus.CANCELLED
+    await db.commit()
+
+    await process_image_generation(job_ids[0])
+    assert calls == [2]
+    jobs = [await load(ImageJob, job_id) for job_id in job_ids]
+    assert [job.status for job in jobs] == [
+        ImageJobStatus.CANCELLED, ImageJobStatus.COMPLETED, ImageJobStatus.COMPLETED
+    ]
@@ -0,0 +1,76 @@
+import base64
+import importlib
+import io
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.image_preprocess_service import ImagePreprocessService
+from app.utils.disk_cache import DiskLRUCache
+
+# The package re-exports the service instance under the module's name
+preprocess = importlib.import_module("app.services.image_preprocess_service")
+
+URL = "https://images.test/a.jpg"
+
+
+def _jpeg(size) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, "red").save(output, format="JPEG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ImagePreprocessService()
+    service.cache = DiskLRUCache(str(tmp_path), max_bytes=1024 * 1024)
+    return service
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """
+    The bytes served for URL, and how many times it was fetched
+    """
+    served = {"fetches": 0}
+
+    async def fetch_image(url):
+        served["fetches"] += 1
+        if "data" not in served:
+            raise Exception("unreachable")
+        return served["data"]
+
+    async def run_in_process(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr(preprocess, "fetch_image", fetch_image)
+    monkeypatch.setattr(preprocess, "run_in_process", run_in_process)
+    return served
+
+
+@pytest.mark.asyncio
+async def test_image_within_limits_is_submitted_as_is(service, source):
+    source["data"] = _jpeg((480, 360))
+    assert await service.prepare_for_kling(URL) == URL
+    assert await service.prepare_for_vision(URL) == (URL, "low")
+
+
+@pytest.mark.asyncio
+async def test_oversized_image_is_shrunk_once(service, source, monkeypatch):
+    monkeypatch.setattr(settings, "KLING_IMAGE_MAX_DIMENSION", 512)
+    source["data"] = _jpeg((2048, 1024))
+
+    image_url = await service.prepare_for_kling(URL)
+    assert image_url.startswith("data:image/jpeg;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(image_url.split(",", 1)[1]))) as image:
+        assert image.size == (512, 256)
+
+    assert await service.prepare_for_kling(URL) == image_url
+    assert source["fetches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unreadable_source_falls_back_to_the_original(service, source):
+    assert await service.prepare_for_kling(URL) == URL
+    assert await service.prepare_for_vision(URL) == (URL, "high")
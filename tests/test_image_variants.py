@@ -0,0 +1,89 @@
+import asyncio
+import importlib
+
+import pytest
+
+from app.services.image_variant_service import ImageVariantService
+from app.utils.disk_cache import DiskLRUCache
+
+# The package re-exports the service instance under the module's name
+variants = importlib.import_module("app.services.image_variant_service")
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ImageVariantService()
+    service.cache = DiskLRUCache(str(tmp_path), max_bytes=1024 * 1024)
+    return service
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """
+    Source fetches, each held until the test releases it
+    """
+    fetches = []
+    release = asyncio.Event()
+
+    async def fetch_image(url):
+        fetches.append(url)
+        await release.wait()
+        return b"source"
+
+    async def run_in_process(func, source, width, fmt, quality):
+        return f"{source.decode()}:{width}:{fmt}".encode()
+
+    monkeypatch.setattr(variants, "fetch_image", fetch_image)
+    monkeypatch.setattr(variants, "run_in_process", run_in_process)
+    return fetches, release
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_render(service, source):
+    fetches, release = source
+    requests = [asyncio.create_task(service.get_variant("https://images.test/a.png", 64)) for _ in range(3)]
+    await _until(lambda: fetches)
+    await asyncio.sleep(0.1)
+    release.set()
+
+    assert await asyncio.gather(*requests) == [b"source:64:webp"] * 3
+    assert len(fetches) == 1
+    # Later requests are served from the cache
+    assert await service.get_variant("https://images.test/a.png", 64) == b"source:64:webp"
+    assert len(fetches) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requester_does_not_strand_the_others(service, source):
+    fetches, release = source
+    first = asyncio.create_task(service.get_variant("https://images.test/a.png", 64))
+    await _until(lambda: fetches)
+    second = asyncio.create_task(service.get_variant("https://images.test/a.png", 64))
+    # Let the second request find the render in flight
+    await asyncio.sleep(0.1)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.wait_for(second, timeout=1) == b"source:64:webp"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_render_errors_reach_every_requester(service, monkeypatch):
+    async def fetch_image(url):
+        await asyncio.sleep(0)
+        raise ValueError("not an image")
+
+    monkeypatch.setattr(variants, "fetch_image", fetch_image)
+    results = await asyncio.gather(
+        *(service.get_variant("https://images.test/a.png", 64) for _ in range(2)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not service._in_flight
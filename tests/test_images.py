@@ -0,0 +1,57 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils.images import fit_image, make_variant, probe_image
+
+ORIENTATION = 0x0112
+
+
+def _encode(size, fmt="JPEG", mode="RGB", orientation=None) -> bytes:
+    image = Image.new(mode, size, "red")
+    output = io.BytesIO()
+    if orientation:
+        exif = Image.Exif()
+        exif[ORIENTATION] = orientation
+        image.save(output, format=fmt, exif=exif)
+    else:
+        image.save(output, format=fmt)
+    return output.getvalue()
+
+
+def _size(data: bytes) -> tuple:
+    with Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+def test_probe_reads_format_and_size():
+    assert probe_image(_encode((300, 200), fmt="PNG")) == ("PNG", 300, 200)
+
+
+def test_fit_scales_down_to_both_bounds():
+    assert _size(fit_image(_encode((4000, 2000)), 2048, 768, 90)) == (1536, 768)
+    assert _size(fit_image(_encode((4000, 2000)), 1000, 1000, 90)) == (1000, 500)
+
+
+def test_fit_never_scales_up():
+    assert _size(fit_image(_encode((300, 200)), 2048, 2048, 90)) == (300, 200)
+
+
+@pytest.mark.parametrize("orientation", [6, 8])
+def test_fit_sizes_the_displayed_orientation(orientation):
+    # Stored landscape, displayed portrait
+    data = fit_image(_encode((2000, 1000), orientation=orientation), 1000, 400, 90)
+    assert _size(data) == (400, 800)
+
+
+def test_fit_flattens_transparency_to_jpeg():
+    data = fit_image(_encode((100, 100), fmt="PNG", mode="RGBA"), 50, 50, 90)
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.mode, image.size) == ("JPEG", "RGB", (50, 50))
+
+
+def test_variant_width_applies_to_the_displayed_orientation():
+    data = make_variant(_encode((2000, 1000), orientation=6), 500, "webp", 80)
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.size) == ("WEBP", (500, 1000))
@@ -0,0 +1,55 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models import ImageJob, ImageJobStatus, VideoJobStatus
+from app.services import job_cancellation
+from app.services.video_poller import video_poller
+from tests.helpers import add_row, load, video_job
+
+
+@pytest.fixture
+def stopped(monkeypatch):
+    """
+    Runner keys whose tasks were cancelled
+    """
+    keys = []
+    monkeypatch.setattr(job_cancellation.job_runner, "cancel", lambda key: keys.append(key) or True)
+    return keys
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_a_video_job(db, client, stopped):
+    job = video_job(VideoJobStatus.PROCESSING, external_task_id="task-1", submitted_at=datetime.utcnow())
+    await add_row(db, job)
+
+    response = await client.post(f"/api/v1/video-jobs/{job.id}/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert stopped == [f"video:{job.id}"]
+
+    # Cancelled jobs are no longer polled
+    assert await video_poller.poll_once() == 0
+    assert (await client.post(f"/api/v1/video-jobs/{job.id}/cancel")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_variant_leaves_its_group_running(db, client, stopped):
+    group_id = uuid.uuid4()
+    first, second = (
+        ImageJob(prompt="a red fox", status=ImageJobStatus.PROCESSING, variant_group_id=group_id, variant_index=index)
+        for index in range(2)
+    )
+    await add_row(db, first, second)
+
+    response = await client.post(f"/api/v1/image-jobs/{first.id}/cancel")
+    assert response.status_code == 200
+    assert (await load(ImageJob, first.id)).status == ImageJobStatus.CANCELLED
+    assert (await load(ImageJob, second.id)).status == ImageJobStatus.PROCESSING
+    assert stopped == []
+
+    # The last variant stops the work of the whole group
+    response = await client.post(f"/api/v1/image-jobs/{second.id}/cancel")
+    assert response.status_code == 200
+    assert sorted(stopped) == sorted([f"image:{first.id}", f"image:{second.id}"])
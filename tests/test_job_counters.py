@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.job_counters import GLOBAL_SCOPE, read_counts, transition
+from app.models import ImageJob, ImageJobStatus, JobCounter, Row, RowStatus
+
+
+async def _add_job(db, status=ImageJobStatus.PENDING):
+    row = Row(title="row")
+    db.add(row)
+    await db.flush()
+    job = ImageJob(row_id=row.id, prompt="a red fox", status=status)
+    db.add(job)
+    await db.commit()
+    return row, job
+
+
+@pytest.mark.asyncio
+async def test_new_jobs_are_counted(db):
+    row, _ = await _add_job(db)
+    counts = await read_counts(db, [GLOBAL_SCOPE, str(row.id)])
+    assert counts[GLOBAL_SCOPE]["image"]["pending"] == 1
+    assert counts[str(row.id)]["image"]["pending"] == 1
+    assert counts[str(row.id)]["video"]["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transition_moves_the_job_and_its_counts(db):
+    row, job = await _add_job(db)
+
+    assert await transition(db, ImageJob, job.id, ImageJobStatus.PENDING, ImageJobStatus.PROCESSING)
+    await db.commit()
+
+    status = await db.scalar(select(ImageJob.status).where(ImageJob.id == job.id))
+    assert status == ImageJobStatus.PROCESSING
+    counts = await read_counts(db, [GLOBAL_SCOPE, str(row.id)])
+    for scope in (GLOBAL_SCOPE, str(row.id)):
+        assert counts[scope]["image"]["pending"] == 0
+        assert counts[scope]["image"]["processing"] == 1
+    assert await db.scalar(select(Row.status).where(Row.id == row.id)) == RowStatus.PROCESSING
+
+
+@pytest.mark.asyncio
+async def test_transition_from_the_wrong_status_changes_nothing(db):
+    row, job = await _add_job(db, ImageJobStatus.COMPLETED)
+
+    assert not await transition(db, ImageJob, job.id, ImageJobStatus.PENDING, ImageJobStatus.PROCESSING)
+    await db.commit()
+
+    counts = await read_counts(db, [str(row.id)])
+    assert counts[str(row.id)]["image"]["completed"] == 1
+    assert counts[str(row.id)]["image"]["processing"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transition_writes_extra_values(db):
+    _, job = await _add_job(db)
+
+    await transition(
+        db, ImageJob, job.id, ImageJobStatus.PENDING, ImageJobStatus.FAILED, error_message="boom"
+    )
+    await db.commit()
+
+    assert await db.scalar(select(ImageJob.error_message).where(ImageJob.id == job.id)) == "boom"
+
+
+@pytest.mark.asyncio
+async def test_global_counts_add_up_the_shards(db):
+    for _ in range(5):
+        await _add_job(db)
+
+    scopes = await db.scalars(select(JobCounter.scope).where(JobCounter.scope.like(f"{GLOBAL_SCOPE}%")))
+    assert all(scope.startswith(f"{GLOBAL_SCOPE}:") for scope in scopes)
+    counts = await read_counts(db, [GLOBAL_SCOPE])
+    assert counts[GLOBAL_SCOPE]["image"]["pending"] == 5
+
+
+@pytest.mark.asyncio
+async def test_deleted_jobs_come_off_the_counts(db):
+    row, job = await _add_job(db)
+    await db.delete(job)
+    await db.commit()
+
+    counts = await read_counts(db, [GLOBAL_SCOPE, str(row.id)])
+    assert counts[GLOBAL_SCOPE]["image"]["pending"] == 0
+    assert counts[str(row.id)]["image"]["pending"] == 0
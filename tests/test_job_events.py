@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.job_events import stage_latencies
+from app.models import JobEvent
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _events(job_id, *timeline):
+    return [
+        JobEvent(job_kind="image", job_id=job_id, event=name, created_at=NOW + timedelta(seconds=offset))
+        for name, offset in timeline
+    ]
+
+
+def _by_stage(latencies):
+    return {row["stage"]: row for row in latencies}
+
+
+@pytest.mark.asyncio
+async def test_stages_are_timed_per_job(db):
+    db.add_all(_events(uuid.uuid4(), ("queued", 0), ("started", 2), ("processing", 3), ("completed", 13)))
+    await db.commit()
+
+    stages = _by_stage(await stage_latencies(db, "image", NOW - timedelta(minutes=1), 3600))
+    assert {stage: row["max"] for stage, row in stages.items()} == {
+        "queue": 2.0, "claim": 1.0, "generate": 10.0, "end_to_end": 13.0
+    }
+
+
+@pytest.mark.asyncio
+async def test_stage_that_began_before_since_is_timed_from_its_start(db):
+    # Queued ten minutes before the window; only its end falls inside it
+    db.add_all(_events(uuid.uuid4(), ("queued", -600), ("started", -590), ("processing", -589), ("completed", 30)))
+    # Finished entirely before the window
+    db.add_all(_events(uuid.uuid4(), ("queued", -600), ("started", -599), ("processing", -598), ("completed", -500)))
+    await db.commit()
+
+    stages = _by_stage(await stage_latencies(db, "image", NOW, 3600))
+    assert set(stages) == {"generate", "end_to_end"}
+    assert stages["generate"]["count"] == 1
+    assert stages["generate"]["max"] == 619.0
+    assert stages["end_to_end"]["max"] == 630.0
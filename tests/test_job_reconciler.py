@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import ImageJob, ImageJobStatus, JobLease
+from app.services.coordinator import coordinator
+from app.services.job_processing import image_job_key
+from app.services.job_reconciler import job_reconciler
+from app.services.job_runner import JobRunner, queue_lease
+from tests.helpers import add_row, load
+
+
+def _stale(status=ImageJobStatus.PENDING):
+    created_at = datetime.utcnow() - timedelta(seconds=settings.JOB_RECOVERY_GRACE_SECONDS + 1)
+    return ImageJob(prompt="a red fox", status=status, created_at=created_at)
+
+
+async def _lease(db, resource, owner="other-node"):
+    now = datetime.utcnow()
+    db.add(JobLease(resource=resource, owner=owner, acquired_at=now, expires_at=now + timedelta(seconds=60)))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_orphaned_jobs_are_resubmitted(db, submitted):
+    pending, processing = _stale(), _stale(ImageJobStatus.PROCESSING)
+    await add_row(db, pending, processing)
+
+    assert await job_reconciler.reconcile() == 2
+    assert sorted(submitted) == sorted([image_job_key(pending.id), image_job_key(processing.id)])
+    assert (await load(ImageJob, processing.id)).status == ImageJobStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_jobs_with_a_live_lease_are_left_alone(db, submitted):
+    running, queued = _stale(ImageJobStatus.PROCESSING), _stale()
+    await add_row(db, running, queued)
+    await _lease(db, image_job_key(running.id))
+    # Waiting for a worker slot on another node, past the grace period
+    await _lease(db, queue_lease(image_job_key(queued.id)))
+
+    assert await job_reconciler.reconcile() == 0
+    assert submitted == []
+    assert (await load(ImageJob, running.id)).status == ImageJobStatus.PROCESSING
+
+
+@pytest.mark.asyncio
+async def test_runner_holds_the_queue_lease_until_the_job_ends(db):
+    runner = JobRunner()
+    key = "image:00000000-0000-0000-0000-000000000001"
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+
+    runner.submit(key, job)
+    while queue_lease(key) not in coordinator.held_leases():
+        await asyncio.sleep(0.01)
+    release.set()
+    while runner.in_flight:
+        await asyncio.sleep(0.01)
+    assert queue_lease(key) not in coordinator.held_leases()
+
+
+@pytest.mark.asyncio
+async def test_runner_skips_a_job_queued_on_another_node(db):
+    runner = JobRunner()
+    key = "image:00000000-0000-0000-0000-000000000002"
+    await _lease(db, queue_lease(key))
+    ran = []
+
+    async def job():
+        ran.append(key)
+
+    runner.submit(key, job)
+    while runner.in_flight:
+        await asyncio.sleep(0.01)
+    assert ran == []
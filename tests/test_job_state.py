@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.job_state import job_state_cache
+from app.models import VideoJob, VideoJobStatus
+from tests.helpers import add_row, video_job
+
+
+@pytest.fixture
+def cache(db):
+    job_state_cache.clear()
+    yield job_state_cache
+    job_state_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_committed_jobs_and_changes_are_written_through(db, cache):
+    job = video_job(VideoJobStatus.PENDING)
+    await add_row(db, job)
+    assert cache.get("video", job.id).status == VideoJobStatus.PENDING
+
+    job.status = VideoJobStatus.PROCESSING
+    job.progress = 50
+    await db.commit()
+    state = cache.get("video", job.id)
+    assert (state.status, state.progress) == (VideoJobStatus.PROCESSING, 50)
+    assert state.as_dict(["motion_prompt", "video_url"]) == {"motion_prompt": "pan left", "video_url": None}
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_not_cached(db, cache):
+    job = video_job(VideoJobStatus.PENDING)
+    await add_row(db, job)
+
+    job_id = job.id
+    job.status = VideoJobStatus.PROCESSING
+    await db.flush()
+    await db.rollback()
+    assert cache.get("video", job_id).status == VideoJobStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_deleted_jobs_are_evicted(db, cache):
+    job = video_job(VideoJobStatus.PENDING)
+    await add_row(db, job)
+
+    await db.delete(job)
+    await db.commit()
+    assert cache.get("video", job.id) is None
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(db, cache, monkeypatch):
+    job = video_job(VideoJobStatus.PENDING)
+    await add_row(db, job)
+
+    monkeypatch.setattr(settings, "JOB_STATE_MAX_AGE_SECONDS", 0.0)
+    assert cache.get("video", job.id) is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_kept_only_for_the_terminal_ttl(db, cache, monkeypatch):
+    job = video_job(VideoJobStatus.PENDING)
+    await add_row(db, job)
+
+    monkeypatch.setattr(settings, "JOB_STATE_TERMINAL_TTL_SECONDS", 0.0)
+    job.status = VideoJobStatus.COMPLETED
+    await db.commit()
+    assert cache.get("video", job.id) is None
+
+
+@pytest.mark.asyncio
+async def test_polls_of_jobs_in_flight_are_answered_from_the_cache(db, client, cache):
+    job = video_job(VideoJobStatus.PROCESSING)
+    await add_row(db, job)
+    # Changed outside this process's sessions; the cache has not seen it
+    await db.execute(update(VideoJob).where(VideoJob.id == job.id).values(progress=90).execution_options(
+        synchronize_session=False
+    ))
+    await db.commit()
+
+    assert (await client.get(f"/api/v1/video-jobs/{job.id}")).json()["progress"] == 0
+
+    cache.clear()
+    assert (await client.get(f"/api/v1/video-jobs/{job.id}")).json()["progress"] == 90
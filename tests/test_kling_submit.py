@@ -0,0 +1,56 @@
+import importlib
+
+import httpx
+import pytest
+
+from app.services.kling_service import DuplicateTaskError, KlingService
+
+# app.services re-exports the service instance under the module's name
+kling_service = importlib.import_module("app.services.kling_service")
+
+
+@pytest.fixture
+def kling(monkeypatch):
+    """
+    A KlingService whose requests go to a handler set by the test
+    """
+    service = KlingService()
+    service.handler = None
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        kling_service.httpx, "AsyncClient",
+        lambda: real_client(transport=httpx.MockTransport(lambda request: service.handler(request)))
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_conflict_is_a_duplicate_whatever_the_message(kling):
+    kling.handler = lambda request: httpx.Response(409, json={"code": 1201, "message": "任务已存在"})
+    with pytest.raises(DuplicateTaskError):
+        await kling._create_video_task("https://img.test/a.png", "waves", 5, "ref-1")
+    assert kling.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_other_errors_naming_external_task_id_are_not_duplicates(kling):
+    kling.handler = lambda request: httpx.Response(
+        200, json={"code": 1201, "message": "external_task_id is too long"}
+    )
+    with pytest.raises(Exception) as raised:
+        await kling._create_video_task("https://img.test/a.png", "waves", 5, "ref-1")
+    assert not isinstance(raised.value, DuplicateTaskError)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_answers_with_the_existing_task(kling):
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(409, json={"code": 1201, "message": "external_task_id already exists"})
+        assert request.url.path.endswith("/ref-1")
+        return httpx.Response(200, json={"code": 0, "data": {"task_id": "t-1", "task_status": "processing"}})
+
+    kling.handler = handler
+    assert await kling._submit_once("https://img.test/a.png", "waves", 5, "ref-1") == {
+        "task_id": "t-1", "status": "submitted"
+    }
@@ -0,0 +1,41 @@
+from app.utils import minhash
+
+
+def test_normalize_folds_case_punctuation_and_space():
+    assert minhash.normalize("  A cat,\tON the MAT! ") == "a cat on the mat"
+
+
+def test_no_signature_without_words():
+    assert minhash.signature("!!! ...") is None
+
+
+def test_signature_is_stable():
+    first = minhash.signature("a red fox in the snow")
+    assert len(first) == minhash.NUM_PERMUTATIONS
+    assert first == minhash.signature("A red fox, in the snow.")
+
+
+def test_word_order_does_not_matter():
+    assert minhash.signature("red fox snow") == minhash.signature("snow fox red")
+
+
+def test_similarity_tracks_overlap():
+    base = minhash.signature("a red fox running through fresh snow at dawn")
+    close = minhash.signature("a red fox running through fresh snow at dusk")
+    far = minhash.signature("portrait of an astronaut drinking coffee on mars")
+
+    assert minhash.similarity(base, base) == 1.0
+    assert minhash.similarity(base, close) > 0.5
+    assert minhash.similarity(base, far) < 0.2
+
+
+def test_similar_texts_share_a_band_key():
+    first = minhash.band_keys(minhash.signature("a red fox running through fresh snow at dawn"))
+    second = minhash.band_keys(minhash.signature("a red fox running through fresh snow at dusk"))
+    assert len(first) == minhash.BANDS
+    assert set(first) & set(second)
+
+
+def test_pack_round_trips():
+    values = minhash.signature("a red fox")
+    assert minhash.unpack(minhash.pack(values)) == values
@@ -0,0 +1,57 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.models import ImageJob, ImageJobStatus
+from app.models.image_job import IMAGE_MODEL
+from app.services.prompt_index import prompt_index
+from tests.helpers import add_row
+
+PROMPT = "a red fox running through fresh snow at dawn"
+
+# How gpt-image-1 results are stored: megabytes of base64 in a data: URL
+DATA_URL = "data:image/png;base64," + base64.b64encode(b"\x89PNG" + b"\0" * 5000).decode()
+
+
+async def _completed_job(db, prompt=PROMPT, image_url=DATA_URL):
+    job = ImageJob(
+        prompt=prompt, model=IMAGE_MODEL, size="1024x1024",
+        status=ImageJobStatus.COMPLETED, image_url=image_url, completed_at=datetime.utcnow()
+    )
+    await add_row(db, job)
+    await prompt_index.add(db, job)
+    await db.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_similar_prompts_are_found(db, client):
+    job = await _completed_job(db)
+    await _completed_job(db, prompt="portrait of an astronaut drinking coffee on mars")
+
+    response = await client.post("/api/v1/image-jobs/similar", json={"prompt": PROMPT.upper() + "!"})
+    assert response.status_code == 200
+    matches = response.json()
+    assert [match["job_id"] for match in matches] == [str(job.id)]
+    assert matches[0]["image_url"] == DATA_URL
+
+
+@pytest.mark.asyncio
+async def test_reuse_completes_a_job_with_the_earlier_result(db, client, submitted):
+    match = await _completed_job(db)
+
+    response = await client.post("/api/v1/image-jobs/", json={"prompt": PROMPT, "reuse": True})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["image_url"] == DATA_URL
+    assert job["reused_from_id"] == str(match.id)
+    assert submitted == []
+
+
+@pytest.mark.asyncio
+async def test_reuse_without_a_match_generates(db, client, submitted):
+    response = await client.post("/api/v1/image-jobs/", json={"prompt": PROMPT, "reuse": True})
+    assert response.json()["status"] == "pending"
+    assert len(submitted) == 1
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import session
+from app.db.base_class import Base
+from app.db.session import RecentWrites
+from app.models import VideoJobStatus
+from tests.helpers import add_row, video_job
+
+
+@pytest_asyncio.fixture
+async def replica(db, monkeypatch):
+    """
+    An empty read replica, so a read that reaches it finds nothing
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="replica-"), "replica.db")
+    read_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with read_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    monkeypatch.setattr(session, "read_engine", read_engine)
+    monkeypatch.setattr(
+        session, "ReadSessionLocal", async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(session, "recent_writes", RecentWrites())
+    yield read_engine
+    await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica(db, client, replica):
+    job = video_job(VideoJobStatus.COMPLETED)
+    await add_row(db, job)
+
+    assert (await client.get(f"/api/v1/video-jobs/{job.id}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_a_client_reads_its_own_writes_from_the_primary(db, client, replica, submitted):
+    failed, done = video_job(VideoJobStatus.FAILED), video_job(VideoJobStatus.COMPLETED)
+    await add_row(db, failed, done)
+    writer = {"X-Client-Id": "writer"}
+
+    assert (await client.post(f"/api/v1/video-jobs/{failed.id}/retry", headers=writer)).status_code == 200
+    assert (await client.get(f"/api/v1/video-jobs/{done.id}", headers=writer)).status_code == 200
+    assert (await client.get(f"/api/v1/video-jobs/{done.id}", headers={"X-Client-Id": "other"})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_expires(db, client, replica, submitted, monkeypatch):
+    failed, done = video_job(VideoJobStatus.FAILED), video_job(VideoJobStatus.COMPLETED)
+    await add_row(db, failed, done)
+    writer = {"X-Client-Id": "writer"}
+    monkeypatch.setattr(session.settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+
+    assert (await client.post(f"/api/v1/video-jobs/{failed.id}/retry", headers=writer)).status_code == 200
+    assert (await client.get(f"/api/v1/video-jobs/{done.id}", headers=writer)).status_code == 404
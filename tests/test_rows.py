@@ -0,0 +1,56 @@
+import pytest
+
+from app.models import ImageJob, ImageJobStatus, VideoJobStatus
+from app.schemas.image_job import LIST_DEFERRED_FIELDS as IMAGE_DEFERRED
+from app.schemas.video_job import LIST_DEFERRED_FIELDS as VIDEO_DEFERRED
+from tests.helpers import add_row, video_job
+
+
+async def _row_with_jobs(db, images=3):
+    jobs = [ImageJob(prompt=f"prompt {index}", status=ImageJobStatus.PENDING) for index in range(images)]
+    return await add_row(db, *jobs, video_job(VideoJobStatus.PENDING, error_message=None))
+
+
+@pytest.mark.asyncio
+async def test_full_row_leaves_out_deferred_job_fields(db, client):
+    row = await _row_with_jobs(db)
+
+    full = (await client.get(f"/api/v1/rows/{row.id}/full")).json()
+    assert full["id"] == str(row.id)
+    assert full["title"] == "row"
+    assert full["job_counts"]["image"]["pending"] == 3
+    assert len(full["image_jobs"]) == 3
+    for job in full["image_jobs"]:
+        assert not set(job) & IMAGE_DEFERRED
+        assert job["status"] == "pending"
+    assert not set(full["video_jobs"][0]) & VIDEO_DEFERRED
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_capped_per_row(db, client):
+    row = await _row_with_jobs(db, images=5)
+
+    full = (await client.get(f"/api/v1/rows/{row.id}/full", params={"jobs_limit": 2})).json()
+    assert len(full["image_jobs"]) == 2
+    # The counts still cover every job
+    assert full["job_counts"]["image"]["pending"] == 5
+    assert (await client.get(f"/api/v1/rows/{row.id}/full", params={"jobs_limit": 0})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_expanded_listing_matches_the_full_row(db, client):
+    first, second = await _row_with_jobs(db, images=1), await _row_with_jobs(db, images=2)
+
+    rows = (await client.get("/api/v1/rows/", params={"expand": "jobs"})).json()
+    jobs = {row["id"]: len(row["image_jobs"]) for row in rows}
+    assert jobs == {str(first.id): 1, str(second.id): 2}
+    assert all("job_counts" in row for row in rows)
+
+    plain = (await client.get("/api/v1/rows/")).json()
+    assert all("image_jobs" not in row and "description" in row for row in plain)
+
+
+@pytest.mark.asyncio
+async def test_missing_row_is_404(db, client):
+    response = await client.get("/api/v1/rows/00000000-0000-0000-0000-000000000000/full")
+    assert response.status_code == 404
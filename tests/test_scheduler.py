@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from app.services.scheduler import FairScheduler
+
+
+async def _queue(scheduler, order, share, priority):
+    await scheduler.acquire(share, priority)
+    order.append((share, priority))
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_acquire_runs_at_once_while_slots_are_free():
+    scheduler = FairScheduler(slots=2)
+    await scheduler.acquire("a")
+    await scheduler.acquire("b")
+    assert scheduler.busy == 2
+    assert scheduler.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_jobs_overtake_bulk_ones():
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    tasks = [asyncio.create_task(_queue(scheduler, order, f"bulk-{i}", "bulk")) for i in range(3)]
+    await _settle()
+    tasks.append(asyncio.create_task(_queue(scheduler, order, "user", "interactive")))
+    await _settle()
+
+    scheduler.release()
+    await _settle()
+    assert order == [("user", "interactive")]
+
+    for _ in range(3):
+        scheduler.release()
+        await _settle()
+    await asyncio.gather(*tasks)
+    assert len(order) == 4
+
+
+@pytest.mark.asyncio
+async def test_a_share_with_a_backlog_does_not_delay_another():
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    tasks = [asyncio.create_task(_queue(scheduler, order, "busy", "bulk")) for _ in range(5)]
+    await _settle()
+    tasks.append(asyncio.create_task(_queue(scheduler, order, "quiet", "bulk")))
+    await _settle()
+
+    for _ in range(6):
+        scheduler.release()
+        await _settle()
+    await asyncio.gather(*tasks)
+    assert [share for share, _ in order].index("quiet") <= 1
+
+
+@pytest.mark.asyncio
+async def test_long_waits_are_served_first(monkeypatch):
+    from app.core.config import settings
+
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    tasks = [asyncio.create_task(_queue(scheduler, order, "old", "bulk"))]
+    await _settle()
+    tasks.append(asyncio.create_task(_queue(scheduler, order, "user", "interactive")))
+    await _settle()
+
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_WAIT_SECONDS", 0.0)
+    scheduler.release()
+    await _settle()
+    assert order == [("old", "bulk")]
+
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    cancelled = asyncio.create_task(_queue(scheduler, order, "gone", "bulk"))
+    waiting = asyncio.create_task(_queue(scheduler, order, "next", "bulk"))
+    await _settle()
+
+    cancelled.cancel()
+    await _settle()
+    assert scheduler.waiting == 1
+
+    scheduler.release()
+    await waiting
+    assert order == [("next", "bulk")]
+    assert scheduler.busy == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_dispatches_per_class():
+    scheduler = FairScheduler(slots=2)
+    await scheduler.acquire("a", "interactive")
+    await scheduler.acquire("b", "unknown")
+
+    metrics = scheduler.metrics()
+    assert metrics["interactive"]["dispatched"] == 1
+    assert metrics["bulk"]["dispatched"] == 1
+    assert metrics["bulk"]["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_shares_are_forgotten():
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    for client in range(50):
+        task = asyncio.create_task(_queue(scheduler, order, f"client-{client}", "bulk"))
+        await _settle()
+        scheduler.release()
+        await task
+
+    assert len(order) == 50
+    assert not scheduler._finish
+    assert not scheduler._queued
+
+
+@pytest.mark.asyncio
+async def test_shares_are_forgotten_while_others_queue(monkeypatch):
+    from app.services import scheduler as scheduler_module
+
+    monkeypatch.setattr(scheduler_module, "PRUNE_MIN_SHARES", 4)
+    scheduler = FairScheduler(slots=1)
+    await scheduler.acquire("holder")
+    order = []
+    # One share keeps a backlog throughout, so the queue is never empty
+    busy = [asyncio.create_task(_queue(scheduler, order, "busy", "bulk")) for _ in range(200)]
+    await _settle()
+    for client in range(50):
+        task = asyncio.create_task(_queue(scheduler, order, f"client-{client}", "bulk"))
+        await _settle()
+        # Serve the new client and a couple of the busy share's jobs
+        for _ in range(3):
+            scheduler.release()
+            await _settle()
+        assert task.done()
+
+    assert len(scheduler._finish) <= 2 * scheduler_module.PRUNE_MIN_SHARES
+    for _ in busy:
+        scheduler.release()
+        await _settle()
+    await asyncio.gather(*busy)
@@ -0,0 +1,61 @@
+import pytest
+
+from app.db.search import fts5_query, highlight, MATCH_END, MATCH_START
+from app.models import ImageJob, ImageJobStatus, Row
+from tests.helpers import add_row
+
+
+def test_fts5_query_requires_every_word():
+    assert fts5_query('sunset "beach" OR -sea') == '"sunset" "beach" "OR" "sea"'
+    assert fts5_query("!!!") is None
+
+
+def test_highlight_escapes_the_text():
+    snippet = f"<img src=x onerror=alert(1)> {MATCH_START}sunset{MATCH_END} & sea"
+    assert highlight(snippet) == "&lt;img src=x onerror=alert(1)&gt; <b>sunset</b> &amp; sea"
+    assert highlight(None) is None
+
+
+@pytest.mark.asyncio
+async def test_search_finds_prompts_and_rows(db, client):
+    job = ImageJob(prompt="a sunset over the beach <script>alert(1)</script>", status=ImageJobStatus.PENDING)
+    other = ImageJob(prompt="a mountain lake", status=ImageJobStatus.PENDING)
+    row = await add_row(db, job, other)
+    titled = Row(title="Sunset beach campaign")
+    db.add(titled)
+    await db.commit()
+
+    hits = (await client.get("/api/v1/search/", params={"q": "sunsets beach"})).json()
+    assert {(hit["type"], hit["id"]) for hit in hits} == {("image_job", str(job.id)), ("row", str(titled.id))}
+    image_hit = next(hit for hit in hits if hit["type"] == "image_job")
+    assert image_hit["row_id"] == str(row.id)
+    assert "<b>sunset</b>" in image_hit["snippet"]
+    assert "<script>" not in image_hit["snippet"]
+    assert "&lt;script&gt;" in image_hit["snippet"]
+
+
+@pytest.mark.asyncio
+async def test_search_by_type_and_every_word(db, client):
+    job = ImageJob(prompt="a sunset over the beach", status=ImageJobStatus.PENDING)
+    await add_row(db, job)
+
+    hits = (await client.get("/api/v1/search/", params={"q": "sunset", "types": "row"})).json()
+    assert hits == []
+    hits = (await client.get("/api/v1/search/", params={"q": "sunset forest"})).json()
+    assert hits == []
+    assert (await client.get("/api/v1/search/", params={"q": "sunset", "types": "bogus"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(db, client):
+    job = ImageJob(prompt="a sunset over the beach", status=ImageJobStatus.PENDING)
+    await add_row(db, job)
+
+    job.prompt = "a mountain lake"
+    await db.commit()
+    assert (await client.get("/api/v1/search/", params={"q": "sunset"})).json() == []
+    assert len((await client.get("/api/v1/search/", params={"q": "mountain"})).json()) == 1
+
+    await db.delete(job)
+    await db.commit()
+    assert (await client.get("/api/v1/search/", params={"q": "mountain"})).json() == []
@@ -0,0 +1,47 @@
+import enum
+import uuid
+from datetime import datetime
+
+import orjson
+from sqlalchemy import select
+
+from app.models import ImageJob
+from app.schemas.image_job import ImageJob as ImageJobSchema
+from app.utils.serialization import partial_schema, rows_response, schema_columns
+
+
+class _Color(str, enum.Enum):
+    RED = "red"
+
+
+class _Row:
+    def __init__(self, **values):
+        self._values = values
+
+    def _asdict(self):
+        return self._values
+
+
+def test_schema_columns_follow_the_schema():
+    columns = schema_columns(ImageJob, ImageJobSchema, ["id", "status"])
+    assert [column.key for column in columns] == ["id", "status"]
+    assert len(schema_columns(ImageJob, ImageJobSchema)) == len(ImageJobSchema.model_fields)
+    # Usable as a column-only select
+    assert len(select(*columns).selected_columns) == 2
+
+
+def test_rows_response_encodes_database_types():
+    job_id = uuid.uuid4()
+    created_at = datetime(2024, 5, 1, 12, 30)
+    response = rows_response([_Row(id=job_id, created_at=created_at, status=_Color.RED, url=None)])
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == [
+        {"id": str(job_id), "created_at": "2024-05-01T12:30:00", "status": "red", "url": None}
+    ]
+
+
+def test_partial_schema_only_requires_the_id():
+    partial = partial_schema(ImageJobSchema, "Partial")
+    job = partial(id=uuid.uuid4())
+    assert job.model_dump(exclude_unset=True) == {"id": job.id}
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.db.usage import MAX_BUFFERED_USAGE, record_usage, take_usage, usage_row
+from app.services.usage_ledger import usage_ledger
+
+JOB = {"source_image_url": "https://images.test/a.png", "motion_prompt": "pan left", "model": "kling"}
+
+
+@pytest.fixture
+def ledger(db, monkeypatch):
+    """
+    The usage ledger with nothing spent, and a $10 KLING budget
+    """
+    take_usage(MAX_BUFFERED_USAGE)
+    monkeypatch.setattr(usage_ledger, "_spent", {})
+    monkeypatch.setattr(usage_ledger, "_day", None)
+    monkeypatch.setattr(settings, "KLING_DAILY_BUDGET_USD", 10.0)
+    monkeypatch.setattr(settings, "USAGE_SOFT_BUDGET_RATIO", 0.8)
+    monkeypatch.setattr(settings, "USAGE_SOFT_MAX_DELAY_SECONDS", 30.0)
+    yield usage_ledger
+    take_usage(MAX_BUFFERED_USAGE)
+
+
+def test_budget_states_and_bulk_delay(ledger):
+    record_usage("kling", "video", 7.0)
+    assert (ledger.state("kling"), ledger.delay("kling")) == ("ok", 0.0)
+
+    record_usage("kling", "video", 2.0)
+    assert ledger.state("kling") == "soft"
+    assert ledger.delay("kling") == pytest.approx(15.0)
+
+    record_usage("kling", "video", 1.0)
+    assert ledger.state("kling") == "hard"
+    # No budget, no limit
+    record_usage("openai", "image", 1000.0)
+    assert ledger.state("openai") == "ok"
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_usage_per_scope_and_keeps_the_spend(ledger, client):
+    row_id = uuid.uuid4()
+    record_usage("kling", "video", 1.4, video_seconds=5)
+    with usage_row(row_id):
+        record_usage("kling", "video", 2.8, video_seconds=10)
+
+    assert await ledger.flush() == 2
+    assert ledger.spent("kling") == pytest.approx(4.2)
+
+    overall = (await client.get("/api/v1/usage/", params={"provider": "kling"})).json()
+    assert [(entry["calls"], entry["video_seconds"]) for entry in overall] == [(2, 15)]
+    for_row = (await client.get("/api/v1/usage/", params={"row_id": str(row_id)})).json()
+    assert [(entry["calls"], entry["cost_usd"]) for entry in for_row] == [(1, pytest.approx(2.8))]
+
+
+@pytest.mark.asyncio
+async def test_spent_budget_refuses_new_jobs(ledger, client, submitted):
+    record_usage("kling", "video", 10.0)
+    await ledger.flush()
+
+    response = await client.post("/api/v1/video-jobs/", json=JOB)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert submitted == []
+
+    budgets = {budget["provider"]: budget for budget in (await client.get("/api/v1/usage/budgets")).json()}
+    assert budgets["kling"]["state"] == "hard"
+    assert budgets["kling"]["remaining_usd"] == 0.0
+    assert budgets["openai"]["state"] == "ok"
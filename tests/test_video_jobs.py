@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from app.db.job_counters import read_counts
+from app.models import VideoJob, VideoJobStatus
+from tests.helpers import add_row, load, video_job
+
+
+@pytest.mark.asyncio
+async def test_retry_resets_a_failed_video_job(db, client, submitted):
+    job = video_job(
+        VideoJobStatus.FAILED, error_message="boom", progress=40, external_task_id="task-1",
+        submitted_at=datetime.utcnow(), video_url="https://videos.test/old.mp4"
+    )
+    row = await add_row(db, job)
+
+    response = await client.post(f"/api/v1/video-jobs/{job.id}/retry")
+    assert response.status_code == 200
+
+    job = await load(VideoJob, job.id)
+    assert job.status == VideoJobStatus.PENDING
+    assert (job.error_message, job.progress) == (None, 0)
+    assert (job.external_task_id, job.submitted_at, job.video_url) == (None, None, None)
+    assert submitted == [f"video:{job.id}"]
+    counts = await read_counts(db, [str(row.id)])
+    assert counts[str(row.id)]["video"]["failed"] == 0
+    assert counts[str(row.id)]["video"]["pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_finished_video_jobs_can_be_retried(db, client, submitted):
+    job = video_job(VideoJobStatus.PROCESSING)
+    await add_row(db, job)
+
+    response = await client.post(f"/api/v1/video-jobs/{job.id}/retry")
+    assert response.status_code == 400
+    assert submitted == []
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.db.job_counters import read_counts
+from app.models import VideoJob, VideoJobStatus
+from app.services.kling_service import kling_service
+from app.services.video_poller import VIDEO_TIMEOUT_MESSAGE, video_poller
+from tests.helpers import add_row, load, video_job
+
+
+def _submitted(**values):
+    return video_job(VideoJobStatus.PROCESSING, **values)
+
+
+@pytest.mark.asyncio
+async def test_poller_completes_a_finished_task(db, monkeypatch):
+    job = _submitted(external_task_id="task-1", submitted_at=datetime.utcnow())
+    row = await add_row(db, job)
+
+    async def check_task_status(task_id):
+        assert task_id == "task-1"
+        return {"status": "completed", "progress": 100, "video_url": "https://videos.test/a.mp4"}
+
+    monkeypatch.setattr(kling_service, "check_task_status", check_task_status)
+    assert await video_poller.poll_once() == 1
+
+    job = await load(VideoJob, job.id)
+    assert job.status == VideoJobStatus.COMPLETED
+    assert job.video_url == "https://videos.test/a.mp4"
+    assert job.completed_at is not None
+    counts = await read_counts(db, [str(row.id)])
+    assert counts[str(row.id)]["video"]["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_poller_records_progress(db, monkeypatch):
+    job = _submitted(external_task_id="task-1", submitted_at=datetime.utcnow())
+    await add_row(db, job)
+
+    async def check_task_status(task_id):
+        return {"status": "processing", "progress": 50}
+
+    monkeypatch.setattr(kling_service, "check_task_status", check_task_status)
+    await video_poller.poll_once()
+
+    job = await load(VideoJob, job.id)
+    assert (job.status, job.progress) == (VideoJobStatus.PROCESSING, 50)
+
+
+@pytest.mark.asyncio
+async def test_poller_retries_status_errors_until_the_timeout(db, monkeypatch):
+    timeout = timedelta(seconds=settings.VIDEO_JOB_TIMEOUT_SECONDS + 1)
+    fresh = _submitted(external_task_id="task-1", submitted_at=datetime.utcnow())
+    stale = _submitted(external_task_id="task-2", submitted_at=datetime.utcnow() - timeout)
+    # Submitted before submitted_at was recorded; times out from its last update
+    legacy = _submitted(external_task_id="task-3", updated_at=datetime.utcnow() - timeout)
+    await add_row(db, fresh, stale, legacy)
+
+    async def check_task_status(task_id):
+        raise RuntimeError("status endpoint down")
+
+    monkeypatch.setattr(kling_service, "check_task_status", check_task_status)
+    await video_poller.poll_once()
+
+    assert (await load(VideoJob, fresh.id)).status == VideoJobStatus.PROCESSING
+    for job_id in (stale.id, legacy.id):
+        job = await load(VideoJob, job_id)
+        assert job.status == VideoJobStatus.FAILED
+        assert job.error_message.startswith(VIDEO_TIMEOUT_MESSAGE)
+
+
+@pytest.mark.asyncio
+async def test_poller_fails_a_job_past_its_deadline(db, monkeypatch):
+    job = _submitted(
+        external_task_id="task-1", submitted_at=datetime.utcnow(),
+        deadline_at=datetime.utcnow() - timedelta(seconds=1)
+    )
+    await add_row(db, job)
+
+    async def check_task_status(task_id):
+        raise AssertionError("a job past its deadline is not checked")
+
+    monkeypatch.setattr(kling_service, "check_task_status", check_task_status)
+    await video_poller.poll_once()
+
+    assert (await load(VideoJob, job.id)).status == VideoJobStatus.FAILED